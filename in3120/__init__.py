@@ -4,18 +4,26 @@ from .shinglegenerator import ShingleGenerator
 from .sieve import Sieve
 from .document import Document, InMemoryDocument
 from .corpus import Corpus, InMemoryCorpus
-from .dictionary import Dictionary, InMemoryDictionary
+from .dictionary import Dictionary, InMemoryDictionary, FrontCodedDictionary, PerfectHashDictionary
 from .posting import Posting
-from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList
+from .postinglist import PostingList, InMemoryPostingList, CompactInMemoryPostingList, CompressedInMemoryPostingList
 from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .memorymappedinvertedindex import InvertedIndexWriter, MemoryMappedInvertedIndex
+from .segmentedinvertedindex import SegmentedInvertedIndex
 from .stringfinder import Trie, StringFinder
 from .suffixarray import SuffixArray
 from .postingsmerger import PostingsMerger
 from .simplesearchengine import SimpleSearchEngine
+from .lrucache import LRUCache
+from .cachingsearchengine import CachingSearchEngine
+from .asyncsearchengine import AsyncSearchEngine
 from .ranker import Ranker, SimpleRanker
+from .scoringstatistics import ScoringStatistics
 from .betterranker import BetterRanker
+from .bm25ranker import BM25Ranker
 from .naivebayesclassifier import NaiveBayesClassifier
 from .variablebytecodec import VariableByteCodec
+from .integercodec import IntegerCodec, VariableByteIntegerCodec, BitPackingIntegerCodec, PForDeltaIntegerCodec, Simple8bIntegerCodec
 from .expressioncomposer import ExpressionComposer
 from .shallowcaseextractor import ShallowCaseExtractor
 from .documentpipeline import DocumentPipeline
@@ -0,0 +1,175 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class AsyncSearchEngine:
+    """
+    An asyncio-friendly facade in front of a synchronous search engine, e.g., a SimpleSearchEngine,
+    a SuffixArray or a SimilaritySearchEngine. Anything having an evaluate method that returns an
+    iterator over matches will do. Query evaluation happens in a pool of worker threads or worker
+    processes, so that the event loop is never blocked.
+
+    Matches are streamed back as an async iterator. If worker threads are used, each match is handed
+    over to the event loop as soon as the wrapped search engine yields it. If worker processes are
+    used, the matches are handed over in one go once evaluation has completed, and the wrapped search
+    engine must be picklable unless worker processes are forked.
+
+    The number of queries being evaluated at the same time is bounded, and excess queries wait for
+    their turn. A query keeps its turn until its worker is done with it, also if the client has
+    gone away. A query can be given a timeout, which covers both waiting and evaluation. Timeouts
+    raise asyncio.TimeoutError. If a query times out, or if the client stops iterating or cancels
+    the task, evaluation in a worker thread is abandoned as soon as the wrapped search engine yields
+    control. Clients that stop iterating early should close the async iterator, e.g., using
+    contextlib.aclosing. Cancellation is best-effort only if worker processes are used: A query that
+    has not yet started is dropped, but a query that is already being evaluated runs to completion.
+    """
+
+    def __init__(self, engine: Any, workers: int = 4, processes: bool = False, max_concurrency: int = 16,
+                 timeout: Optional[float] = None):
+        assert workers > 0
+        assert max_concurrency > 0
+        assert timeout is None or timeout > 0
+        self.__engine = engine
+        self.__processes = processes
+        self.__max_concurrency = max_concurrency
+        self.__timeout = timeout  # The default timeout per query, in seconds.
+        self.__semaphores = weakref.WeakKeyDictionary()  # Bounds concurrency. One per event loop.
+        self.__executor: Executor
+        if processes:
+            self.__executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                                                  initargs=(engine,))
+        else:
+            self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+
+    async def __aenter__(self) -> "AsyncSearchEngine":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool. Queries that are being evaluated are allowed to complete.
+        """
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.__semaphores.clear()
+
+    async def evaluate(self, query: str, options: Dict[str, Any], *args: Any,
+                       timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Evaluates the given query using the wrapped search engine, and yields back the matches as they
+        become available. Any additional arguments, e.g., a ranker, are passed on to the wrapped search
+        engine. The timeout overrides the default timeout, if given.
+
+        The concurrency slot taken by the query is given back when the worker is done with the query,
+        and not when the client is. In worker processes, cancellation is best-effort only: A query
+        that times out or gets abandoned after it has started is still evaluated to completion.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.__timeout
+        deadline = None if timeout is None else loop.time() + timeout
+        semaphore = self.__semaphores.setdefault(loop, asyncio.Semaphore(self.__max_concurrency))
+        await asyncio.wait_for(semaphore.acquire(), self.__remaining(loop, deadline))
+        if self.__processes:
+            future = self.__submit(loop, semaphore, _evaluate, query, options, args)
+            for match in await asyncio.wait_for(asyncio.wrap_future(future), self.__remaining(loop, deadline)):
+                yield match
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        self.__submit(loop, semaphore, self.__produce, loop, queue, cancelled, query, options, args)
+        try:
+            while True:
+                (match, failure) = await asyncio.wait_for(queue.get(), self.__remaining(loop, deadline))
+                if failure is not None:
+                    raise failure
+                if match is None:
+                    break
+                yield match
+        finally:
+            cancelled.set()
+
+    async def search(self, query: str, options: Dict[str, Any], *args: Any,
+                     timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Like evaluate/3, but collects all the matches into a list.
+        """
+        return [match async for match in self.evaluate(query, options, *args, timeout=timeout)]
+
+    def __submit(self, loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore,
+                 function: Callable[..., Any], *args: Any) -> Future:
+        """
+        Hands the given function over to the worker pool, and arranges for the acquired semaphore to
+        be released once the function has completed, failed or been cancelled before it started.
+        """
+        def release(_: Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(semaphore.release)
+
+        try:
+            future = self.__executor.submit(function, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(release)
+        return future
+
+    @staticmethod
+    def __remaining(loop: asyncio.AbstractEventLoop, deadline: Optional[float]) -> Optional[float]:
+        """
+        Returns the number of seconds left until the given deadline, if any.
+        """
+        return None if deadline is None else max(0.0, deadline - loop.time())
+
+    def __produce(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, cancelled: threading.Event,
+                  query: str, options: Dict[str, Any], args: Tuple[Any, ...]) -> None:
+        """
+        Runs in a worker thread. Evaluates the query and posts (match, failure) pairs to the queue, where
+        (None, None) signals that there are no more matches. Stops early if the client has gone away.
+        """
+        def post(match: Optional[Dict[str, Any]], failure: Optional[BaseException]) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, (match, failure))
+
+        if cancelled.is_set():
+            return
+        try:
+            matches: Iterator[Dict[str, Any]] = iter(self.__engine.evaluate(query, options, *args))
+            try:
+                for match in matches:
+                    if cancelled.is_set():
+                        return
+                    post(match, None)
+            finally:
+                close: Optional[Callable[[], None]] = getattr(matches, "close", None)
+                if close is not None:
+                    close()
+            post(None, None)
+        except Exception as failure:
+            post(None, failure)
+
+
+# The search engine used by the current worker process, when evaluating queries in worker processes.
+_engine: Any = None
+
+
+def _initialize_worker(engine: Any) -> None:
+    """
+    Prepares a worker process for evaluating queries. Runs once per worker process, so that the search
+    engine only has to be passed to each worker once.
+    """
+    global _engine
+    _engine = engine
+
+
+def _evaluate(query: str, options: Dict[str, Any], args: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+    """
+    Evaluates a query in a worker process. Must be defined at module level.
+    """
+    return list(_engine.evaluate(query, options, *args))
@@ -5,7 +5,10 @@ from .ranker import Ranker
 from .corpus import Corpus
 from .posting import Posting
 from .invertedindex import InvertedIndex
+from .scoringstatistics import ScoringStatistics
+from typing import Optional
 import math
+import numpy as np
 
 
 class BetterRanker(Ranker):
@@ -17,10 +20,14 @@ class BetterRanker(Ranker):
     "static_quality_score". If the field is missing or doesn't have a value, a
     default value of 0.0 is assumed for the static document score.
 
+    If precomputed scoring statistics are supplied, the IDF values and the static document
+    scores are looked up in these instead of being computed from the index and the corpus
+    while scoring. The scores come out the same either way.
+
     See Section 7.1.4 in https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
     """
 
-    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex, statistics: Optional[ScoringStatistics] = None):
         self._score = 0.0
         self._document_id = None
         self._corpus = corpus
@@ -28,6 +35,8 @@ class BetterRanker(Ranker):
         self._dynamic_score_weight = 1.0  # TODO: Make this configurable.
         self._static_score_weight = 1.0  # TODO: Make this configurable.
         self._static_score_field_name = "static_quality_score"  # TODO: Make this configurable.
+        self._max_static_score = None  # Computed lazily, used for upper bounds. Negative if not applicable.
+        self._statistics = statistics
 
     def reset(self, document_id: int) -> None:
         self._document_id = document_id
@@ -39,9 +48,12 @@ class BetterRanker(Ranker):
         assert self._document_id == posting.document_id, "document_id does not match"
         
         tf = posting.term_frequency
-        df = self._inverted_index.get_document_frequency(term)
-        N = len(self._corpus)
-        idf = math.log(N/df) # 1/df => N/df
+        if self._statistics is not None:
+            idf = self._statistics.get_idf(term)
+        else:
+            df = self._inverted_index.get_document_frequency(term)
+            N = len(self._corpus)
+            idf = math.log(N/df) # 1/df => N/df
         
         tf_idf = tf * idf
         
@@ -50,7 +62,45 @@ class BetterRanker(Ranker):
 
     def evaluate(self) -> float:
         
+        if self._statistics is not None:
+            return self._score * self._statistics.get_static_score(self._document_id)
+
         document = self._corpus.get_document(self._document_id)
         static_score = document.get_field(self._static_score_field_name, self._static_score_weight)
         
         return self._score * static_score
+
+    def upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        # The dynamic score gets scaled by the static score. If all static scores are non-negative,
+        # scaling the best possible dynamic contribution by the largest static score is safe.
+        if self._max_static_score is None:
+            if self._statistics is not None:
+                scores = self._statistics.get_static_scores()
+            else:
+                scores = [d.get_field(self._static_score_field_name, self._static_score_weight) for d in self._corpus]
+            self._max_static_score = float(max(scores, default=0.0)) if min(scores, default=0.0) >= 0 else -1.0
+        if self._max_static_score < 0:
+            return None
+        if self._statistics is not None:
+            return max_term_frequency * self._statistics.get_idf(term) * multiplicity * self._max_static_score
+        df = self._inverted_index.get_document_frequency(term)
+        N = len(self._corpus)
+        return max_term_frequency * math.log(N / df) * multiplicity * self._max_static_score if df else 0.0
+
+    def contributions(self, term: str, multiplicity: int, document_ids: np.ndarray,
+                      term_frequencies: np.ndarray) -> Optional[np.ndarray]:
+        # Mirror the order of operations in update/3, so that the scores come out identical.
+        if self._statistics is not None:
+            return term_frequencies * self._statistics.get_idf(term) * multiplicity
+        df = self._inverted_index.get_document_frequency(term)
+        N = len(self._corpus)
+        idf = math.log(N / df) if df else 0.0
+        return term_frequencies * idf * multiplicity
+
+    def finalize_scores(self, document_ids: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        if self._statistics is not None:
+            return scores * self._statistics.get_static_scores()[document_ids]
+        static_scores = [self._corpus.get_document(int(document_id)).get_field(self._static_score_field_name,
+                                                                                self._static_score_weight)
+                         for document_id in document_ids]
+        return scores * np.array(static_scores, dtype=np.float64)
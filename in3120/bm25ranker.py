@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+from typing import Dict, Optional
+import numpy as np
+from .invertedindex import InvertedIndex
+from .posting import Posting
+from .ranker import Ranker
+
+
+class BM25Ranker(Ranker):
+    """
+    A ranker that implements Okapi BM25, with document length normalization based on the field
+    lengths that the inverted index records. The parameter k1 controls how quickly the contribution
+    of a term saturates as its term frequency grows, and the parameter b controls how strongly the
+    term frequencies are normalized by the document length, from not at all (0.0) to fully (1.0).
+
+    The document length used for normalization can optionally be a weighted document length,
+    i.e., a weighted sum of the document's field lengths. This is not BM25F: The postings only
+    hold the term frequency summed over all the indexed fields, so the weights affect the length
+    normalization only, and not the term frequencies themselves. By default all indexed fields
+    are weighted equally, which amounts to plain BM25 over the concatenated fields.
+
+    The length normalization factor of every document is precomputed when the ranker is created,
+    as are the IDF values of the terms as they are first seen. The ranker thus reflects the
+    index as it was when the ranker was created. The index must be able to report field lengths.
+
+    See Section 11.4.3 in https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
+    """
+
+    def __init__(self, inverted_index: InvertedIndex, k1: float = 1.2, b: float = 0.75,
+                 field_length_weights: Optional[Dict[str, float]] = None):
+        assert k1 >= 0.0
+        assert 0.0 <= b <= 1.0
+        field_lengths = inverted_index.get_field_lengths()
+        field_length_weights = field_length_weights or {f: 1.0 for f in field_lengths}
+        assert all(f in field_lengths and w >= 0.0 for (f, w) in field_length_weights.items()), "unknown field or bad weight"
+        self.__inverted_index = inverted_index
+        self.__k1 = k1
+        self.__k1_plus_1 = k1 + 1.0
+        self.__document_count = max((len(lengths) for lengths in field_lengths.values()), default=0)
+        lengths = np.zeros(self.__document_count, dtype=np.float64)
+        for (f, w) in field_length_weights.items():
+            lengths += w * np.frombuffer(field_lengths[f], dtype=np.uint32)
+        average = lengths.mean() if self.__document_count else 0.0
+        # The denominator term k1 * (1 - b + b * length / average) per document.
+        self.__norms = k1 * ((1.0 - b) + b * (lengths / average if average > 0 else lengths))
+        self.__min_norm = float(self.__norms.min()) if self.__document_count else k1
+        self.__idfs: Dict[str, float] = {}
+        self.__document_id = None
+        self.__score = 0.0
+
+    def __get_idf(self, term: str) -> float:
+        """
+        Returns the IDF of the given term, using the variant that is never negative.
+        """
+        idf = self.__idfs.get(term)
+        if idf is None:
+            df = self.__inverted_index.get_document_frequency(term)
+            idf = math.log(1.0 + (self.__document_count - df + 0.5) / (df + 0.5))
+            self.__idfs[term] = idf
+        return idf
+
+    def reset(self, document_id: int) -> None:
+        self.__document_id = document_id
+        self.__score = 0.0
+
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        assert self.__document_id == posting.document_id
+        tf = posting.term_frequency
+        self.__score += tf * self.__k1_plus_1 / (tf + self.__norms.item(posting.document_id)) * self.__get_idf(term) * multiplicity
+
+    def evaluate(self) -> float:
+        return self.__score
+
+    def upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        # The contribution grows with the term frequency and shrinks with the normalization factor.
+        tf = max_term_frequency
+        return tf * self.__k1_plus_1 / (tf + self.__min_norm) * self.__get_idf(term) * multiplicity if tf else 0.0
+
+    def contributions(self, term: str, multiplicity: int, document_ids: np.ndarray,
+                      term_frequencies: np.ndarray) -> Optional[np.ndarray]:
+        # Mirror the order of operations in update/3, so that the scores come out identical.
+        tf = term_frequencies.astype(np.float64)
+        return tf * self.__k1_plus_1 / (tf + self.__norms[document_ids]) * self.__get_idf(term) * multiplicity
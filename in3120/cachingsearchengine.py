@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+from typing import Any, Dict, Iterator, Optional
+from .corpus import Corpus
+from .invertedindex import InvertedIndex
+from .lrucache import LRUCache
+from .ranker import Ranker
+from .simplesearchengine import SimpleSearchEngine
+
+
+class CachingSearchEngine(SimpleSearchEngine):
+    """
+    A SimpleSearchEngine with a query result cache in front of it. Query traffic is typically
+    heavily skewed, so that a small set of popular queries make up a large fraction of it. For
+    these, we can skip query evaluation altogether and serve the results from the cache.
+
+    The cache is keyed on the normalized query terms and their multiplicities, the effective
+    values of the options that affect the result set, and the identity of the ranker. Hence,
+    e.g., the queries "Water pollution" and "water  POLLUTION" share a cache entry. The cache
+    only holds (score, document identifier) pairs, and the documents are looked up in the
+    corpus when the results are emitted.
+
+    Entries are evicted in least recently used order once the cache is full, and optionally
+    expire after a fixed time-to-live. The whole cache is invalidated whenever the version of
+    the inverted index changes, e.g., because documents have been added or deleted. Changes to
+    the ranker's internal state are not detected.
+    """
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex, capacity: int = 10000,
+                 ttl: Optional[float] = None):
+        super().__init__(corpus, inverted_index)
+        self.__corpus = corpus
+        self.__inverted_index = inverted_index
+        self.__cache = LRUCache(capacity, ttl)
+        self.__version = inverted_index.get_version()  # The version of the index that the cached results reflect.
+        self.__invalidations = 0
+
+    def evaluate(self, query: str, options: dict, ranker: Ranker) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query as SimpleSearchEngine does, but serves the results from the cache
+        if possible. The cache is bypassed if the "debug" option is set.
+        """
+        if options.get("debug", False):
+            yield from super().evaluate(query, options, ranker)
+            return
+
+        # Drop all cached results if the index has changed since they were computed.
+        version = self.__inverted_index.get_version()
+        if version != self.__version:
+            self.__cache.clear()
+            self.__version = version
+            self.__invalidations += 1
+
+        # Only the effective values of the options matter, so clamp them as the query evaluator does.
+        # The ranker is part of the key, which also keeps it alive so that its identity can't be reused.
+        terms = tuple(Counter(self.__inverted_index.get_terms(query)).items())
+        match_threshold = max(0.0, min(1.0, options.get("match_threshold", 0.5)))
+        hit_count = max(1, min(100, options.get("hit_count", 10)))
+        evaluation = options.get("evaluation", "exhaustive")
+        key = (terms, match_threshold, hit_count, evaluation, ranker)
+
+        results = self.__cache.get(key)
+        if results is None:
+            results = [(match["score"], match["document"].document_id)
+                       for match in super().evaluate(query, options, ranker)]
+            self.__cache.put(key, results)
+        for (score, document_id) in results:
+            yield {"score": score, "document": self.__corpus[document_id]}
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns the cache's statistics, i.e., the number of hits, misses, evictions, expirations and
+        entries, together with the number of times the cache has been invalidated.
+        """
+        return dict(self.__cache.get_statistics(), invalidations=self.__invalidations)
+
+    def clear(self) -> None:
+        """
+        Empties the cache, e.g., after having changed the ranker's internal state.
+        """
+        self.__cache.clear()
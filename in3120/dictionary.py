@@ -2,8 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from abc import abstractmethod
+from array import array
 import collections.abc
-from typing import Optional
+import hashlib
+import itertools
+import sys
+from struct import calcsize, pack, unpack_from
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .variablebytecodec import VariableByteCodec
 
 
 class Dictionary(collections.abc.Iterable):
@@ -79,3 +85,347 @@ class InMemoryDictionary(Dictionary):
 
     def get_term_id(self, term: str) -> Optional[int]:
         return self._terms.get(term, None)
+
+
+class FrontCodedDictionary(Dictionary):
+    """
+    A compressed dictionary over a static vocabulary, suitable for large vocabularies.
+
+    The terms are sorted by their UTF-8 encodings and stored in a single byte buffer, so that
+    a term's identifier is its rank in the sorted order. The sorted terms are partitioned into
+    blocks of BLOCK_SIZE terms each, and front coding is used within each block: The first term
+    in a block is stored in full, while the remaining terms are stored as the length of the
+    prefix they share with the preceding term plus the remaining suffix. All lengths are stored
+    using variable-byte encoding. Lookups binary search over the blocks' first terms, and then
+    scan a single block. See Section 5.2.2 in https://nlp.stanford.edu/IR-book/pdf/05comp.pdf.
+
+    Terms added after construction are kept in an uncompressed overflow dictionary, and are
+    assigned identifiers following those of the static vocabulary. Term identifiers hence
+    remain dense.
+    """
+
+    # The number of terms per block. Larger blocks compress better, but are slower to search.
+    BLOCK_SIZE = 16
+
+    def __init__(self, terms: Iterable[str]):
+        encoded = sorted({term.encode("utf-8") for term in terms})
+        self.__data = bytearray()  # The front coded blocks, concatenated.
+        self.__offsets = array("I")  # Where each block starts in the buffer.
+        self.__count = len(encoded)
+        previous = b""
+        for (i, term) in enumerate(encoded):
+            if i % __class__.BLOCK_SIZE == 0:
+                self.__offsets.append(len(self.__data))
+                VariableByteCodec.encode(len(term), self.__data)
+                self.__data.extend(term)
+            else:
+                shared = 0
+                while shared < min(len(term), len(previous)) and term[shared] == previous[shared]:
+                    shared += 1
+                VariableByteCodec.encode(shared, self.__data)
+                VariableByteCodec.encode(len(term) - shared, self.__data)
+                self.__data.extend(term[shared:])
+            previous = term
+        self.__overflow = InMemoryDictionary()  # Terms added after construction.
+
+    def __iter__(self):
+        for block in range(len(self.__offsets)):
+            for (i, term) in enumerate(self.__decode_block(block), block * __class__.BLOCK_SIZE):
+                yield (term.decode("utf-8"), i)
+        for (term, term_id) in self.__overflow:
+            yield (term, self.__count + term_id)
+
+    def __repr__(self):
+        return str(dict(self))
+
+    @staticmethod
+    def __read_number(data: bytearray, where: int) -> Tuple[int, int]:
+        """
+        Decodes the variable-byte encoded number at the given position. Returns a pair comprised
+        of the decoded number, and the position following it.
+        """
+        number = 0
+        while data[where] < 128:
+            number = (number << 7) + data[where]
+            where += 1
+        return ((number << 7) + data[where] - 128, where + 1)
+
+    def __decode_head(self, block: int) -> bytes:
+        """
+        Decodes the first term in the given block.
+        """
+        (length, where) = self.__read_number(self.__data, self.__offsets[block])
+        return bytes(self.__data[where:where + length])
+
+    def __decode_block(self, block: int) -> Iterator[bytes]:
+        """
+        Decodes the terms in the given block, in order.
+        """
+        data = self.__data
+        (length, where) = self.__read_number(data, self.__offsets[block])
+        term = bytes(data[where:where + length])
+        where += length
+        yield term
+        for _ in range(min(__class__.BLOCK_SIZE, self.__count - block * __class__.BLOCK_SIZE) - 1):
+            (shared, where) = self.__read_number(data, where)
+            (length, where) = self.__read_number(data, where)
+            term = term[:shared] + data[where:where + length]
+            where += length
+            yield bytes(term)
+
+    def size(self) -> int:
+        return self.__count + self.__overflow.size()
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            term_id = self.__count + self.__overflow.add_if_absent(term)
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        key = term.encode("utf-8")
+        (low, high) = (0, len(self.__offsets))
+        while low < high:
+            middle = (low + high) // 2
+            if self.__decode_head(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low > 0:
+            for (i, candidate) in enumerate(self.__decode_block(low - 1), (low - 1) * __class__.BLOCK_SIZE):
+                if candidate == key:
+                    return i
+                if candidate > key:
+                    break
+        term_id = self.__overflow.get_term_id(term)
+        return None if term_id is None else self.__count + term_id
+
+    def get_term(self, term_id: int) -> str:
+        """
+        Returns the term having the given identifier, i.e., the inverse of get_term_id/1.
+        """
+        assert 0 <= term_id < self.size()
+        if term_id >= self.__count:
+            return next(term for (term, i) in self.__overflow if i == term_id - self.__count)
+        (block, position) = divmod(term_id, __class__.BLOCK_SIZE)
+        for (i, term) in enumerate(self.__decode_block(block)):
+            if i == position:
+                return term.decode("utf-8")
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the compressed buffers, excluding any overflow terms.
+        """
+        return len(self.__data) + self.__offsets.itemsize * len(self.__offsets)
+
+
+class PerfectHashDictionary(Dictionary):
+    """
+    A build-once dictionary over a static vocabulary, based on a minimal perfect hash function
+    (MPHF) that maps the N terms onto {0, ..., N - 1} without collisions. Lookups are O(1), and
+    the hash function itself only takes a few bits per term.
+
+    The MPHF is constructed using the CHD ("compress, hash, and displace") algorithm: Terms are
+    hashed into buckets of a few terms each, and the buckets are processed largest first. For
+    each bucket we search for the first displacement value that sends all of the bucket's terms
+    to free slots, and record it. A term's slot is (h1 + multiplier * h2 + increment) mod N, where
+    h1 and h2 are hashes of the term, and the displacement value encodes the multiplier and the
+    increment. The displacements are bit-packed, so that the hash function takes about log2(16N)
+    bits per bucket. See http://cmph.sourceforge.net/papers/esa09.pdf for details.
+
+    An MPHF maps any string to some slot, so membership has to be verified separately. By default,
+    a 16-bit fingerprint is kept per slot, and an out-of-vocabulary term is mistaken for an indexed
+    one with probability about 1/65536. All in all this takes about 22 bits per term. If exact
+    verification is requested, the terms are instead kept in a table ordered by slot, which costs
+    as much as the terms themselves but also allows mapping identifiers back to terms. Only then
+    can the dictionary be iterated over.
+
+    The dictionary is read-only once built. Adding new terms raises a TypeError.
+
+    The dictionary can be serialized to a flat buffer, and be reconstructed from one without
+    copying, e.g., from a memory-mapped file.
+    """
+
+    # Identifies the serialized format, and the layout of the serialized header: Magic, byte order,
+    # term count, bucket count, hash salt, bits per displacement, and whether verification is exact.
+    MAGIC = b"IN3120H1"
+    HEADER = "=8scIIQBc"
+
+    # The average number of terms per bucket. Fewer buckets means fewer bits per term, but
+    # slower construction.
+    BUCKET_SIZE = 4
+
+    # A displacement value encodes a (multiplier, increment) pair, where the multiplier is drawn
+    # from {0, ..., MULTIPLIERS - 1} and the increment from {0, ..., N - 1}.
+    MULTIPLIERS = 16
+
+    def __init__(self, terms: Iterable[str], exact: bool = False):
+        encoded = sorted({term.encode("utf-8") for term in terms})
+        self.__count = len(encoded)
+        self.__buckets = max(1, -(-self.__count // __class__.BUCKET_SIZE))
+        self.__salt = 0
+        while True:
+            displacements = self.__construct(encoded)
+            if displacements is not None:
+                break
+            self.__salt += 1
+        # Bit-pack the displacements, using just enough bits per displacement for the largest one. Pad
+        # the buffer so that any displacement can be extracted from an 8-byte window.
+        self.__width = max(1, max(displacements, default=0).bit_length())
+        accumulator = 0
+        for displacement in reversed(displacements):
+            accumulator = (accumulator << self.__width) | displacement
+        self.__displacements = accumulator.to_bytes((self.__buckets * self.__width + 7) // 8 + 8, "little")
+        slots = [self.__get_slot(term) for term in encoded]
+        ordered = [b""] * self.__count
+        for (term, slot) in zip(encoded, slots):
+            ordered[slot] = term
+        self.__fingerprints = array("H", [self.__hash(term)[3] for term in ordered])
+        self.__terms = None  # The terms, concatenated in slot order.
+        self.__term_offsets = None  # Where each term starts in the concatenated terms, plus a sentinel.
+        if exact:
+            self.__terms = b"".join(ordered)
+            self.__term_offsets = array("I", itertools.accumulate((len(t) for t in ordered), initial=0))
+
+    def __hash(self, term: bytes) -> Tuple[int, int, int, int]:
+        """
+        Hashes the given term, and returns the term's bucket, its two slot hashes, and its fingerprint.
+        """
+        digest = int.from_bytes(hashlib.blake2b(term, digest_size=16, salt=self.__salt.to_bytes(16, "little")).digest(),
+                                "little")
+        count = max(1, self.__count)
+        return (digest % self.__buckets, (digest >> 32) % count, (digest >> 64) % count, digest >> 112)
+
+    def __construct(self, terms: List[bytes]) -> Optional[List[int]]:
+        """
+        Searches for a displacement value per bucket, such that all terms end up in distinct slots.
+        Returns None if the search fails, in which case we need to retry using a different salt.
+        """
+        buckets = [[] for _ in range(self.__buckets)]
+        for term in terms:
+            (bucket, first, second, _) = self.__hash(term)
+            buckets[bucket].append((first, second))
+        displacements = [0] * self.__buckets
+        occupied = bytearray(self.__count)
+        free = None  # The remaining free slots, once we're down to the buckets having a single term.
+        for bucket in sorted(range(self.__buckets), key=lambda b: len(buckets[b]), reverse=True):
+            if not buckets[bucket]:
+                break
+            if len(buckets[bucket]) == 1:
+                # Any free slot can be reached, so no need to search.
+                if free is None:
+                    free = [slot for slot in range(self.__count) if not occupied[slot]]
+                displacements[bucket] = ((free.pop() - buckets[bucket][0][0]) % self.__count) * __class__.MULTIPLIERS
+                continue
+            for displacement in range(__class__.MULTIPLIERS * self.__count):
+                (increment, multiplier) = divmod(displacement, __class__.MULTIPLIERS)
+                slots = {(first + multiplier * second + increment) % self.__count for (first, second) in buckets[bucket]}
+                if len(slots) == len(buckets[bucket]) and not any(occupied[slot] for slot in slots):
+                    for slot in slots:
+                        occupied[slot] = 1
+                    displacements[bucket] = displacement
+                    break
+            else:
+                return None
+        return displacements
+
+    def __get_slot(self, term: bytes) -> int:
+        """
+        Evaluates the MPHF for the given term.
+        """
+        (bucket, first, second, _) = self.__hash(term)
+        where = bucket * self.__width
+        window = int.from_bytes(self.__displacements[where >> 3:(where >> 3) + 8], "little")
+        displacement = (window >> (where & 7)) & ((1 << self.__width) - 1)
+        (increment, multiplier) = divmod(displacement, __class__.MULTIPLIERS)
+        return (first + multiplier * second + increment) % self.__count
+
+    def __iter__(self):
+        if self.__terms is None:
+            raise TypeError("Iterating over the terms requires exact verification.")
+        return ((self.get_term(term_id), term_id) for term_id in range(self.__count))
+
+    def __repr__(self):
+        if self.__terms is None:
+            return f"{__class__.__name__}(size={self.__count}, exact=False)"
+        return str(dict(self))
+
+    def size(self) -> int:
+        return self.__count
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise TypeError("Can't add terms to a perfect hash dictionary, since it is read-only.")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        if not self.__count:
+            return None
+        key = term.encode("utf-8")
+        slot = self.__get_slot(key)
+        if self.__terms is not None:
+            return slot if self.__terms[self.__term_offsets[slot]:self.__term_offsets[slot + 1]] == key else None
+        return slot if self.__fingerprints[slot] == self.__hash(key)[3] else None
+
+    def get_term(self, term_id: int) -> str:
+        """
+        Returns the term having the given identifier, i.e., the inverse of get_term_id/1. Requires
+        that exact verification is enabled.
+        """
+        if self.__terms is None:
+            raise TypeError("Looking up terms requires exact verification.")
+        if not 0 <= term_id < self.__count:
+            raise KeyError(term_id)
+        return bytes(self.__terms[self.__term_offsets[term_id]:self.__term_offsets[term_id + 1]]).decode("utf-8")
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the hash function and the verification data.
+        """
+        usage = len(self.__displacements)
+        if self.__terms is not None:
+            return usage + len(self.__terms) + self.__term_offsets.itemsize * len(self.__term_offsets)
+        return usage + self.__fingerprints.itemsize * len(self.__fingerprints)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the dictionary into a flat buffer. See also from_bytes/1.
+        """
+        exact = self.__terms is not None
+        sections = [bytes(self.__displacements)]
+        sections.extend([self.__term_offsets.tobytes(), self.__terms] if exact else [self.__fingerprints.tobytes()])
+        header = pack(__class__.HEADER, __class__.MAGIC, sys.byteorder[0].encode("ascii"), self.__count,
+                      self.__buckets, self.__salt, self.__width, b"e" if exact else b"f")
+        return b"".join(section + bytes(-len(section) % 8) for section in [header] + sections)
+
+    @staticmethod
+    def from_bytes(buffer) -> "PerfectHashDictionary":
+        """
+        Reconstructs a dictionary from a buffer produced by to_bytes/0. The buffer is not copied, so
+        it must be kept alive and unmodified for as long as the dictionary is in use.
+        """
+        view = memoryview(buffer)
+        (magic, byteorder, count, buckets, salt, width, exact) = unpack_from(__class__.HEADER, view)
+        if magic != __class__.MAGIC or byteorder != sys.byteorder[0].encode("ascii"):
+            raise IOError("Not a compatible perfect hash dictionary")
+        dictionary = __class__.__new__(__class__)
+        dictionary.__count = count
+        dictionary.__buckets = buckets
+        dictionary.__salt = salt
+        dictionary.__terms = None
+        dictionary.__term_offsets = None
+        dictionary.__fingerprints = None
+        where = -(-calcsize(__class__.HEADER) // 8) * 8
+        dictionary.__width = width
+        length = (buckets * width + 7) // 8 + 8
+        dictionary.__displacements = view[where:where + length]
+        where += -(-length // 8) * 8
+        if exact == b"e":
+            length = 4 * (count + 1)
+            dictionary.__term_offsets = view[where:where + length].cast("I")
+            where += -(-length // 8) * 8
+            dictionary.__terms = view[where:where + dictionary.__term_offsets[count]]
+        else:
+            dictionary.__fingerprints = view[where:where + 2 * count].cast("H")
+        return dictionary
@@ -2,15 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import itertools
+import operator
 from abc import ABC, abstractmethod
+from array import array
 from collections import Counter
-from typing import Iterable, Iterator, List
-from .dictionary import InMemoryDictionary
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .dictionary import Dictionary, FrontCodedDictionary, InMemoryDictionary
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
 from .corpus import Corpus
+from .document import Document
+from .integercodec import IntegerCodec
+from .lrucache import LRUCache
 from .posting import Posting
-from .postinglist import CompressedInMemoryPostingList, InMemoryPostingList, PostingList
+from .ranker import Ranker
+from .postingsmerger import PostingsMerger
+from .postinglist import CompactInMemoryPostingList, CompressedInMemoryPostingList, InMemoryPostingList, PostingList
 
 
 class InvertedIndex(ABC):
@@ -48,6 +57,63 @@ class InvertedIndex(ABC):
         """
         pass
 
+    def get_max_term_frequency(self, term: str) -> int:
+        """
+        Returns the largest term frequency that the given term has in any document, or 0 if
+        the term is not indexed. Used for computing score upper bounds. Implementations are
+        encouraged to precompute this when building the index, as the default implementation
+        scans the posting list.
+        """
+        return max((posting.term_frequency for posting in self.get_postings_iterator(term)), default=0)
+
+    def get_postings_arrays(self, term: str) -> Tuple[array, array]:
+        """
+        Returns the document identifiers and the term frequencies in the term's associated
+        posting list, as two parallel arrays of unsigned integers. Facilitates bulk processing,
+        e.g., term-at-a-time evaluation. The returned arrays must not be modified.
+        """
+        (document_ids, term_frequencies) = (array("I"), array("I"))
+        for posting in self.get_postings_iterator(term):
+            document_ids.append(posting.document_id)
+            term_frequencies.append(posting.term_frequency)
+        return (document_ids, term_frequencies)
+
+    def get_impact_ordered_arrays(self, term: str) -> Tuple[array, array]:
+        """
+        Like get_postings_arrays/1, but with the postings sorted by descending term frequency instead
+        of by document identifier. Postings having the same term frequency are sorted by document
+        identifier. Facilitates evaluation strategies that process the most impactful postings first.
+        The returned arrays must not be modified.
+        """
+        (document_ids, term_frequencies) = self.get_postings_arrays(term)
+        order = sorted(range(len(document_ids)), key=lambda i: (-term_frequencies[i], document_ids[i]))
+        return (array("I", (document_ids[i] for i in order)), array("I", (term_frequencies[i] for i in order)))
+
+    def get_version(self) -> int:
+        """
+        Returns a number that changes whenever the contents of the index change, e.g., when
+        documents are added or deleted. Enables clients to detect that cached information
+        derived from the index is stale. The default is to assume that the index is static.
+        """
+        return 0
+
+    def get_vocabulary(self) -> Iterator[str]:
+        """
+        Returns an iterator over all the indexed terms, i.e., all the terms that have
+        non-empty posting lists. Not all implementations support this.
+        """
+        raise NotImplementedError("Enumerating the vocabulary is not supported.")
+
+    def get_field_lengths(self) -> Dict[str, array]:
+        """
+        Returns the length of each indexed field in each document, i.e., the number of terms
+        that the field contributed to the index. Maps each indexed field to an array of unsigned
+        integers indexed by document identifier, covering all documents in the index. Used for
+        length normalization, e.g., by BM25. The returned arrays must not be modified. Not all
+        implementations support this.
+        """
+        raise NotImplementedError("Field lengths are not supported.")
+
 
 class InMemoryInvertedIndex(InvertedIndex):
     """
@@ -56,24 +122,131 @@ class InMemoryInvertedIndex(InvertedIndex):
     In a serious application we'd have configuration to allow for field-specific NLP,
     scale beyond current memory constraints, have a positional index, and so on.
 
-    If index compression is enabled, only the posting lists are compressed. Dictionary
-    compression is currently not supported.
+    If index compression is enabled, only the posting lists are compressed. Compression can
+    be enabled by passing True (using the default codec), the name of an integer codec (e.g.,
+    "simple8b"), or "auto" to have a codec picked per posting list based on how dense the
+    posting list is. The dictionary can be compressed separately, by having it front coded.
+    Term identifiers are then reassigned once the index has been built, so that they follow
+    the sorted order of the terms.
+
+    Uncompressed posting lists can optionally be made compact, i.e., be stored as arrays
+    of integers instead of as lists of Posting objects.
+
+    Building the index can optionally be spread over several worker processes. The corpus
+    is then split into consecutive ranges of document identifiers that are indexed in
+    parallel, and the resulting partial posting lists are merged in document order. The
+    result is identical to that of a sequential build, including how term identifiers are
+    assigned. The normalizer and tokenizer must be picklable for this to work.
+
+    After the index has been built, documents can be added and deleted incrementally. Added
+    documents get their postings appended to the existing posting lists. Deleted documents
+    are recorded as tombstones in a bitmap, and are skipped when iterating over the posting
+    lists. Their postings are not purged until compact/0 is invoked, and until then they are
+    still counted when reporting document frequencies.
+
+    The length of each indexed field in each document is recorded while indexing, for rankers
+    that do length normalization.
+
+    Compressed posting lists have to be decoded every time they are traversed. To avoid this for
+    frequently queried terms, a memory-bounded cache of decoded posting lists can be enabled by
+    passing a nonzero cache size in bytes. A posting list is admitted into the cache once its term
+    has been requested CACHE_ADMISSION_THRESHOLD times, so that cold terms stay compressed and
+    don't push hot terms out of the cache. Cached posting lists are evicted in least recently used
+    order, and are invalidated when the posting lists change.
+
+    Optionally, each posting list can additionally be kept in impact order, i.e., sorted by
+    descending term frequency. This doubles the memory spent on postings, but enables query
+    evaluators to process the most impactful postings first and terminate early.
+
+    Optionally, the term frequencies can be replaced by precomputed impacts once the index has been
+    built. The impacts are the per-posting scores of a chosen scoring model, given as a factory that
+    creates a ranker over the index, e.g., BM25Ranker. The ranker has to be able to score postings
+    in bulk, and its scores have to be non-negative and add up over the query terms. The impacts
+    are quantized to 8 bits, i.e., to integers in the range [0, 255], and are stored in the posting
+    lists where the term frequencies would otherwise be. Ranking by the summed up impacts, e.g.,
+    using SimpleRanker, then approximates ranking by the scoring model using integer additions
+    only. Multiply by get_impact_scale/0 to get back to the scale of the scoring model. Documents
+    cannot be added to an index that holds impacts.
     """
 
+    class LivePostingsIterator(Iterator[Posting]):
+        """
+        Wraps a posting list iterator, and skips postings for documents that have been deleted.
+        Skipping ahead via advance_to/1 is delegated to the wrapped iterator.
+        """
+
+        def __init__(self, iterator: Iterator[Posting], deleted: bytearray):
+            self.__iterator = iterator
+            self.__deleted = deleted
+
+        def __next__(self) -> Posting:
+            posting = next(self.__iterator)
+            while InMemoryInvertedIndex.is_marked(self.__deleted, posting.document_id):
+                posting = next(self.__iterator)
+            return posting
+
+        def __length_hint__(self) -> int:
+            return operator.length_hint(self.__iterator)
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Moves the iterator forward and returns the first remaining live posting having a
+            document identifier that is equal to or larger than the given one, if any.
+            """
+            posting = PostingsMerger.advance_to(self.__iterator, document_id)
+            while posting and InMemoryInvertedIndex.is_marked(self.__deleted, posting.document_id):
+                posting = next(self.__iterator, None)
+            return posting
+
+    # The number of ranges per worker process, when building in parallel. Having several
+    # ranges per worker evens out the load if some ranges take longer to index than others.
+    RANGES_PER_WORKER = 4
+
+    # The number of times a term has to be requested before its decoded posting list is cached.
+    CACHE_ADMISSION_THRESHOLD = 2
+
     def __init__(
         self,
         corpus: Corpus,
         fields: Iterable[str],
         normalizer: Normalizer,
         tokenizer: Tokenizer,
-        compressed: bool = False,
+        compressed: Union[bool, str] = False,
+        compact: bool = False,
+        workers: int = 1,
+        front_coded: bool = False,
+        cache_size: int = 0,
+        impact_ordered: bool = False,
+        impact_model: Optional[Callable[[InvertedIndex], Ranker]] = None,
     ):
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
         self.__posting_lists: List[PostingList] = []
-        self.__dictionary = InMemoryDictionary()
-        self.__build_index(fields, compressed)
+        self.__max_term_frequencies = array("I")  # The largest term frequency per term, for upper bounds.
+        self.__dictionary: Dictionary = InMemoryDictionary()
+        self.__codecs: Dict[str, IntegerCodec] = {}
+        self.__compact = compact
+        self.__compressed = compressed
+        self.__fields = list(fields)
+        self.__field_lengths = {f: array("I") for f in self.__fields}  # Per field, the number of terms per document.
+        self.__document_count = 0  # Includes deleted documents.
+        self.__deleted = bytearray()  # One bit per document, set if the document is deleted.
+        self.__deleted_count = 0
+        self.__version = 0  # Bumped whenever the index is modified after having been built.
+        self.__cache = LRUCache(cache_size, weigher=__class__.__weigh) if cache_size and compressed else None
+        self.__request_counts = array("I")  # The number of times each term has been requested, for cache admission.
+        self.__impact_ordered: Optional[List[Optional[Tuple[array, array]]]] = None  # Per term, None if stale.
+        self.__impact_scale: Optional[float] = None  # The score that one unit of impact represents, if any.
+        self.__build_index(self.__fields, compressed, workers)
+        if front_coded:
+            self.__compress_dictionary()
+        if impact_model:
+            self.__quantize_impacts(impact_model(self))
+        if impact_ordered:
+            self.__impact_ordered = [None] * len(self.__posting_lists)
+            for (term, term_id) in self.__dictionary:
+                self.__impact_ordered[term_id] = super().get_impact_ordered_arrays(term)
 
     def __repr__(self):
         # print("hey")
@@ -82,24 +255,272 @@ class InMemoryInvertedIndex(InvertedIndex):
         
         return str({term: list(self.__posting_lists[term_id]) for (term, term_id) in self.__dictionary})
 
-    def __build_index(self, fields: Iterable[str], compressed: bool) -> None:
-      
-      for i, c in enumerate(self.__corpus):
-          assert i == c.document_id, "document_id is not equal to i"
+    def __build_index(self, fields: List[str], compressed: Union[bool, str], workers: int) -> None:
+        if workers > 1:
+            self.__build_index_in_parallel(fields, compressed, workers)
+        else:
+            for i, c in enumerate(self.__corpus):
+                assert i == c.document_id, "document_id is not equal to i"
+
+                terms = []
+                for f in fields:
+                    length = len(terms)
+                    terms.extend(self.get_terms(c.get_field(f, None)))
+                    self.__field_lengths[f].append(len(terms) - length)
+
+                for k, v in Counter(terms).items():
+                    self.__append_posting(k, Posting(i, v), compressed)
+
+        self.__document_count = len(self.__corpus)
+
+        for posting_list in self.__posting_lists:
+            posting_list.finalize_postings()
+
+        if compressed == "auto":
+            for posting_list in self.__posting_lists:
+                posting_list.recompress(self.__get_codec(IntegerCodec.choose(len(posting_list), len(self.__corpus))))
+
+    def __build_index_in_parallel(self, fields: List[str], compressed: Union[bool, str], workers: int) -> None:
+        """
+        Indexes consecutive ranges of the corpus in separate worker processes, and merges the
+        partial posting lists. The ranges are merged in order, and each range lists its terms in
+        order of first appearance, so terms get the same identifiers as in a sequential build.
+        """
+        size = len(self.__corpus)
+        step = max(1, -(-size // (workers * self.RANGES_PER_WORKER)))
+        ranges = []
+        for start in range(0, size, step):
+            documents = [self.__corpus[i] for i in range(start, min(size, start + step))]
+            assert all(start + i == d.document_id for (i, d) in enumerate(documents)), "document_id is not equal to i"
+            ranges.append([[d.get_field(f, None) for f in fields] for d in documents])
+        starts = range(0, size, step)
+        merged: Dict[str, Tuple[List[array], List[array]]] = {}  # Per term, the partial arrays in range order.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(_index_documents, ranges, starts, itertools.repeat(self.__normalizer),
+                                    itertools.repeat(self.__tokenizer))
+            for (partial, field_lengths) in partials:
+                for (f, lengths) in zip(fields, field_lengths):
+                    self.__field_lengths[f].extend(lengths)
+                for (term, document_ids, term_frequencies) in partial:
+                    (all_document_ids, all_term_frequencies) = merged.setdefault(term, ([], []))
+                    all_document_ids.append(document_ids)
+                    all_term_frequencies.append(term_frequencies)
+        for (term, (all_document_ids, all_term_frequencies)) in merged.items():
+            self.__append_postings(term, array("I", b"".join(all_document_ids)),
+                                   array("I", b"".join(all_term_frequencies)), compressed)
+
+    def __append_posting(self, term: str, posting: Posting, compressed: Union[bool, str]) -> int:
+        """
+        Appends the given posting to the term's posting list, creating the posting list if needed,
+        and keeps track of the term's largest term frequency. Returns the term's identifier.
+        """
+        term_id = self.__add_term(term, compressed)
+        self.__posting_lists[term_id].append_posting(posting)
+        if posting.term_frequency > self.__max_term_frequencies[term_id]:
+            self.__max_term_frequencies[term_id] = posting.term_frequency
+        return term_id
+
+    def __append_postings(self, term: str, document_ids: array, term_frequencies: array,
+                          compressed: Union[bool, str]) -> int:
+        """
+        Like __append_posting/3, but appends a run of postings given as parallel arrays.
+        """
+        term_id = self.__add_term(term, compressed)
+        self.__posting_lists[term_id].append_postings(document_ids, term_frequencies)
+        self.__max_term_frequencies[term_id] = max(self.__max_term_frequencies[term_id], max(term_frequencies, default=0))
+        return term_id
+
+    def __add_term(self, term: str, compressed: Union[bool, str]) -> int:
+        """
+        Returns the given term's identifier, adding the term and an empty posting list if needed.
+        """
+        term_id = self.__dictionary.add_if_absent(term)
+        if len(self.__posting_lists) == term_id:
+            self.__posting_lists.append(self.__create_posting_list(compressed))
+            self.__max_term_frequencies.append(0)
+        return term_id
+
+    def __quantize_impacts(self, ranker: Ranker) -> None:
+        """
+        Replaces the term frequencies with quantized impacts, as computed by the given ranker. The first
+        pass finds the largest impact, which is mapped to the largest quantized value. The second pass
+        rebuilds the posting lists. Computing the impacts twice avoids keeping them all in memory.
+        """
+        def impacts(term_id: int, term: str) -> Tuple[np.ndarray, np.ndarray]:
+            (document_ids, term_frequencies) = self.__posting_lists[term_id].get_arrays()
+            document_ids = np.frombuffer(document_ids, dtype=np.uint32)
+            scores = ranker.contributions(term, 1, document_ids, np.frombuffer(term_frequencies, dtype=np.uint32))
+            assert scores is not None, "the ranker can't score postings in bulk"
+            return (document_ids, ranker.finalize_scores(document_ids, scores))
+
+        largest = max((float(impacts(term_id, term)[1].max(initial=0.0)) for (term, term_id) in self.__dictionary),
+                      default=0.0)
+        self.__impact_scale = largest / 255 if largest > 0.0 else 1.0
+        for (term, term_id) in self.__dictionary:
+            (document_ids, scores) = impacts(term_id, term)
+            quantized = np.clip(np.rint(scores / self.__impact_scale), 0, 255).astype(np.uint32)
+            posting_list = self.__create_posting_list(self.__compressed)
+            for (document_id, impact) in zip(document_ids.tolist(), quantized.tolist()):
+                posting_list.append_posting(Posting(document_id, impact))
+            posting_list.finalize_postings()
+            if self.__compressed == "auto":
+                posting_list.recompress(self.__get_codec(IntegerCodec.choose(len(posting_list), len(self.__corpus))))
+            self.__posting_lists[term_id] = posting_list
+            self.__max_term_frequencies[term_id] = int(quantized.max(initial=0))
+        if self.__cache is not None:
+            self.__cache.clear()
+
+    def get_impact_scale(self) -> Optional[float]:
+        """
+        Returns the score that one unit of quantized impact represents, if the index holds impacts
+        instead of term frequencies. Returns None otherwise.
+        """
+        return self.__impact_scale
+
+    def __compress_dictionary(self) -> None:
+        """
+        Replaces the dictionary with a front coded one. This reassigns the term identifiers, so
+        the posting lists are permuted accordingly.
+        """
+        dictionary = FrontCodedDictionary(term for (term, _) in self.__dictionary)
+        permutation = [self.__dictionary.get_term_id(term) for (term, _) in dictionary]
+        self.__posting_lists = [self.__posting_lists[term_id] for term_id in permutation]
+        self.__max_term_frequencies = array("I", (self.__max_term_frequencies[term_id] for term_id in permutation))
+        self.__dictionary = dictionary
+
+    def __create_posting_list(self, compressed: Union[bool, str]) -> PostingList:
+        """
+        Creates a new and empty posting list, compressed or not.
+        """
+        if not compressed:
+            return CompactInMemoryPostingList() if self.__compact else InMemoryPostingList()
+        if compressed is True or compressed == "auto":
+            return CompressedInMemoryPostingList()
+        return CompressedInMemoryPostingList(self.__get_codec(compressed))
 
-          terms = []
-          for f in fields:
-            terms.extend(self.get_terms(c.get_field(f, None)))
+    def __get_codec(self, name: str) -> IntegerCodec:
+        """
+        Returns the named codec. Codecs are stateless, so all posting lists can share instances.
+        """
+        if name not in self.__codecs:
+            self.__codecs[name] = IntegerCodec.create(name)
+        return self.__codecs[name]
 
-          for k, v in Counter(terms).items():
-              
-              term_id = self.__dictionary.add_if_absent(k)
+    @staticmethod
+    def __weigh(arrays: Tuple[array, array]) -> int:
+        """
+        Returns the number of bytes occupied by a decoded posting list.
+        """
+        return sum(a.itemsize * len(a) for a in arrays)
 
-              if len(self.__posting_lists) == term_id:
-                  self.__posting_lists.append(compressed and CompressedInMemoryPostingList() or InMemoryPostingList())
+    def __get_decoded(self, term_id: int) -> Optional[Tuple[array, array]]:
+        """
+        Returns the given term's decoded posting list from the cache, decoding and caching it first if
+        the term is hot enough. Returns None if the posting list is not cached and should be traversed
+        in compressed form.
+        """
+        arrays = self.__cache.get(term_id)
+        if arrays is not None:
+            return arrays
+        if len(self.__request_counts) <= term_id:
+            self.__request_counts.extend([0] * (len(self.__posting_lists) - len(self.__request_counts)))
+        self.__request_counts[term_id] = min(self.__request_counts[term_id] + 1, self.CACHE_ADMISSION_THRESHOLD)
+        if self.__request_counts[term_id] < self.CACHE_ADMISSION_THRESHOLD:
+            return None
+        arrays = self.__posting_lists[term_id].get_arrays()
+        self.__cache.put(term_id, arrays)
+        return arrays
 
-              self.__posting_lists[term_id].append_posting(Posting(i, v))
+    def get_cache_statistics(self) -> Optional[Dict[str, int]]:
+        """
+        Returns the statistics of the cache of decoded posting lists, or None if there is no such
+        cache. See LRUCache.get_statistics/0. The weight is the number of bytes in use.
+        """
+        return None if self.__cache is None else self.__cache.get_statistics()
 
+    @staticmethod
+    def is_marked(bitmap: bytearray, document_id: int) -> bool:
+        """
+        Returns True iff the bit for the given document identifier is set in the given bitmap.
+        """
+        return (document_id >> 3) < len(bitmap) and bool(bitmap[document_id >> 3] & (1 << (document_id & 7)))
+
+    def add_document(self, document: Document) -> None:
+        """
+        Indexes the given document, without having to rebuild the index. The document should
+        already have been added to the corpus, and document identifiers must be assigned in
+        sequence, i.e., the document must be the last one in the corpus.
+        """
+        assert document.document_id == self.__document_count, "document_id is not the next in sequence"
+        assert self.__impact_scale is None, "can't add documents to an index that holds impacts"
+        terms = []
+        for f in self.__fields:
+            length = len(terms)
+            terms.extend(self.get_terms(document.get_field(f, None)))
+            self.__field_lengths[f].append(len(terms) - length)
+        for (term, term_frequency) in Counter(terms).items():
+            term_id = self.__append_posting(term, Posting(document.document_id, term_frequency), self.__compressed)
+            if self.__cache is not None:
+                self.__cache.remove(term_id)
+            if self.__impact_ordered is not None:
+                self.__impact_ordered.extend([None] * (len(self.__posting_lists) - len(self.__impact_ordered)))
+                self.__impact_ordered[term_id] = None
+        self.__document_count += 1
+        self.__version += 1
+
+    def delete_document(self, document_id: int) -> None:
+        """
+        Marks the given document as deleted, so that it no longer shows up in any posting lists.
+        Deleting an already deleted document has no effect.
+        """
+        assert 0 <= document_id < self.__document_count, "document_id is out of range"
+        if self.is_marked(self.__deleted, document_id):
+            return
+        if len(self.__deleted) <= document_id >> 3:
+            self.__deleted.extend(bytes((document_id >> 3) + 1 - len(self.__deleted)))
+        self.__deleted[document_id >> 3] |= 1 << (document_id & 7)
+        self.__deleted_count += 1
+        self.__version += 1
+
+    def is_deleted(self, document_id: int) -> bool:
+        """
+        Returns True iff the given document has been deleted.
+        """
+        return self.is_marked(self.__deleted, document_id)
+
+    def compact(self) -> None:
+        """
+        Purges the postings of all deleted documents from the posting lists, and clears the
+        tombstones. Document identifiers are not reassigned.
+        """
+        if not self.__deleted_count:
+            return
+        for (term_id, posting_list) in enumerate(self.__posting_lists):
+            purged = self.__create_posting_list(self.__compressed)
+            self.__max_term_frequencies[term_id] = 0
+            for posting in self.LivePostingsIterator(iter(posting_list), self.__deleted):
+                purged.append_posting(posting)
+                self.__max_term_frequencies[term_id] = max(self.__max_term_frequencies[term_id], posting.term_frequency)
+            purged.finalize_postings()
+            if self.__compressed == "auto":
+                purged.recompress(self.__get_codec(IntegerCodec.choose(len(purged), self.__document_count)))
+            self.__posting_lists[term_id] = purged
+        self.__deleted = bytearray()
+        self.__deleted_count = 0
+        self.__version += 1  # Document frequencies change.
+        if self.__cache is not None:
+            self.__cache.clear()
+        if self.__impact_ordered is not None:
+            self.__impact_ordered = [None] * len(self.__posting_lists)
+
+    def get_version(self) -> int:
+        return self.__version
+
+    def get_field_lengths(self) -> Dict[str, array]:
+        return dict(self.__field_lengths)
+
+    def get_vocabulary(self) -> Iterator[str]:
+        return (term for (term, term_id) in self.__dictionary if len(self.__posting_lists[term_id]) > 0)
 
     # done
     def get_terms(self, buffer: str) -> Iterator[str]:
@@ -117,15 +538,59 @@ class InMemoryInvertedIndex(InvertedIndex):
         # print(self.__dictionary.get_term_id(term))
         # print("term:", term, end="")
         
-        if (id := self.__dictionary.get_term_id(term) != None):
+        if (id := self.__dictionary.get_term_id(term)) is not None:
             # print("yes.", term)
-            return iter(self.__posting_lists[id])
+            arrays = self.__get_decoded(id) if self.__cache is not None else None
+            if arrays is not None:
+                iterator = CompactInMemoryPostingList.CompactInMemoryPostingListIterator(*arrays)
+            else:
+                iterator = iter(self.__posting_lists[id])
+            if self.__deleted_count:
+                return self.LivePostingsIterator(iterator, self.__deleted)
+            return iterator
         # print()
         
-        return []
+        return iter([])
     
         # raise NotImplementedError("You need to implement this as part of the assignment.")
 
+    def get_postings_arrays(self, term: str) -> Tuple[array, array]:
+        term_id = self.__dictionary.get_term_id(term)
+        if term_id is None:
+            return (array("I"), array("I"))
+        if self.__deleted_count:
+            return super().get_postings_arrays(term)
+        arrays = self.__get_decoded(term_id) if self.__cache is not None else None
+        return arrays if arrays is not None else self.__posting_lists[term_id].get_arrays()
+
+    def get_impact_ordered_arrays(self, term: str) -> Tuple[array, array]:
+        term_id = self.__dictionary.get_term_id(term)
+        if term_id is None or self.__impact_ordered is None:
+            return super().get_impact_ordered_arrays(term)
+        if self.__impact_ordered[term_id] is None:  # Stale, since postings have been appended.
+            self.__impact_ordered[term_id] = super().get_impact_ordered_arrays(term)
+        if self.__deleted_count:
+            return self.__drop_deleted(*self.__impact_ordered[term_id])
+        return self.__impact_ordered[term_id]
+
+    def __drop_deleted(self, document_ids: array, term_frequencies: array) -> Tuple[array, array]:
+        """
+        Returns copies of the given parallel arrays, without the entries for deleted documents.
+        The order of the remaining entries is preserved.
+        """
+        document_ids = np.frombuffer(document_ids, dtype=np.uint32)
+        bitmap = np.frombuffer(bytes(self.__deleted), dtype=np.uint8)
+        slots = document_ids >> 3
+        in_range = slots < len(bitmap)
+        deleted = in_range & ((bitmap[np.where(in_range, slots, 0)] >> (document_ids & 7)) & 1).astype(bool)
+        live = ~deleted
+        return (array("I", document_ids[live].tobytes()),
+                array("I", np.frombuffer(term_frequencies, dtype=np.uint32)[live].tobytes()))
+
+    def get_max_term_frequency(self, term: str) -> int:
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__max_term_frequencies[term_id]
+
     # 
     def get_document_frequency(self, term: str) -> int:
         
@@ -135,4 +600,31 @@ class InMemoryInvertedIndex(InvertedIndex):
             return len(self.__posting_lists[id])
         
         return 0
-        # raise NotImplementedError("You need to implement this as part of the assignment.")
\ No newline at end of file
+        # raise NotImplementedError("You need to implement this as part of the assignment.")
+
+
+def _index_documents(documents: Sequence[Sequence[Optional[str]]], start: int, normalizer: Normalizer,
+                     tokenizer: Tokenizer) -> Tuple[List[Tuple[str, array, array]], List[array]]:
+    """
+    Builds partial posting lists for a range of consecutive documents, where the first document
+    has the given identifier. Each document is given as the contents of its indexed fields. Runs
+    in a worker process when building an index in parallel, so must be defined at module level.
+
+    Returns a list of (term, document identifiers, term frequencies) triples, where the terms
+    appear in the order they are first seen in the range, together with the field lengths of
+    the documents in the range, one array per field.
+    """
+    partial: Dict[str, Tuple[array, array]] = {}
+    field_lengths = [array("I") for _ in (documents[0] if documents else [])]
+    for (i, buffers) in enumerate(documents, start):
+        terms = []
+        for (lengths, buffer) in zip(field_lengths, buffers):
+            length = len(terms)
+            terms.extend(tokenizer.strings(normalizer.canonicalize(normalizer.normalize(buffer))))
+            lengths.append(len(terms) - length)
+        for (term, term_frequency) in Counter(terms).items():
+            (document_ids, term_frequencies) = partial.setdefault(term, (array("I"), array("I")))
+            document_ids.append(i)
+            term_frequencies.append(term_frequency)
+    postings = [(term, document_ids, term_frequencies) for (term, (document_ids, term_frequencies)) in partial.items()]
+    return (postings, field_lengths)
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A simple size-bounded cache with least recently used (LRU) eviction, where entries can
+    optionally also expire after a fixed time-to-live (TTL). Safe to use from multiple threads.
+
+    By default the capacity is the maximum number of entries. If a weigher is supplied, the
+    capacity is instead the maximum total weight of the entries, e.g., their memory usage in
+    bytes. Values that weigh more than the capacity on their own are not cached.
+
+    The cache keeps track of how many lookups that were hits and misses, and how many entries
+    that were evicted or expired. This facilitates monitoring and tuning.
+    """
+
+    def __init__(self, capacity: int, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 weigher: Optional[Callable[[Any], int]] = None):
+        assert capacity > 0
+        assert ttl is None or ttl > 0
+        self.__capacity = capacity
+        self.__ttl = ttl  # In seconds, as measured by the clock. None means that entries never expire.
+        self.__clock = clock
+        self.__weigher = weigher or (lambda _: 1)
+        self.__weight = 0  # The total weight of all entries.
+        self.__entries: OrderedDict = OrderedDict()  # Maps keys to (value, expiry, weight) triples, most recently used last.
+        self.__lock = threading.Lock()
+        self.__statistics = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            return self.__lookup(key) is not None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value cached for the given key, or the given default if the key is not in
+        the cache or the entry has expired. A hit makes the entry the most recently used one.
+        """
+        with self.__lock:
+            entry = self.__lookup(key)
+            if entry is None:
+                self.__statistics["misses"] += 1
+                return default
+            self.__statistics["hits"] += 1
+            self.__entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Caches the given value for the given key, replacing any existing entry. If the cache is
+        full, the least recently used entry is evicted to make room.
+        """
+        weight = self.__weigher(value)
+        with self.__lock:
+            self.__remove(key)
+            if weight > self.__capacity:
+                return
+            expiry = None if self.__ttl is None else self.__clock() + self.__ttl
+            self.__entries[key] = (value, expiry, weight)
+            self.__weight += weight
+            while self.__weight > self.__capacity:
+                (_, (_, _, evicted)) = self.__entries.popitem(last=False)
+                self.__weight -= evicted
+                self.__statistics["evictions"] += 1
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Removes the entry for the given key, if any.
+        """
+        with self.__lock:
+            self.__remove(key)
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache. The statistics are left as-is.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__weight = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns the number of hits, misses, evictions and expirations so far, together with the
+        current number of entries and their total weight.
+        """
+        with self.__lock:
+            return dict(self.__statistics, size=len(self.__entries), weight=self.__weight)
+
+    def __lookup(self, key: Hashable) -> Optional[tuple]:
+        """
+        Returns the (value, expiry, weight) triple for the given key, if any. Purges the entry if
+        it has expired. Assumes that the caller holds the lock.
+        """
+        entry = self.__entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.__clock():
+            self.__remove(key)
+            self.__statistics["expirations"] += 1
+            return None
+        return entry
+
+    def __remove(self, key: Hashable) -> None:
+        """
+        Does the work of remove/1. Assumes that the caller holds the lock.
+        """
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__weight -= entry[2]
@@ -0,0 +1,206 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import mmap
+import sys
+from array import array
+from struct import calcsize, pack, unpack_from
+from typing import Dict, Iterator, List, Optional, Tuple
+from .integercodec import IntegerCodec
+from .invertedindex import InvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .postinglist import CompressedInMemoryPostingList
+from .tokenizer import Tokenizer
+
+
+class InvertedIndexWriter:
+    """
+    Serializes an inverted index into a single segment file, so that it can later be opened
+    near-instantly as a MemoryMappedInvertedIndex instead of having to be rebuilt from the
+    corpus. The posting lists are stored using the same block format as is used by the
+    CompressedInMemoryPostingList class.
+
+    The layout of a segment file is as follows, where all integers are unsigned and stored
+    using the native byte order of the writing machine:
+
+        * A fixed-size header, see below.
+        * The names of the codecs in use, separated by newlines.
+        * The sorted terms, UTF-8 encoded and concatenated.
+        * The offsets where each term starts in the concatenated terms, plus a sentinel.
+        * Per term: The block headers followed by the encoded blocks.
+        * Per term: The posting list length, the block count, the size of the encoded data,
+          the codec identifier, and the location of the term's block headers in the file.
+        * The names of the indexed fields, separated by newlines.
+        * Per field: The length of the field in each document, indexed by document identifier.
+
+    Sections are padded so that they start on 8-byte boundaries.
+    """
+
+    # Identifies the file type and version.
+    MAGIC = b"IN3120S2"
+
+    # Magic, byte order, block size, term count, document count, and the (offset, length) pairs
+    # for the codecs, terms, term offsets, per-term entries, field names, and field lengths sections.
+    HEADER = "=8s8sIII" + "QQ" * 6
+
+    @staticmethod
+    def write(inverted_index: InvertedIndex, filename: str, compressed: str = "vbyte") -> None:
+        """
+        Writes the given inverted index to the named file, overwriting any existing file. The
+        inverted index must support enumerating its vocabulary and reporting its field lengths,
+        or else NotImplementedError is raised before the file is touched. The posting lists get
+        compressed using the named codec, or "auto" to have a codec picked per posting list.
+        """
+        terms = sorted(inverted_index.get_vocabulary(), key=lambda t: t.encode("utf-8"))
+        field_lengths = inverted_index.get_field_lengths()
+        posting_lists = []
+        universe = 0
+        for term in terms:
+            posting_list = CompressedInMemoryPostingList(None if compressed == "auto" else IntegerCodec.create(compressed))
+            for posting in inverted_index.get_postings_iterator(term):
+                posting_list.append_posting(posting)
+            posting_list.finalize_postings()
+            posting_lists.append(posting_list)
+            if len(posting_list) > 0:
+                universe = max(universe, posting_list.get_buffers()[1][-1] + 1)
+        if compressed == "auto":
+            for posting_list in posting_lists:
+                posting_list.recompress(IntegerCodec.create(IntegerCodec.choose(len(posting_list), universe)))
+        codecs = sorted({posting_list.get_codec().name for posting_list in posting_lists})
+        with open(filename, "wb") as f:
+            f.write(bytes(calcsize(__class__.HEADER)))
+            sections = [__class__.__write_section(f, "\n".join(codecs).encode("utf-8"))]
+            encoded = [term.encode("utf-8") for term in terms]
+            sections.append(__class__.__write_section(f, b"".join(encoded)))
+            offsets = array("I", [0])
+            for term in encoded:
+                offsets.append(offsets[-1] + len(term))
+            sections.append(__class__.__write_section(f, offsets.tobytes()))
+            lengths, blocks, sizes, codec_ids, locations = array("I"), array("I"), array("I"), array("I"), array("Q")
+            for posting_list in posting_lists:
+                (data, last_document_ids, block_offsets) = posting_list.get_buffers()
+                lengths.append(len(posting_list))
+                blocks.append(len(block_offsets))
+                sizes.append(len(data))
+                codec_ids.append(codecs.index(posting_list.get_codec().name))
+                locations.append(__class__.__write_section(f, last_document_ids.tobytes() + block_offsets.tobytes())[0])
+                f.write(data)
+            entries = b"".join(a.tobytes() for a in (lengths, blocks, sizes, codec_ids, locations))
+            sections.append(__class__.__write_section(f, entries))
+            document_count = max((len(lengths) for lengths in field_lengths.values()), default=0)
+            sections.append(__class__.__write_section(f, "\n".join(field_lengths).encode("utf-8")))
+            padded = [array("I", lengths) + array("I", bytes(4 * (document_count - len(lengths))))
+                      for lengths in field_lengths.values()]
+            sections.append(__class__.__write_section(f, b"".join(lengths.tobytes() for lengths in padded)))
+            f.seek(0)
+            byteorder = sys.byteorder.encode("ascii").ljust(8)
+            f.write(pack(__class__.HEADER, __class__.MAGIC, byteorder, CompressedInMemoryPostingList.BLOCK_SIZE,
+                         len(terms), document_count, *(n for section in sections for n in section)))
+
+    @staticmethod
+    def __write_section(f, data: bytes) -> Tuple[int, int]:
+        """
+        Pads the file to the next 8-byte boundary, and then writes the given data. Returns the
+        (offset, length) pair that locates the written data.
+        """
+        f.write(bytes(-f.tell() % 8))
+        offset = f.tell()
+        f.write(data)
+        return (offset, len(data))
+
+
+class MemoryMappedInvertedIndex(InvertedIndex):
+    """
+    A read-only inverted index backed by a segment file as produced by InvertedIndexWriter.
+
+    The segment file is memory-mapped, so opening it is near-instant regardless of its size,
+    and the operating system's page cache takes care of keeping the hot parts resident. Terms
+    are looked up by doing binary search over the sorted term table, and posting lists are
+    decoded straight out of the mapped buffer without copying them first.
+
+    The normalizer and tokenizer need to be the same as the ones used when building the index
+    that was written to the segment file.
+    """
+
+    def __init__(self, filename: str, normalizer: Normalizer, tokenizer: Tokenizer):
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        with open(filename, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__buffer = memoryview(self.__mmap)
+        (magic, byteorder, block_size, term_count, document_count, *sections) = unpack_from(InvertedIndexWriter.HEADER, self.__mmap)
+        if magic != InvertedIndexWriter.MAGIC:
+            raise IOError("Not a segment file")
+        if byteorder.decode("ascii").strip() != sys.byteorder:
+            raise IOError("Segment file has an incompatible byte order")
+        if block_size != CompressedInMemoryPostingList.BLOCK_SIZE:
+            raise IOError("Segment file has an incompatible block size")
+        sections = [self.__buffer[sections[i]:sections[i] + sections[i + 1]] for i in range(0, len(sections), 2)]
+        (codecs, self.__terms, term_offsets, entries, fields, field_lengths) = sections
+        self.__codecs: List[IntegerCodec] = [IntegerCodec.create(n) for n in bytes(codecs).decode("utf-8").split("\n") if n]
+        self.__term_offsets = term_offsets.cast("I")
+        self.__term_count = term_count
+        word = 4 * term_count
+        self.__lengths = entries[0:word].cast("I")
+        self.__blocks = entries[word:2 * word].cast("I")
+        self.__sizes = entries[2 * word:3 * word].cast("I")
+        self.__codec_ids = entries[3 * word:4 * word].cast("I")
+        self.__locations = entries[4 * word:].cast("Q")
+        fields = [n for n in bytes(fields).decode("utf-8").split("\n") if n]
+        self.__field_lengths = {f: field_lengths[4 * document_count * i:4 * document_count * (i + 1)].cast("I")
+                                for (i, f) in enumerate(fields)}
+
+    def close(self) -> None:
+        """
+        Unmaps the segment file. Any outstanding posting list iterators must have been released
+        before doing so, and the index cannot be used afterwards.
+        """
+        for view in (self.__term_offsets, self.__lengths, self.__blocks, self.__sizes, self.__codec_ids,
+                     self.__locations, *self.__field_lengths.values(), self.__terms, self.__buffer):
+            view.release()
+        self.__mmap.close()
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        """
+        Looks up the given term in the sorted term table, using binary search. Returns the
+        term's identifier, or None if the term is not indexed.
+        """
+        key = term.encode("utf-8")
+        (low, high) = (0, self.__term_count)
+        while low < high:
+            middle = (low + high) // 2
+            probe = self.__terms[self.__term_offsets[middle]:self.__term_offsets[middle + 1]].tobytes()
+            if probe < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.__term_count and self.__terms[self.__term_offsets[low]:self.__term_offsets[low + 1]] == key:
+            return low
+        return None
+
+    def get_vocabulary(self) -> Iterator[str]:
+        for term_id in range(self.__term_count):
+            yield self.__terms[self.__term_offsets[term_id]:self.__term_offsets[term_id + 1]].tobytes().decode("utf-8")
+
+    def get_field_lengths(self) -> Dict[str, array]:
+        return {field: array("I", lengths) for (field, lengths) in self.__field_lengths.items()}
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        return iter(self.__tokenizer.strings(self.__normalizer.canonicalize(self.__normalizer.normalize(buffer))))
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            return iter([])
+        blocks = self.__blocks[term_id]
+        location = self.__locations[term_id]
+        headers = self.__buffer[location:location + 8 * blocks].cast("I")
+        data = self.__buffer[location + 8 * blocks:location + 8 * blocks + self.__sizes[term_id]]
+        return CompressedInMemoryPostingList.CompressedInMemoryPostingListIterator(
+            data, headers[:blocks], headers[blocks:], self.__lengths[term_id],
+            self.__codecs[self.__codec_ids[term_id]], array("I"), array("I"))
+
+    def get_document_frequency(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        return 0 if term_id is None else self.__lengths[term_id]
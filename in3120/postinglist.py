@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
-from typing import Iterator, List
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
 from .posting import Posting
-from .variablebytecodec import VariableByteCodec
+from .integercodec import IntegerCodec, VariableByteIntegerCodec
 
 
 class PostingList(ABC):
@@ -39,6 +42,15 @@ class PostingList(ABC):
         """
         pass
 
+    def append_postings(self, document_ids: array, term_frequencies: array) -> None:
+        """
+        Appends a run of postings to the posting list, given as two parallel arrays of unsigned
+        integers sorted by document identifier. Facilitates bulk loading, e.g., when merging
+        partial posting lists.
+        """
+        for (document_id, term_frequency) in zip(document_ids, term_frequencies):
+            self.append_posting(Posting(document_id, term_frequency))
+
     @abstractmethod
     def finalize_postings(self) -> None:
         """
@@ -48,12 +60,81 @@ class PostingList(ABC):
         """
         pass
 
+    def get_arrays(self) -> Tuple[array, array]:
+        """
+        Returns the document identifiers and the term frequencies of all the postings, as two
+        parallel arrays of unsigned integers. Facilitates bulk processing, e.g., vectorized
+        scoring. The returned arrays might be shared with the posting list, and must not be
+        modified by the caller.
+        """
+        (document_ids, term_frequencies) = (array("I"), array("I"))
+        for posting in self.get_iterator():
+            document_ids.append(posting.document_id)
+            term_frequencies.append(posting.term_frequency)
+        return (document_ids, term_frequencies)
+
+
+def gallop(values: Sequence[Any], target: int, position: int, key: Optional[Callable[[Any], int]] = None) -> int:
+    """
+    Returns the smallest index i >= position such that values[i] >= target, or len(values) if
+    there is no such index. The values are assumed sorted, and are optionally mapped through
+    the given key function before being compared to the target.
+
+    Uses exponential search (also known as galloping search), i.e., we probe positions at
+    increasing distances 1, 2, 4, 8, ... from the given position until we overshoot, and then
+    binary search within the last interval. The cost is logarithmic in the distance moved and
+    not in the length of the sequence, which makes many short skips cheap.
+    """
+    size = len(values)
+    (low, high, step) = (position, position, 1)
+    while high < size and (values[high] if key is None else key(values[high])) < target:
+        (low, high, step) = (high + 1, high + step, step * 2)
+    high = min(high, size)
+    if key is None:
+        return bisect_left(values, target, low, high)
+    while low < high:
+        middle = (low + high) // 2
+        if key(values[middle]) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
 
 class InMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a posting list.
     """
 
+    class InMemoryPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator over a list of postings, that supports skipping ahead via advance_to/1
+        using galloping search.
+        """
+
+        def __init__(self, postings: List[Posting]):
+            self.__postings = postings
+            self.__position = 0  # Our current position in the list.
+
+        def __next__(self) -> Posting:
+            position = self.__position
+            if position < len(self.__postings):
+                self.__position = position + 1
+                return self.__postings[position]
+            raise StopIteration
+
+        def __length_hint__(self) -> int:
+            return len(self.__postings) - self.__position
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Moves the iterator forward and returns the first remaining posting having a document
+            identifier that is equal to or larger than the given one. Returns None if no such
+            posting exists, in which case the iterator is exhausted.
+            """
+            self.__position = gallop(self.__postings, document_id, self.__position, lambda p: p.document_id)
+            return next(self, None)
+
     def __init__(self):
         self.__postings : List[Posting] = []
 
@@ -61,7 +142,7 @@ class InMemoryPostingList(PostingList):
         return len(self.__postings)
 
     def get_iterator(self) -> Iterator[Posting]:
-        return iter(self.__postings)
+        return __class__.InMemoryPostingListIterator(self.__postings)
 
     def append_posting(self, posting: Posting) -> None:
         assert len(self.__postings) == 0 or self.__postings[-1].document_id < posting.document_id
@@ -71,53 +152,304 @@ class InMemoryPostingList(PostingList):
         pass
 
 
+class CompactInMemoryPostingList(PostingList):
+    """
+    A compact in-memory implementation of a posting list. Instead of keeping one Posting
+    object per entry, the document identifiers and the term frequencies are stored in two
+    parallel arrays of unsigned 32-bit integers. Posting objects are only materialized
+    on demand, as we iterate over the posting list.
+    """
+
+    class CompactInMemoryPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that materializes Posting objects from the underlying arrays as
+        we traverse them. Skipping ahead via advance_to/1 is done using galloping search.
+        """
+
+        def __init__(self, document_ids: array, term_frequencies: array):
+            self.__document_ids = document_ids
+            self.__term_frequencies = term_frequencies
+            self.__position = 0  # Our current position in the arrays.
+
+        def __next__(self) -> Posting:
+            position = self.__position
+            if position < len(self.__document_ids):
+                self.__position += 1
+                return Posting(self.__document_ids[position], self.__term_frequencies[position])
+            raise StopIteration
+
+        def __length_hint__(self) -> int:
+            return len(self.__document_ids) - self.__position
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Moves the iterator forward and returns the first remaining posting having a document
+            identifier that is equal to or larger than the given one. Returns None if no such
+            posting exists, in which case the iterator is exhausted.
+            """
+            self.__position = gallop(self.__document_ids, document_id, self.__position)
+            return next(self, None)
+
+    def __init__(self):
+        self.__document_ids = array("I")
+        self.__term_frequencies = array("I")
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.CompactInMemoryPostingListIterator(self.__document_ids, self.__term_frequencies)
+
+    def get_arrays(self) -> Tuple[array, array]:
+        return (self.__document_ids, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert len(self.__document_ids) == 0 or self.__document_ids[-1] < posting.document_id
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+
+    def append_postings(self, document_ids: array, term_frequencies: array) -> None:
+        assert len(self.__document_ids) == 0 or len(document_ids) == 0 or self.__document_ids[-1] < document_ids[0]
+        self.__document_ids.extend(document_ids)
+        self.__term_frequencies.extend(term_frequencies)
+
+    def finalize_postings(self) -> None:
+        pass
+
+
 class CompressedInMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
-    with variable-byte encoding. 
+    with a pluggable integer codec, variable-byte encoding being the default.
+
+    The postings are partitioned into blocks of BLOCK_SIZE entries each. For every block we keep a
+    small header that holds the block's last document identifier and the offset into the byte array
+    where the block's encoded data starts. This enables iterators to skip over whole blocks without
+    decoding them, which is what makes advance_to/1 cheap for long posting lists. Within a block,
+    the gaps are encoded first and then the term frequencies, so that the codec sees sequences of
+    similarly distributed numbers.
+
+    Since some codecs need to see a full block before they can encode it, the most recent postings
+    are kept unencoded until their block fills up or the posting list is finalized.
     """
 
+    # The number of postings per block. The last block might be only partially filled.
+    BLOCK_SIZE = 128
+
     class CompressedInMemoryPostingListIterator(Iterator[Posting]):
         """
         A custom iterator that decodes the compressed integers as we traverse the underlying byte
         array. The decoding logic needs to mirror the encoding logic that happens when postings are
         appended to the byte array.
+
+        Decoding happens a block at a time, in bulk. The block headers are consulted when skipping
+        ahead via advance_to/1, so that blocks that cannot contain the target document identifier
+        are never decoded. Any not yet encoded postings are treated as one final block.
         """
 
-        def __init__(self, data: bytearray):
+        def __init__(self, data: bytearray, last_document_ids: array, offsets: array, length: int,
+                     codec: IntegerCodec, tail_document_ids: array, tail_term_frequencies: array):
             self.__data = data  # The buffer holding all the compressed posting data.
-            self.__where = 0  # Our current position in the buffer.
-            self.__document_id = 0  # We encoded the gaps, so accumulate them when decoding.
+            self.__last_document_ids = last_document_ids  # The last document identifier per block.
+            self.__offsets = offsets  # Where each block starts in the buffer.
+            self.__length = length  # The number of postings we can decode from the buffer.
+            self.__codec = codec  # How the numbers in the buffer were encoded.
+            self.__tail = (tail_document_ids, tail_term_frequencies)  # Postings not yet encoded.
+            self.__block = -1  # The block we have currently decoded, if any.
+            self.__document_ids = []  # The decoded document identifiers of the current block.
+            self.__term_frequencies = array("I")  # The decoded term frequencies of the current block.
+            self.__position = 0  # Our current position within the current block.
 
         def __next__(self) -> Posting:
-            if self.__where < len(self.__data):
-                (gap, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                self.__document_id += gap
-                (term_frequency, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                return Posting(self.__document_id, term_frequency)
+            if self.__position == len(self.__document_ids):
+                if not self.__decode_block(self.__block + 1):
+                    raise StopIteration
+            position = self.__position
+            self.__position += 1
+            return Posting(self.__document_ids[position], self.__term_frequencies[position])
+
+        def __length_hint__(self) -> int:
+            block = max(0, self.__block)
+            if block < len(self.__offsets):
+                consumed = block * CompressedInMemoryPostingList.BLOCK_SIZE + self.__position
+            elif block == len(self.__offsets):
+                consumed = self.__length + self.__position
             else:
-                raise StopIteration
+                return 0
+            return self.__length + len(self.__tail[0]) - consumed
 
-    def __init__(self):
-        self.__logical_length = 0  # The number of posting entries encoded in the byte array.
+        def __decode_block(self, block: int) -> bool:
+            """
+            Decodes the given block in one go, replacing the current one. Returns False if there
+            is no such block, in which case the iterator is exhausted.
+            """
+            self.__block = block
+            self.__position = 0
+            if block < len(self.__offsets):
+                size = min(CompressedInMemoryPostingList.BLOCK_SIZE,
+                           self.__length - block * CompressedInMemoryPostingList.BLOCK_SIZE)
+                (gaps, length) = self.__codec.decode_many(self.__data, self.__offsets[block], size)
+                (self.__term_frequencies, _) = self.__codec.decode_many(self.__data, self.__offsets[block] + length, size)
+                base = self.__last_document_ids[block - 1] if block > 0 else 0  # We encoded the gaps.
+                self.__document_ids = list(accumulate(gaps, initial=base))[1:]
+                return True
+            if block == len(self.__offsets) and self.__tail[0]:
+                self.__document_ids = list(self.__tail[0])
+                self.__term_frequencies = array("I", self.__tail[1])
+                return True
+            self.__document_ids = []
+            return False
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Moves the iterator forward and returns the first remaining posting having a document
+            identifier that is equal to or larger than the given one. Returns None if no such
+            posting exists, in which case the iterator is exhausted.
+
+            Blocks whose last document identifier is smaller than the given one are skipped
+            without being decoded.
+            """
+            block = max(0, self.__block)
+            if block < len(self.__last_document_ids) and self.__last_document_ids[block] < document_id:
+                block = bisect_left(self.__last_document_ids, document_id, block + 1)
+                if not self.__decode_block(block):
+                    return None
+            elif self.__block < 0 and not self.__decode_block(0):
+                return None
+            self.__position = bisect_left(self.__document_ids, document_id, self.__position)
+            return next(self, None)
+
+    def __init__(self, codec: Optional[IntegerCodec] = None):
+        self.__codec = codec or VariableByteIntegerCodec()  # How we compress the blocks.
+        self.__logical_length = 0  # The number of posting entries in the posting list.
         self.__previous_document_id = 0  # So that we can gap encode.
-        self.__data = bytearray()  # All posting entries, compressed.
+        self.__data = bytearray()  # All posting entries in full blocks, compressed.
+        self.__last_document_ids = array("I")  # Block header: The last document identifier per block.
+        self.__offsets = array("I")  # Block header: The offset into the byte array per block.
+        self.__pending_document_ids = array("I")  # The document identifiers not yet encoded.
+        self.__pending_term_frequencies = array("I")  # The term frequencies not yet encoded.
 
     def get_length(self) -> int:
         return self.__logical_length
 
     def get_iterator(self) -> Iterator[Posting]:
-        return __class__.CompressedInMemoryPostingListIterator(self.__data)
+        return __class__.CompressedInMemoryPostingListIterator(self.__data, self.__last_document_ids, self.__offsets,
+                                                               self.__logical_length - len(self.__pending_document_ids),
+                                                               self.__codec, self.__pending_document_ids,
+                                                               self.__pending_term_frequencies)
+
+    def get_codec(self) -> IntegerCodec:
+        """
+        Returns the codec used for compressing the posting list.
+        """
+        return self.__codec
+
+    def get_buffers(self) -> Tuple[bytearray, array, array]:
+        """
+        Returns the raw representation of the finalized posting list, i.e., the encoded data
+        and the block headers (the last document identifier per block, and the offset into the
+        encoded data per block). Facilitates persisting the posting list.
+        """
+        assert not self.__pending_document_ids, "Posting list not finalized"
+        return (self.__data, self.__last_document_ids, self.__offsets)
+
+    def get_arrays(self) -> Tuple[array, array]:
+        # Decode block by block, bypassing the materialization of Posting objects.
+        (document_ids, term_frequencies) = (array("I"), array("I"))
+        length = self.__logical_length - len(self.__pending_document_ids)
+        for block in range(len(self.__offsets)):
+            size = min(__class__.BLOCK_SIZE, length - block * __class__.BLOCK_SIZE)
+            (gaps, offset) = self.__codec.decode_many(self.__data, self.__offsets[block], size)
+            (frequencies, _) = self.__codec.decode_many(self.__data, self.__offsets[block] + offset, size)
+            base = self.__last_document_ids[block - 1] if block > 0 else 0
+            document_ids.extend(accumulate(gaps, initial=base))
+            del document_ids[-size - 1]
+            term_frequencies.extend(frequencies)
+        document_ids.extend(self.__pending_document_ids)
+        term_frequencies.extend(self.__pending_term_frequencies)
+        return (document_ids, term_frequencies)
 
     def append_posting(self, posting: Posting) -> None:
         assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
-        gap = posting.document_id - self.__previous_document_id
-        VariableByteCodec.encode(gap, self.__data)
-        VariableByteCodec.encode(posting.term_frequency, self.__data)
+        if not self.__pending_document_ids and self.__logical_length % __class__.BLOCK_SIZE != 0:
+            self.__reopen_block()
+        self.__pending_document_ids.append(posting.document_id)
+        self.__pending_term_frequencies.append(posting.term_frequency)
         self.__logical_length += 1
         self.__previous_document_id = posting.document_id
+        if len(self.__pending_document_ids) == __class__.BLOCK_SIZE:
+            self.__flush_block()
+
+    def append_postings(self, document_ids: array, term_frequencies: array) -> None:
+        # Fill up the pending block, and encode each block as soon as it is full.
+        if not document_ids:
+            return
+        assert self.__logical_length == 0 or document_ids[0] > self.__previous_document_id
+        if not self.__pending_document_ids and self.__logical_length % __class__.BLOCK_SIZE != 0:
+            self.__reopen_block()
+        position = 0
+        while position < len(document_ids):
+            end = position + __class__.BLOCK_SIZE - len(self.__pending_document_ids)
+            self.__pending_document_ids.extend(document_ids[position:end])
+            self.__pending_term_frequencies.extend(term_frequencies[position:end])
+            position = end
+            if len(self.__pending_document_ids) == __class__.BLOCK_SIZE:
+                self.__flush_block()
+        self.__logical_length += len(document_ids)
+        self.__previous_document_id = document_ids[-1]
 
     def finalize_postings(self) -> None:
-        pass
+        self.__flush_block()
+
+    def recompress(self, codec: IntegerCodec) -> None:
+        """
+        Re-encodes the posting list using the given codec, e.g., after having inspected the
+        finalized posting list and found that another codec suits it better.
+        """
+        if codec.name == self.__codec.name:
+            return
+        postings = list(self.get_iterator())
+        self.__codec = codec
+        self.__logical_length = 0
+        self.__data = bytearray()
+        self.__last_document_ids = array("I")
+        self.__offsets = array("I")
+        self.__pending_document_ids = array("I")
+        self.__pending_term_frequencies = array("I")
+        for posting in postings:
+            self.append_posting(posting)
+        self.finalize_postings()
+
+    def __flush_block(self) -> None:
+        """
+        Encodes the pending postings as a new block, and appends it to the byte array.
+        """
+        if not self.__pending_document_ids:
+            return
+        previous = self.__last_document_ids[-1] if self.__last_document_ids else 0
+        gaps = []
+        for document_id in self.__pending_document_ids:
+            gaps.append(document_id - previous)
+            previous = document_id
+        self.__offsets.append(len(self.__data))
+        self.__last_document_ids.append(previous)
+        self.__codec.encode_many(gaps, self.__data)
+        self.__codec.encode_many(self.__pending_term_frequencies, self.__data)
+        self.__pending_document_ids = array("I")
+        self.__pending_term_frequencies = array("I")
+
+    def __reopen_block(self) -> None:
+        """
+        The inverse of __flush_block/0, for the last and partially filled block. Needed if we
+        append more postings after the posting list has been finalized.
+        """
+        block = len(self.__offsets) - 1
+        size = self.__logical_length - block * __class__.BLOCK_SIZE
+        (gaps, length) = self.__codec.decode_many(self.__data, self.__offsets[block], size)
+        (term_frequencies, _) = self.__codec.decode_many(self.__data, self.__offsets[block] + length, size)
+        base = self.__last_document_ids[block - 1] if block > 0 else 0
+        self.__pending_document_ids = array("I", accumulate(gaps, initial=base))[1:]
+        self.__pending_term_frequencies = term_frequencies
+        del self.__data[self.__offsets[block]:]
+        self.__offsets.pop()
+        self.__last_document_ids.pop()
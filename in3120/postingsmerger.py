@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from typing import Iterator
+import heapq
+import operator
+import sys
+from typing import Any, Iterator, List, Optional
 from .posting import Posting
 
 
@@ -13,9 +16,31 @@ class PostingsMerger:
     in the returned postings when document identifiers overlap. Different
     approaches are possible, e.g., an arbitrary one of the two postings could
     be returned, or the posting having the smallest/largest term frequency, or
-    a new one that produces an averaged value, or something else.
+    a new one that produces an averaged value, or something else. The n-way
+    merges let the client decide, via a named combiner.
     """
 
+    # The supported ways of combining postings for the same document, see combine/2.
+    COMBINERS = (None, "sum", "max", "all")
+
+    @staticmethod
+    def advance_to(p: Iterator[Posting], document_id: int) -> Optional[Posting]:
+        """
+        Moves the given iterator forward and returns the first remaining posting having
+        a document identifier that is equal to or larger than the given one. Returns None
+        if the iterator gets exhausted.
+
+        Iterators that know how to skip ahead efficiently, e.g., by consulting block headers
+        or skip pointers, expose this via an advance_to method of their own. For all other
+        iterators we have to fall back to a linear scan.
+        """
+        if hasattr(p, "advance_to"):
+            return p.advance_to(document_id)
+        posting = next(p, None)
+        while posting and posting.document_id < document_id:
+            posting = next(p, None)
+        return posting
+
     @staticmethod
     def intersection(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
         """
@@ -24,22 +49,116 @@ class PostingsMerger:
 
         The posting lists are assumed sorted in increasing order according
         to the document identifiers.
+
+        If one of the iterators knows how to skip ahead efficiently, we can move it straight
+        to the other iterator's current document identifier. This makes intersecting a short
+        posting list with a long one cheap, since most of the long list is never visited.
         """
-        
         val1, val2 = next(p1, None), next(p2, None)
-        
-        while (val1 != None and val2 != None):
-            
-            if (val1.document_id == val2.document_id):
+
+        while val1 and val2:
+
+            if val1.document_id == val2.document_id:
                 yield val1
                 val1, val2 = next(p1, None), next(p2, None)
-                
-            elif (val1.document_id < val2.document_id):
-                val1 = next(p1, None)
-            
+
+            elif val1.document_id < val2.document_id:
+                val1 = PostingsMerger.advance_to(p1, val2.document_id)
+
             else:
-                val2 = next(p2, None)
-        
+                val2 = PostingsMerger.advance_to(p2, val1.document_id)
+
+    @staticmethod
+    def intersection_many(iterators: List[Iterator[Posting]], combiner: Optional[str] = None) -> Iterator[Any]:
+        """
+        A generator that yields a simple AND of any number of posting lists, given
+        iterators over these. See combine/2 for how the combiner controls what gets
+        yielded. If no combiner is given, the postings from the shortest list are yielded.
+
+        The posting lists are assumed sorted in increasing order according to the
+        document identifiers. The shortest posting list drives the evaluation, i.e., for
+        each of its postings we skip ahead in the other lists to look for the same document
+        identifier. The other lists are probed in order of increasing length, so that most
+        candidates are rejected early. List lengths are estimated using length hints, and
+        iterators that offer none are assumed to be long.
+        """
+        assert combiner in PostingsMerger.COMBINERS
+        if not iterators:
+            return
+        order = sorted(range(len(iterators)), key=lambda i: operator.length_hint(iterators[i], sys.maxsize))
+        (driver, others) = (iterators[order[0]], [iterators[i] for i in order[1:]])
+        cursors: List[Optional[Posting]] = [None] * len(others)
+        candidate = next(driver, None)
+        while candidate:
+            for (i, other) in enumerate(others):
+                if cursors[i] is None or cursors[i].document_id < candidate.document_id:
+                    cursors[i] = PostingsMerger.advance_to(other, candidate.document_id)
+                    if cursors[i] is None:
+                        return
+                if cursors[i].document_id > candidate.document_id:
+                    candidate = PostingsMerger.advance_to(driver, cursors[i].document_id)
+                    break
+            else:
+                if combiner is None:
+                    yield candidate
+                else:
+                    postings: List[Optional[Posting]] = [None] * len(iterators)
+                    for (i, posting) in zip(order, [candidate] + cursors):
+                        postings[i] = posting
+                    yield PostingsMerger.combine(postings, combiner)
+                candidate = next(driver, None)
+
+    @staticmethod
+    def union_many(iterators: List[Iterator[Posting]], combiner: Optional[str] = None) -> Iterator[Any]:
+        """
+        A generator that yields a simple OR of any number of posting lists, given
+        iterators over these. See combine/2 for how the combiner controls what gets
+        yielded. If no combiner is given, the posting from the first list that contains
+        the document is yielded.
+
+        The posting lists are assumed sorted in increasing order according to the
+        document identifiers. The current posting of each list is kept in a heap keyed
+        on the document identifier, so that all k lists are merged in a single pass at
+        a cost of O(log k) per posting, instead of via a chain of k pairwise merges.
+        """
+        assert combiner in PostingsMerger.COMBINERS
+        heap = [(posting.document_id, i, posting) for (i, posting) in enumerate(next(p, None) for p in iterators) if posting]
+        heapq.heapify(heap)
+        while heap:
+            document_id = heap[0][0]
+            matches = []
+            while heap and heap[0][0] == document_id:
+                (_, i, posting) = heap[0]
+                matches.append((i, posting))
+                posting = next(iterators[i], None)
+                if posting:
+                    heapq.heapreplace(heap, (posting.document_id, i, posting))
+                else:
+                    heapq.heappop(heap)
+            if combiner is None:
+                yield matches[0][1]
+            else:
+                postings: List[Optional[Posting]] = [None] * len(iterators)
+                for (i, posting) in matches:
+                    postings[i] = posting
+                yield PostingsMerger.combine(postings, combiner)
+
+    @staticmethod
+    def combine(postings: List[Optional[Posting]], combiner: str) -> Any:
+        """
+        Combines the postings for the same document from several posting lists, where the
+        entries are None for the lists that don't contain the document. Supported combiners
+        are "sum" and "max", which produce a new posting whose term frequency is the sum or
+        the largest of the term frequencies, and "all", which keeps the given list as-is so
+        that the client can tell which lists matched.
+        """
+        if combiner == "all":
+            return postings
+        present = [p for p in postings if p is not None]
+        if combiner == "sum":
+            return Posting(present[0].document_id, sum(p.term_frequency for p in present))
+        assert combiner == "max"
+        return Posting(present[0].document_id, max(p.term_frequency for p in present))
 
     @staticmethod
     def union(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
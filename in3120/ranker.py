@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
 from .posting import Posting
 
 
@@ -36,6 +38,37 @@ class Ranker(ABC):
         """
         pass
 
+    def upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        """
+        Returns an upper bound on how much the given query term can contribute to a document's
+        relevancy score, given the largest term frequency that the term has in any document.
+        The bounds for the query terms matched by a document must add up to at least the score
+        that evaluate/0 returns for that document. This enables query evaluators to skip
+        documents that can't possibly make it into the result set.
+
+        Returns None if the ranker can't provide such bounds, which is the default.
+        """
+        return None
+
+    def contributions(self, term: str, multiplicity: int, document_ids: np.ndarray,
+                      term_frequencies: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Returns how much the given query term contributes to the relevancy score of each of the
+        given documents, given the term's frequency in each document. Enables term-at-a-time
+        evaluation, where the contributions are summed up per document across the query terms
+        and then passed through finalize_scores/2.
+
+        Returns None if the ranker's scores can't be computed this way, which is the default.
+        """
+        return None
+
+    def finalize_scores(self, document_ids: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """
+        Turns the summed up contributions for the given documents into relevancy scores that
+        agree with what evaluate/0 would have returned. The default is to leave them as-is.
+        """
+        return scores
+
 
 class SimpleRanker(Ranker):
     """
@@ -56,3 +89,10 @@ class SimpleRanker(Ranker):
 
     def evaluate(self) -> float:
         return self.__score
+
+    def upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        return float(multiplicity * max_term_frequency)
+
+    def contributions(self, term: str, multiplicity: int, document_ids: np.ndarray,
+                      term_frequencies: np.ndarray) -> Optional[np.ndarray]:
+        return (multiplicity * term_frequencies).astype(np.float64)
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+from typing import Dict, Optional
+import numpy as np
+from .corpus import Corpus
+from .invertedindex import InvertedIndex
+
+
+class ScoringStatistics:
+    """
+    Precomputed, read-only tables of the corpus and index statistics that rankers need, so that
+    rankers can look these up in O(1) while scoring instead of consulting the index and the corpus
+    for every posting. All tables are NumPy arrays, which also facilitates bulk scoring:
+
+      - The inverse document frequency log(N/df) per term, indexed by term identifier. Terms are
+        assigned identifiers in the order the index enumerates its vocabulary.
+      - The length of each document, i.e., the number of indexed term occurrences, indexed by
+        document identifier.
+      - The Euclidean norm of each document's term frequency vector, indexed by document identifier.
+      - The static score of each document, indexed by document identifier. The static score is read
+        from a document field, with a default value for documents where the field is missing.
+
+    The statistics are a snapshot, built once from the corpus and the index. If documents are
+    added to or deleted from the index afterwards, the statistics have to be rebuilt. Clients can
+    compare get_version/0 with the version of the index to detect this. The index must be able to
+    enumerate its vocabulary.
+    """
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex,
+                 static_score_field_name: str = "static_quality_score", default_static_score: float = 1.0):
+        self.__version = inverted_index.get_version()
+        self.__document_count = len(corpus)
+        self.__term_ids: Dict[str, int] = {}
+        idfs = []
+        document_lengths = np.zeros(self.__document_count, dtype=np.int64)
+        squared_norms = np.zeros(self.__document_count, dtype=np.float64)
+        for term in inverted_index.get_vocabulary():
+            (document_ids, term_frequencies) = inverted_index.get_postings_arrays(term)
+            (document_ids, term_frequencies) = (np.frombuffer(document_ids, dtype=np.uint32),
+                                                np.frombuffer(term_frequencies, dtype=np.uint32))
+            np.add.at(document_lengths, document_ids, term_frequencies)
+            np.add.at(squared_norms, document_ids, np.square(term_frequencies, dtype=np.float64))
+            df = inverted_index.get_document_frequency(term)  # Agrees with the index, also for deleted documents.
+            self.__term_ids[term] = len(idfs)
+            idfs.append(math.log(self.__document_count / df) if df else 0.0)
+        self.__idfs = np.array(idfs, dtype=np.float64)
+        self.__document_lengths = document_lengths
+        self.__document_norms = np.sqrt(squared_norms)
+        self.__static_scores = np.array([float(d.get_field(static_score_field_name, default_static_score))
+                                         for d in corpus], dtype=np.float64)
+        for table in (self.__idfs, self.__document_lengths, self.__document_norms, self.__static_scores):
+            table.flags.writeable = False
+
+    def get_version(self) -> int:
+        """
+        Returns the version of the index that the statistics were built from.
+        """
+        return self.__version
+
+    def get_document_count(self) -> int:
+        """
+        Returns the number of documents N in the corpus, as used when computing IDF values.
+        """
+        return self.__document_count
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        """
+        Returns the identifier of the given term, or None if the term is not indexed.
+        """
+        return self.__term_ids.get(term)
+
+    def get_idf(self, term: str) -> float:
+        """
+        Returns the inverse document frequency of the given term, or 0.0 if the term is not indexed.
+        """
+        term_id = self.__term_ids.get(term)
+        return 0.0 if term_id is None else self.__idfs.item(term_id)
+
+    def get_static_score(self, document_id: int) -> float:
+        """
+        Returns the static score of the given document.
+        """
+        return self.__static_scores.item(document_id)
+
+    def get_idfs(self) -> np.ndarray:
+        """
+        Returns the inverse document frequencies, indexed by term identifier.
+        """
+        return self.__idfs
+
+    def get_document_lengths(self) -> np.ndarray:
+        """
+        Returns the document lengths, indexed by document identifier.
+        """
+        return self.__document_lengths
+
+    def get_document_norms(self) -> np.ndarray:
+        """
+        Returns the Euclidean norms of the documents' term frequency vectors, indexed by document identifier.
+        """
+        return self.__document_norms
+
+    def get_static_scores(self) -> np.ndarray:
+        """
+        Returns the static document scores, indexed by document identifier.
+        """
+        return self.__static_scores
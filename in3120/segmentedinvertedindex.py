@@ -0,0 +1,347 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import operator
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .document import Document
+from .invertedindex import InvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .postinglist import CompressedInMemoryPostingList, PostingList
+from .postingsmerger import PostingsMerger
+from .tokenizer import Tokenizer
+
+
+class SegmentedInvertedIndex(InvertedIndex):
+    """
+    A log-structured inverted index, made up of a sequence of immutable segments plus a small
+    in-memory write buffer. Suitable for corpora that grow continuously.
+
+    New documents land in the write buffer. When the buffer fills up, its contents are frozen
+    into a new segment that is appended to the sequence. Each segment covers a contiguous range
+    of document identifiers, and the segments are ordered by these ranges. A posting list for a
+    term is hence simply the concatenation of the term's posting lists in each segment, followed
+    by the buffered postings. Query evaluators like SimpleSearchEngine can use the index as-is.
+
+    To keep the number of segments that a query has to fan out over bounded, adjacent segments
+    are merged according to a tiered policy: Segments are assigned to tiers by size, where each
+    tier holds segments that are segments_per_tier times larger than the tier below. Whenever
+    segments_per_tier adjacent segments belong to the same tier, they are merged into a single
+    segment in the next tier. Merging happens in a background thread, unless disabled. Readers
+    always see a consistent snapshot, since the sequence of segments is never modified in place.
+
+    Each segment also records the length of each indexed field in each of its documents, for
+    rankers that do length normalization.
+    """
+
+    class Segment:
+        """
+        An immutable set of compressed posting lists, covering a contiguous range of document
+        identifiers. The field lengths are indexed by document identifier relative to the first
+        one in the range, and are zero for identifiers that were never added.
+        """
+
+        def __init__(self, posting_lists: Dict[str, PostingList], first_document_id: int, last_document_id: int,
+                     document_count: int, field_lengths: Dict[str, array]):
+            self.posting_lists = posting_lists
+            self.first_document_id = first_document_id
+            self.last_document_id = last_document_id
+            self.document_count = document_count
+            self.field_lengths = field_lengths
+
+        @staticmethod
+        def merge(segments: List["SegmentedInvertedIndex.Segment"]) -> "SegmentedInvertedIndex.Segment":
+            """
+            Merges the given segments, which must be ordered and cover adjacent ranges of document
+            identifiers, into a single segment.
+            """
+            posting_lists = {}
+            for segment in segments:
+                for (term, source) in segment.posting_lists.items():
+                    if term not in posting_lists:
+                        posting_lists[term] = CompressedInMemoryPostingList()
+                    for posting in source:
+                        posting_lists[term].append_posting(posting)
+            for posting_list in posting_lists.values():
+                posting_list.finalize_postings()
+            field_lengths = {field: array("I") for field in segments[0].field_lengths}
+            for segment in segments:
+                for (field, lengths) in field_lengths.items():
+                    lengths.extend([0] * (segment.first_document_id - segments[0].first_document_id - len(lengths)))
+                    lengths.extend(segment.field_lengths[field])
+            return SegmentedInvertedIndex.Segment(posting_lists, segments[0].first_document_id,
+                                                  segments[-1].last_document_id,
+                                                  sum(s.document_count for s in segments), field_lengths)
+
+    class ChainedPostingsIterator(Iterator[Posting]):
+        """
+        Iterates over a sequence of posting lists that cover adjacent ranges of document identifiers,
+        as if they were a single posting list. Skipping ahead via advance_to/1 bypasses posting lists
+        whose last document identifier is too small, and otherwise delegates to the current one.
+        """
+
+        def __init__(self, posting_lists: List[Tuple[int, Iterable[Posting]]]):
+            self.__posting_lists = posting_lists  # The last document identifier per posting list, and the list.
+            self.__current = 0  # The posting list we're currently traversing.
+            self.__iterator = iter(posting_lists[0][1]) if posting_lists else iter([])
+
+        def __next__(self) -> Posting:
+            while True:
+                posting = next(self.__iterator, None)
+                if posting is not None:
+                    return posting
+                if not self.__move_to(self.__current + 1):
+                    raise StopIteration
+
+        def __length_hint__(self) -> int:
+            remaining = sum(len(p) for (_, p) in self.__posting_lists[self.__current + 1:])
+            return operator.length_hint(self.__iterator) + remaining
+
+        def __move_to(self, current: int) -> bool:
+            """
+            Moves on to the given posting list. Returns False if there is no such list.
+            """
+            if current >= len(self.__posting_lists):
+                self.__current = len(self.__posting_lists)
+                self.__iterator = iter([])
+                return False
+            self.__current = current
+            self.__iterator = iter(self.__posting_lists[current][1])
+            return True
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Moves the iterator forward and returns the first remaining posting having a document
+            identifier that is equal to or larger than the given one. Returns None if no such
+            posting exists, in which case the iterator is exhausted.
+            """
+            current = self.__current
+            while current < len(self.__posting_lists) and self.__posting_lists[current][0] < document_id:
+                current += 1
+            if current != self.__current and not self.__move_to(current):
+                return None
+            posting = PostingsMerger.advance_to(self.__iterator, document_id)
+            return posting if posting is not None else next(self, None)
+
+    def __init__(self, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, buffer_size: int = 1000,
+                 segments_per_tier: int = 10, background: bool = True):
+        assert buffer_size > 0
+        assert segments_per_tier > 1
+        self.__fields = list(fields)
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__buffer_size = buffer_size
+        self.__segments_per_tier = segments_per_tier
+        self.__segments: List[SegmentedInvertedIndex.Segment] = []  # Replaced, never modified in place.
+        self.__buffer: Dict[str, List[Posting]] = {}  # The postings not yet frozen into a segment.
+        self.__buffered_document_ids: List[int] = []
+        self.__buffered_field_lengths = {field: array("I") for field in self.__fields}  # Per buffered document.
+        self.__last_document_id = -1
+        self.__version = 0  # Bumped whenever a document is added. Merging doesn't change the contents.
+        self.__lock = threading.Lock()  # Guards the buffer and the sequence of segments.
+        self.__condition = threading.Condition(self.__lock)  # Signals the merge thread.
+        self.__merging = False  # Is the merge thread currently merging segments?
+        self.__closed = False
+        self.__thread = None
+        if background:
+            self.__thread = threading.Thread(target=self.__merge_in_background, daemon=True)
+            self.__thread.start()
+
+    def add_document(self, document: Document) -> None:
+        """
+        Indexes the given document. Document identifiers must be added in increasing order.
+        """
+        terms = []
+        field_lengths = []
+        for field in self.__fields:
+            length = len(terms)
+            terms.extend(self.get_terms(document.get_field(field, "")))
+            field_lengths.append(len(terms) - length)
+        counts = Counter(terms)
+        with self.__lock:
+            assert document.document_id > self.__last_document_id, "document_id is not increasing"
+            self.__last_document_id = document.document_id
+            for (term, term_frequency) in counts.items():
+                self.__buffer.setdefault(term, []).append(Posting(document.document_id, term_frequency))
+            self.__buffered_document_ids.append(document.document_id)
+            for (field, length) in zip(self.__fields, field_lengths):
+                self.__buffered_field_lengths[field].append(length)
+            self.__version += 1
+            if len(self.__buffered_document_ids) >= self.__buffer_size:
+                self.__flush()
+
+    def flush(self) -> None:
+        """
+        Freezes the contents of the write buffer into a new segment, if the buffer is non-empty.
+        """
+        with self.__lock:
+            self.__flush()
+
+    def __flush(self) -> None:
+        """
+        Does the work of flush/0. Assumes that the caller holds the lock.
+        """
+        if not self.__buffered_document_ids:
+            return
+        posting_lists = {}
+        for (term, postings) in self.__buffer.items():
+            posting_lists[term] = CompressedInMemoryPostingList()
+            for posting in postings:
+                posting_lists[term].append_posting(posting)
+            posting_lists[term].finalize_postings()
+        first = self.__buffered_document_ids[0]
+        field_lengths = {field: array("I", bytes(4 * (self.__buffered_document_ids[-1] - first + 1)))
+                         for field in self.__fields}
+        for (field, lengths) in self.__buffered_field_lengths.items():
+            for (document_id, length) in zip(self.__buffered_document_ids, lengths):
+                field_lengths[field][document_id - first] = length
+        segment = __class__.Segment(posting_lists, first, self.__buffered_document_ids[-1],
+                                    len(self.__buffered_document_ids), field_lengths)
+        self.__segments = self.__segments + [segment]
+        self.__buffer = {}
+        self.__buffered_document_ids = []
+        self.__buffered_field_lengths = {field: array("I") for field in self.__fields}
+        self.__condition.notify_all()
+
+    def __get_tier(self, segment: Segment) -> int:
+        """
+        Returns the tier that the given segment belongs to, based on its size.
+        """
+        (tier, capacity) = (0, self.__buffer_size * self.__segments_per_tier)
+        while segment.document_count >= capacity:
+            (tier, capacity) = (tier + 1, capacity * self.__segments_per_tier)
+        return tier
+
+    def __find_merge(self, segments: List[Segment]) -> Optional[Tuple[int, int]]:
+        """
+        Applies the merge policy to the given sequence of segments. Returns the range of adjacent
+        segments that should be merged, if any.
+        """
+        start = 0
+        for end in range(1, len(segments) + 1):
+            if end - start == self.__segments_per_tier:
+                return (start, end)
+            if end < len(segments) and self.__get_tier(segments[end]) != self.__get_tier(segments[start]):
+                start = end
+        return None
+
+    def merge(self) -> None:
+        """
+        Merges segments according to the merge policy until no more merges are called for. Useful
+        if merging in the background has been disabled.
+        """
+        while self.__merge_once():
+            pass
+
+    def __merge_once(self) -> bool:
+        """
+        Performs a single merge, if one is called for. Returns True iff a merge was performed. The
+        merging itself happens without holding the lock, so that readers and writers are not blocked.
+        """
+        with self.__lock:
+            if self.__merging:
+                return False
+            segments = self.__segments
+            candidates = self.__find_merge(segments)
+            if candidates is None:
+                return False
+            self.__merging = True
+        try:
+            (start, end) = candidates
+            merged = __class__.Segment.merge(segments[start:end])
+            with self.__lock:
+                # New segments may have been appended meanwhile, but only merges replace existing ones.
+                assert self.__segments[start:end] == segments[start:end]
+                self.__segments = self.__segments[:start] + [merged] + self.__segments[end:]
+        finally:
+            with self.__lock:
+                self.__merging = False
+                self.__condition.notify_all()
+        return True
+
+    def __merge_in_background(self) -> None:
+        """
+        The body of the merge thread. Sleeps until there might be something to merge.
+        """
+        while True:
+            with self.__lock:
+                while not self.__closed and self.__find_merge(self.__segments) is None:
+                    self.__condition.wait()
+                if self.__closed:
+                    return
+            self.__merge_once()
+
+    def wait_for_merges(self) -> None:
+        """
+        Blocks until the merge policy calls for no more merges. Merging happens in the background
+        if enabled, otherwise it happens in the calling thread.
+        """
+        if self.__thread is None:
+            self.merge()
+            return
+        with self.__lock:
+            while self.__merging or self.__find_merge(self.__segments) is not None:
+                self.__condition.wait()
+
+    def close(self) -> None:
+        """
+        Stops the background merge thread, if any. The index can still be queried afterwards.
+        """
+        with self.__lock:
+            self.__closed = True
+            self.__condition.notify_all()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def get_segment_sizes(self) -> List[int]:
+        """
+        Returns the number of documents in each segment, in order. Facilitates monitoring.
+        """
+        return [segment.document_count for segment in self.__segments]
+
+    def get_version(self) -> int:
+        return self.__version
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        return iter(self.__tokenizer.strings(self.__normalizer.canonicalize(self.__normalizer.normalize(buffer))))
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        with self.__lock:
+            segments = self.__segments
+            buffered = list(self.__buffer.get(term, []))
+        posting_lists = [(s.last_document_id, s.posting_lists[term]) for s in segments if term in s.posting_lists]
+        if buffered:
+            posting_lists.append((buffered[-1].document_id, buffered))
+        return __class__.ChainedPostingsIterator(posting_lists)
+
+    def get_document_frequency(self, term: str) -> int:
+        with self.__lock:
+            segments = self.__segments
+            buffered = len(self.__buffer.get(term, []))
+        return buffered + sum(len(s.posting_lists[term]) for s in segments if term in s.posting_lists)
+
+    def get_field_lengths(self) -> Dict[str, array]:
+        with self.__lock:
+            segments = self.__segments
+            buffered_document_ids = list(self.__buffered_document_ids)
+            buffered_field_lengths = {field: array("I", lengths) for (field, lengths) in self.__buffered_field_lengths.items()}
+        field_lengths = {field: array("I") for field in self.__fields}
+        for (field, lengths) in field_lengths.items():
+            for segment in segments:
+                lengths.extend([0] * (segment.first_document_id - len(lengths)))
+                lengths.extend(segment.field_lengths[field])
+            for (document_id, length) in zip(buffered_document_ids, buffered_field_lengths[field]):
+                lengths.extend([0] * (document_id - len(lengths)))
+                lengths.append(length)
+        return field_lengths
+
+    def get_vocabulary(self) -> Iterator[str]:
+        with self.__lock:
+            segments = self.__segments
+            terms = set(self.__buffer.keys())
+        for segment in segments:
+            terms.update(segment.posting_lists.keys())
+        return iter(sorted(terms))
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import heapq
-from typing import Iterator, Any, Union, Tuple
+from typing import Iterator, Any, Optional, Sequence, Union, Tuple
+import numpy as np
 
 # Not strictly needed, but left for clarity. PEP 484 explcitly specifies that
 # "when an argument is annotated as having type float, an argument of type int
@@ -22,8 +23,17 @@ class Sieve:
 
     Candidate items can be of any type, as long as that type has an "<" operator
     defined.
+
+    Scores that are already available in bulk, e.g., as a NumPy array, can be sifted
+    in one go. Most candidates are then rejected by a single vectorized comparison
+    against the worst of the best, and only the few that make the cut are sifted one
+    at a time.
     """
 
+    # The number of scores that are considered at a time when sifting in bulk. A new block gets
+    # compared against the threshold as it is after having sifted the previous blocks.
+    BLOCK_SIZE = 4096
+
     def __init__(self, size: int):
         assert size > 0
         self.__size = size
@@ -43,14 +53,49 @@ class Sieve:
             if root_score < score:
                 heapq.heapreplace(self.__heap, (score, item))
 
+    def sift_many(self, scores: Union[np.ndarray, Sequence[Number]], items: Union[np.ndarray, Sequence[Any]]) -> None:
+        """
+        Sifts many scored items through the sieve, where the scores and the items are given as
+        parallel sequences. Equivalent to sifting the items one at a time, save for how ties are
+        resolved.
+        """
+        scores = np.asarray(scores)
+        assert scores.ndim == 1 and len(scores) == len(items)
+        for start in range(0, len(scores), __class__.BLOCK_SIZE):
+            block = scores[start:start + __class__.BLOCK_SIZE]
+            threshold = self.minimum()
+            candidates = np.flatnonzero(block > threshold) if threshold is not None else np.arange(len(block))
+
+            # At most size candidates from the block can make the cut.
+            if len(candidates) > self.__size:
+                best = np.argpartition(block[candidates], len(candidates) - self.__size)
+                candidates = candidates[best[len(candidates) - self.__size:]]
+
+            selected = candidates + start
+            if isinstance(items, np.ndarray):
+                selected_items = items[selected].tolist()
+            else:
+                selected_items = [items[i] for i in selected.tolist()]
+            for (score, item) in zip(block[candidates].tolist(), selected_items):
+                self.sift(score, item)
+
+    def minimum(self) -> Optional[Number]:
+        """
+        Returns the score that a new item has to beat in order to make the cut, i.e., the
+        lowest score in the sieve if the sieve is full. Returns None if the sieve is not
+        yet full, in which case any item makes the cut.
+        """
+        return self.__heap[0][0] if len(self.__heap) == self.__size else None
+
     # returns (score, item) in descending order
     def winners(self) -> Iterator[Tuple[Number, Any]]:
         """
         Returns the highest-scoring items that have been sifted through the sieve, sorted
         in descending order. The returned list iterator yields (score, item) tuples.
 
-        This implementation is currently not idempotent. Invoke only once.
+        The sieve is left as-is, so this can be invoked any number of times, and more
+        items can be sifted afterwards.
         """
         # Since the internal heap tracks "the worst of the best" and we want the
-        # list sorted as "the best of the best", we reverse the internal heap ordering.
-        return reversed([heapq.heappop(self.__heap) for _ in range(len(self.__heap))])
+        # list sorted as "the best of the best", we sort in reverse.
+        return iter(sorted(self.__heap, reverse=True))
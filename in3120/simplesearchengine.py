@@ -1,12 +1,23 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import heapq
+import itertools
+import math
+import sys
+from array import array
+from bisect import bisect_left
 from collections import Counter
-from typing import Iterator, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Iterator, Dict, Any, Callable, Iterable, List, Optional, Tuple
 from .sieve import Sieve
 from .ranker import Ranker
 from .corpus import Corpus
 from .invertedindex import InvertedIndex
+from .posting import Posting
+from .postinglist import CompactInMemoryPostingList
+from .postingsmerger import PostingsMerger
 
 
 class SimpleSearchEngine:
@@ -28,6 +39,57 @@ class SimpleSearchEngine:
     document.
     """
 
+    # Stands in for the document identifier of an exhausted cursor. Larger than any real one.
+    EXHAUSTED = sys.maxsize
+
+    # Term-at-a-time evaluation uses dense score accumulators, i.e., arrays indexed by document
+    # identifier, unless the corpus is this many times larger than the number of postings to
+    # process. Sparse accumulators are then used instead.
+    SPARSE_ACCUMULATOR_RATIO = 16
+
+    # The largest number of queries to evaluate as a batch, when evaluating many queries. The posting
+    # lists for all the terms in a batch are decoded up front and kept until the batch is done.
+    BATCH_SIZE = 1000
+
+    class DecodedInvertedIndex(InvertedIndex):
+        """
+        Wraps an inverted index, and decodes each posting list at most once. Enables a batch of queries
+        to share posting list traversal, as the decoded posting lists are reused across the queries.
+        """
+
+        def __init__(self, wrapped: InvertedIndex):
+            self.__wrapped = wrapped
+            self.__decoded: Dict[str, Tuple[array, array]] = {}
+
+        def get_terms(self, buffer: str) -> Iterator[str]:
+            return self.__wrapped.get_terms(buffer)
+
+        def get_postings_arrays(self, term: str) -> Tuple[array, array]:
+            if term not in self.__decoded:
+                self.__decoded[term] = self.__wrapped.get_postings_arrays(term)
+            return self.__decoded[term]
+
+        def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+            return CompactInMemoryPostingList.CompactInMemoryPostingListIterator(*self.get_postings_arrays(term))
+
+        def get_impact_ordered_arrays(self, term: str) -> Tuple[array, array]:
+            return self.__wrapped.get_impact_ordered_arrays(term)
+
+        def get_document_frequency(self, term: str) -> int:
+            return self.__wrapped.get_document_frequency(term)
+
+        def get_vocabulary(self) -> Iterator[str]:
+            return self.__wrapped.get_vocabulary()
+
+        def get_field_lengths(self) -> Dict[str, array]:
+            return self.__wrapped.get_field_lengths()
+
+        def get_max_term_frequency(self, term: str) -> int:
+            return self.__wrapped.get_max_term_frequency(term)
+
+        def get_version(self) -> int:
+            return self.__wrapped.get_version()
+
     def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
         self.__corpus = corpus
         self.__inverted_index = inverted_index
@@ -43,6 +105,17 @@ class SimpleSearchEngine:
         The client can supply a dictionary of options that controls the query evaluation process: The value of
         N is inferred from the query via the "match_threshold" (float) option, and the maximum number of documents
         to return to the client is controlled via the "hit_count" (int) option.
+
+        The "evaluation" (str) option selects the evaluation strategy. The default, "exhaustive", scores every
+        document that has at least N of the query terms. Setting it to "wand" enables dynamic pruning, where
+        documents that can't make it into the result set are skipped without being scored. This produces the
+        same result set, but requires that the ranker can provide score upper bounds. Setting it to "taat"
+        enables term-at-a-time evaluation, where each posting list is processed in bulk in turn. This also
+        produces the same result set, but requires that the ranker can score postings in bulk. Setting it to
+        "impact" processes the postings in order of descending term frequency, and stops as soon as no
+        unseen document can make it into the result set. This requires score upper bounds from the ranker,
+        and pays off if the index keeps its posting lists in impact order. Evaluation falls back to
+        "exhaustive" if the ranker lacks the required support.
         """
         # Print verbose debug information?
         debug = options.get("debug", False)
@@ -53,9 +126,6 @@ class SimpleSearchEngine:
         query_terms = self.__inverted_index.get_terms(query)
         unique_query_terms = list(Counter(query_terms).items())
 
-        # Get the posting lists for the unique query terms.
-        posting_lists = [self.__inverted_index[term] for (term, _) in unique_query_terms]
-
         # We require that at least N of the M query terms are present in the document,
         # for the document to be considered part of the result set. What should the minimum
         # value of N be?
@@ -63,50 +133,368 @@ class SimpleSearchEngine:
         match_threshold = max(0.0, min(1.0, options.get("match_threshold", 0.5)))
         required_minimum = max(1, min(len(unique_query_terms), int(match_threshold * len(unique_query_terms))))
 
+        # Optionally do term-at-a-time evaluation instead, if the ranker supports it. Otherwise, fall back
+        # to document-at-a-time evaluation.
+        evaluation = options.get("evaluation", "exhaustive")
+        assert evaluation in ("exhaustive", "wand", "taat", "impact")
+        hit_count = max(1, min(100, options.get("hit_count", 10)))
+        if evaluation == "taat":
+            winners = self.__evaluate_taat(unique_query_terms, required_minimum, hit_count, ranker, debug)
+            if winners is not None:
+                for (score, document_id) in winners:
+                    yield {"score": score, "document": self.__corpus[document_id]}
+                return
+
+        # Get the posting lists for the unique query terms.
+        posting_lists = [self.__inverted_index[term] for (term, _) in unique_query_terms]
+
         # When traversing the posting lists using document-at-a-time traversal, we need to keep track
         # of where we are in each of the posting lists. Initially, all the cursors "point to" the first entry
-        # in each posting list. Keep track of which posting lists that remain to be fully traversed.
+        # in each posting list. Alongside the cursors we keep a flat array of the document identifiers they
+        # point to, where exhausted cursors point "past the end" of every posting list. That way, finding
+        # and counting the lowest document identifiers can be done by builtins, without rebuilding any lists
+        # per document. Keep track of how many posting lists that remain to be fully traversed.
         all_cursors = [next(p, None) for p in posting_lists]
-        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+        document_ids = [c.document_id if c else __class__.EXHAUSTED for c in all_cursors]
+        remaining = len(all_cursors) - document_ids.count(__class__.EXHAUSTED)
 
         # We're doing ranked retrieval. Assess relevance scores per document as we go along, as we're doing
         # document-at-a-time traversal. Keep track of the K highest-scoring documents.
-        sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
+        sieve = Sieve(hit_count)
+
+        # Optionally terminate early by processing postings in impact order, if the ranker can provide score
+        # upper bounds. Otherwise, fall back to exhaustive evaluation.
+        if evaluation == "impact" and self.__evaluate_impact_ordered(unique_query_terms, required_minimum,
+                                                                      sieve, ranker, debug):
+            remaining = 0
+
+        # Optionally prune using per-term score upper bounds, if the ranker can provide these. Otherwise,
+        # fall back to exhaustive evaluation.
+        if evaluation == "wand":
+            upper_bounds = [ranker.upper_bound(term, multiplicity, self.__inverted_index.get_max_term_frequency(term))
+                            for (term, multiplicity) in unique_query_terms]
+            if all(bound is not None for bound in upper_bounds):
+                self.__evaluate_wand(unique_query_terms, posting_lists, all_cursors, required_minimum,
+                                     upper_bounds, sieve, ranker, debug)
+                remaining = 0
 
         # We're doing at least N-of-M matching. As we reach the end of the posting lists, we can abort when
         # the number of non-exhausted lists drops below the required minimum N.
-        while len(remaining_cursor_ids) >= required_minimum:
+        while remaining >= required_minimum:
 
             # The posting lists are sorted by the document identifiers in ascending order. Define the
             # "frontier" as the subset of non-exhausted posting lists that mention the lowest document
             # identifier. In a sense, if we imagine scanning the posting lists from left to right, the
             # frontier is the subset that has the "leftmost" cursors.
-            # TODO: This can easily be done in a single pass over the remaining lists.
-            document_id = min(all_cursors[i].document_id for i in remaining_cursor_ids)
-            frontier_cursor_ids = [i for i in remaining_cursor_ids if all_cursors[i].document_id == document_id]
+            document_id = min(document_ids)
+            frontier_size = document_ids.count(document_id)
 
             # The number of elements on the "frontier" needs to be at least N. Otherwise, these documents
             # don't contain enough of the query terms, and aren't part of the result set.
-            if len(frontier_cursor_ids) >= required_minimum:
+            if frontier_size >= required_minimum:
                 ranker.reset(document_id)
-                for i in frontier_cursor_ids:
-                    ranker.update(unique_query_terms[i][0], unique_query_terms[i][1], all_cursors[i])
+                for i in range(len(all_cursors)):
+                    if document_ids[i] == document_id:
+                        ranker.update(unique_query_terms[i][0], unique_query_terms[i][1], all_cursors[i])
                 score = ranker.evaluate()
                 sieve.sift(score, document_id)
                 if debug:
                     print("*** MATCH")
                     print("document =", self.__corpus[document_id])
-                    print("matches  =", {unique_query_terms[i][0]: all_cursors[i] for i in frontier_cursor_ids})
+                    print("matches  =", {unique_query_terms[i][0]: all_cursors[i]
+                                         for i in range(len(all_cursors)) if document_ids[i] == document_id})
                     print("score    =", score)
 
-            # Move along the cursors on the frontier. The cursors not on the frontier remain where they
-            # are. We may or may not reach the end of some posting lists when we advance, so the set of
-            # remaining non-exhausted lists might shrink.
-            for i in frontier_cursor_ids:
-                all_cursors[i] = next(posting_lists[i], None)
-            remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+                # Move along the cursors on the frontier. The cursors not on the frontier remain where they
+                # are. We may or may not reach the end of some posting lists when we advance, so the set of
+                # remaining non-exhausted lists might shrink.
+                for i in range(len(all_cursors)):
+                    if document_ids[i] == document_id:
+                        all_cursors[i] = next(posting_lists[i], None)
+                        if all_cursors[i]:
+                            document_ids[i] = all_cursors[i].document_id
+                        else:
+                            document_ids[i] = __class__.EXHAUSTED
+                            remaining -= 1
+
+            else:
+
+                # No document smaller than the N-th smallest cursor can be contained in N or more of the
+                # posting lists. Hence, we can skip ahead to that "pivot" document. Posting lists that
+                # support skipping can then avoid decoding postings that would just be discarded anyway.
+                pivot_document_id = heapq.nsmallest(required_minimum, document_ids)[-1]
+                for i in range(len(all_cursors)):
+                    if document_ids[i] < pivot_document_id:
+                        all_cursors[i] = PostingsMerger.advance_to(posting_lists[i], pivot_document_id)
+                        if all_cursors[i]:
+                            document_ids[i] = all_cursors[i].document_id
+                        else:
+                            document_ids[i] = __class__.EXHAUSTED
+                            remaining -= 1
 
         # Alert the client about the best-matching documents, using the supplied callback function.
         # Emit documents sorted according to their relevancy scores.
         for (score, document_id) in sieve.winners():
-            yield {"score": score, "document": self.__corpus[document_id]}
\ No newline at end of file
+            yield {"score": score, "document": self.__corpus[document_id]}
+
+    def evaluate_many(self, queries: Iterable[str], options: dict, ranker_factory: Callable[[], Ranker],
+                      workers: int = 1) -> List[List[Dict[str, Any]]]:
+        """
+        Evaluates all the given queries as evaluate/3 does, using the same options for all of them. Returns
+        the matches for each query as a list, in the same order as the queries. Suitable for, e.g., offline
+        evaluation jobs that issue large numbers of queries.
+
+        The queries are grouped so that queries that share terms are evaluated together in batches, where
+        the posting list for each term in a batch is decoded only once. The ranker factory is invoked to
+        create a ranker per batch. The batches can optionally be spread over several worker processes. The
+        ranker factory must then be picklable, and so must the search engine unless worker processes are
+        forked.
+        """
+        queries = list(queries)
+        batches = self.__group_queries(queries, workers)
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(self,)) as executor:
+                partials = list(executor.map(_evaluate_batch, [[queries[i] for i in batch] for batch in batches],
+                                             itertools.repeat(options), itertools.repeat(ranker_factory)))
+        else:
+            partials = [self._evaluate_batch([queries[i] for i in batch], options, ranker_factory) for batch in batches]
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        for (batch, partial) in zip(batches, partials):
+            for (i, matches) in zip(batch, partial):
+                results[i] = [{"score": score, "document": self.__corpus[document_id]} for (score, document_id) in matches]
+        return results
+
+    def __group_queries(self, queries: List[str], workers: int) -> List[List[int]]:
+        """
+        Partitions the given queries into batches, and returns the indices of the queries in each batch.
+        Decoding the longest posting list dominates the cost of a query, so queries are ordered by their
+        most frequent term and then by the rest of their terms. This places queries that share their most
+        costly posting lists next to each other, before the ordered queries are chopped into batches. The
+        batches are small enough to keep all workers busy.
+        """
+        def key(i: int) -> Tuple[str, Tuple[str, ...]]:
+            terms = sorted(set(self.__inverted_index.get_terms(queries[i])))
+            heaviest = max(terms, key=self.__inverted_index.get_document_frequency, default="")
+            return (heaviest, tuple(terms))
+        order = sorted(range(len(queries)), key=key)
+        size = max(1, min(__class__.BATCH_SIZE, -(-len(queries) // max(1, workers))))
+        return [order[start:start + size] for start in range(0, len(order), size)]
+
+    def _evaluate_batch(self, queries: List[str], options: dict,
+                        ranker_factory: Callable[[], Ranker]) -> List[List[Tuple[float, int]]]:
+        """
+        Evaluates the given batch of queries, sharing the decoded posting lists across them. Returns the
+        (score, document identifier) pairs for each query. Runs in a worker process when evaluating queries
+        in parallel.
+        """
+        engine = SimpleSearchEngine(self.__corpus, __class__.DecodedInvertedIndex(self.__inverted_index))
+        ranker = ranker_factory()
+        return [[(match["score"], match["document"].document_id) for match in engine.evaluate(query, options, ranker)]
+                for query in queries]
+
+    def __evaluate_wand(self, unique_query_terms: List[Tuple[str, int]], posting_lists: List[Iterator[Posting]],
+                        all_cursors: List[Optional[Posting]], required_minimum: int, upper_bounds: List[float],
+                        sieve: Sieve, ranker: Ranker, debug: bool) -> None:
+        """
+        Does document-at-a-time traversal using the WAND ("weak AND") algorithm, sifting the matches through
+        the given sieve. Produces the same result set as exhaustive evaluation, but skips documents whose
+        best-case score can't beat the lowest score in a full sieve. See https://doi.org/10.1145/956863.956944.
+
+        The cursors are kept sorted by document identifier. Summing up the upper bounds of the query terms
+        in that order, the "pivot" is the first cursor where both the sum exceeds the sieve's threshold and
+        at least N cursors have been passed. No document before the pivot document can make the cut, so the
+        cursors behind the pivot can skip ahead to it. Only if all cursors up to the pivot already point to
+        the pivot document do we need to score it.
+        """
+        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+        while len(remaining_cursor_ids) >= required_minimum:
+            remaining_cursor_ids.sort(key=lambda i: all_cursors[i].document_id)
+
+            # Locate the pivot. Allow for some slack, so that rounding errors in the bounds never lead us
+            # to prune documents that the sieve would have accepted.
+            threshold = sieve.minimum()
+            slack = 1e-9 * max(1.0, abs(threshold or 0.0))
+            (pivot, upper_bound) = (None, 0.0)
+            for (j, i) in enumerate(remaining_cursor_ids):
+                upper_bound += upper_bounds[i]
+                if j + 1 >= required_minimum and (threshold is None or upper_bound + slack > threshold):
+                    pivot = j
+                    break
+            if pivot is None:
+                break
+            pivot_document_id = all_cursors[remaining_cursor_ids[pivot]].document_id
+
+            # All cursors up to and including the pivot point to the pivot document, so evaluate it in full.
+            if all_cursors[remaining_cursor_ids[0]].document_id == pivot_document_id:
+                frontier_cursor_ids = sorted(i for i in remaining_cursor_ids if all_cursors[i].document_id == pivot_document_id)
+                ranker.reset(pivot_document_id)
+                for i in frontier_cursor_ids:
+                    ranker.update(unique_query_terms[i][0], unique_query_terms[i][1], all_cursors[i])
+                score = ranker.evaluate()
+                sieve.sift(score, pivot_document_id)
+                if debug:
+                    print("*** MATCH")
+                    print("document =", self.__corpus[pivot_document_id])
+                    print("matches  =", {unique_query_terms[i][0]: all_cursors[i] for i in frontier_cursor_ids})
+                    print("score    =", score)
+                for i in frontier_cursor_ids:
+                    all_cursors[i] = next(posting_lists[i], None)
+
+            # Otherwise, skip ahead to the pivot document.
+            else:
+                for i in remaining_cursor_ids[:pivot]:
+                    if all_cursors[i].document_id < pivot_document_id:
+                        all_cursors[i] = PostingsMerger.advance_to(posting_lists[i], pivot_document_id)
+
+            remaining_cursor_ids = [i for i in remaining_cursor_ids if all_cursors[i]]
+
+    def __evaluate_impact_ordered(self, unique_query_terms: List[Tuple[str, int]], required_minimum: int,
+                                  sieve: Sieve, ranker: Ranker, debug: bool) -> bool:
+        """
+        Does score-at-a-time traversal over impact-ordered posting lists, sifting the matches through the given
+        sieve. Returns False if the ranker can't provide score upper bounds, in which case nothing is done.
+
+        The postings are processed in order of descending upper bound, across all the query terms. Whenever
+        we encounter a document that we haven't seen before, we look up its term frequencies for the other
+        query terms and score it in full. The bounds of the next posting in each list add up to an upper bound
+        on the score of any document we haven't seen yet, so we can stop as soon as this bound can't beat the
+        lowest score in a full sieve. For queries over common terms this happens after a tiny fraction of the
+        postings have been processed.
+        """
+        impacts = [self.__inverted_index.get_impact_ordered_arrays(term) for (term, _) in unique_query_terms]
+
+        def bound(i: int, position: int) -> Optional[float]:
+            (term, multiplicity) = unique_query_terms[i]
+            (document_ids, term_frequencies) = impacts[i]
+            if position >= len(document_ids):
+                return -math.inf  # The list is exhausted.
+            return ranker.upper_bound(term, multiplicity, term_frequencies[position])
+
+        positions = [0] * len(impacts)
+        bounds = [bound(i, 0) for i in range(len(impacts))]
+        if any(b is None for b in bounds):
+            return False
+        lookups = [self.__inverted_index.get_postings_arrays(term) for (term, _) in unique_query_terms]
+        seen = set()
+        while True:
+
+            # Can any document we haven't seen yet make it into the sieve? Such a document can only contain the
+            # terms whose lists are not yet exhausted. If the bounds of more than one list are summed up, allow
+            # for some slack so that rounding errors never lead us to stop too early.
+            active = [b for b in bounds if b > -math.inf]
+            if len(active) < required_minimum or not active:
+                break
+            threshold = sieve.minimum()
+            slack = 1e-9 * abs(threshold or 0.0) if len(active) > 1 else 0.0
+            if threshold is not None and sum(active) <= threshold - slack:
+                break
+
+            # Consume the posting having the highest bound. Bounds only change when the term frequency does.
+            i = max(range(len(bounds)), key=bounds.__getitem__)
+            (document_ids, term_frequencies) = impacts[i]
+            document_id = document_ids[positions[i]]
+            positions[i] += 1
+            if positions[i] >= len(document_ids) or term_frequencies[positions[i]] != term_frequencies[positions[i] - 1]:
+                bounds[i] = bound(i, positions[i])
+            if document_id in seen:
+                continue
+            seen.add(document_id)
+
+            # Score the document in full, looking up the postings for the other query terms.
+            matches = []
+            for (j, (ids, frequencies)) in enumerate(lookups):
+                position = bisect_left(ids, document_id)
+                if position < len(ids) and ids[position] == document_id:
+                    matches.append((j, Posting(document_id, frequencies[position])))
+            if len(matches) < required_minimum:
+                continue
+            ranker.reset(document_id)
+            for (j, posting) in matches:
+                ranker.update(unique_query_terms[j][0], unique_query_terms[j][1], posting)
+            score = ranker.evaluate()
+            sieve.sift(score, document_id)
+            if debug:
+                print("*** MATCH")
+                print("document =", self.__corpus[document_id])
+                print("matches  =", {unique_query_terms[j][0]: posting for (j, posting) in matches})
+                print("score    =", score)
+        return True
+
+    def __evaluate_taat(self, unique_query_terms: List[Tuple[str, int]], required_minimum: int, hit_count: int,
+                        ranker: Ranker, debug: bool) -> Optional[List[Tuple[float, int]]]:
+        """
+        Does term-at-a-time traversal, i.e., processes the posting lists one after the other while
+        accumulating per-document scores and match counts. Returns the best matches as (score, document
+        identifier) pairs sorted in descending order, so that tied documents come in descending order of
+        document identifier just as with the sieve used by document-at-a-time traversal. Returns None if
+        the ranker can't score postings in bulk.
+
+        The work is vectorized using NumPy. Score accumulation happens in query term order, so the
+        scores are identical to those produced by document-at-a-time traversal.
+        """
+        document_ids = []
+        contributions = []
+        for (term, multiplicity) in unique_query_terms:
+            (ids, term_frequencies) = self.__inverted_index.get_postings_arrays(term)
+            (ids, term_frequencies) = (np.frombuffer(ids, dtype=np.uint32), np.frombuffer(term_frequencies, dtype=np.uint32))
+            scores = ranker.contributions(term, multiplicity, ids, term_frequencies)
+            if scores is None:
+                return None
+            document_ids.append(ids)
+            contributions.append(scores)
+
+        # Accumulate the contributions. A dense accumulator is just an array indexed by document
+        # identifier. A sparse accumulator only has entries for the document identifiers that occur.
+        # Within a posting list a document identifier occurs once, so fancy indexing is safe.
+        postings = sum(len(ids) for ids in document_ids)
+        universe = max((int(ids[-1]) + 1 for ids in document_ids if len(ids)), default=0)
+        if universe <= __class__.SPARSE_ACCUMULATOR_RATIO * postings:
+            scores = np.zeros(universe, dtype=np.float64)
+            counts = np.zeros(universe, dtype=np.int32)
+            for (ids, contribution) in zip(document_ids, contributions):
+                scores[ids] += contribution
+                counts[ids] += 1
+            candidates = np.flatnonzero(counts >= required_minimum)
+            scores = scores[candidates]
+        else:
+            (candidates, inverse) = np.unique(np.concatenate(document_ids), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(contributions), minlength=len(candidates))
+            counts = np.bincount(inverse, minlength=len(candidates))
+            selected = counts >= required_minimum
+            (candidates, scores) = (candidates[selected], scores[selected])
+        scores = ranker.finalize_scores(candidates, scores)
+
+        # Keep the best matches. Include all ties with the worst of the best, and let the final sort
+        # resolve the ties by descending document identifier, like Sieve.winners/0 does.
+        if len(scores) > hit_count:
+            threshold = np.partition(scores, len(scores) - hit_count)[len(scores) - hit_count]
+            selected = scores >= threshold
+            (candidates, scores) = (candidates[selected], scores[selected])
+        order = np.lexsort((candidates, scores))[::-1][:hit_count]
+        winners = [(float(scores[i]), int(candidates[i])) for i in order]
+        if debug:
+            for (score, document_id) in winners:
+                print("*** MATCH")
+                print("document =", self.__corpus[document_id])
+                print("score    =", score)
+        return winners
+
+
+# The search engine used by the current worker process, when evaluating queries in parallel.
+_engine: Optional[SimpleSearchEngine] = None
+
+
+def _initialize_worker(engine: SimpleSearchEngine) -> None:
+    """
+    Prepares a worker process for evaluating batches of queries. Runs once per worker process, so that
+    the search engine only has to be passed to each worker once.
+    """
+    global _engine
+    _engine = engine
+
+
+def _evaluate_batch(queries: List[str], options: dict, ranker_factory: Callable[[], Ranker]) -> List[List[Tuple[float, int]]]:
+    """
+    Evaluates a batch of queries in a worker process. Must be defined at module level.
+    """
+    return _engine._evaluate_batch(queries, options, ranker_factory)
@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from typing import Any, Dict, Iterator, Iterable, Tuple, List
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, Iterable
+import numpy as np
 from .corpus import Corpus
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
@@ -13,82 +16,106 @@ class SuffixArray:
     A simple suffix array implementation. Allows us to conduct efficient substring searches.
     The prefix of a suffix is an infix!
 
-    In a serious application we'd make use of least common prefixes (LCPs), pay more attention
-    to memory usage, and add more lookup/evaluation features.
+    The searchable content of all documents is concatenated into a single haystack, with a
+    separator character between documents and between fields. The separator never occurs in
+    a normalized query, so no match can span two documents or two fields. Only suffixes that
+    start on a token boundary are kept, stored as offsets into the haystack.
+
+    In a serious application we'd make use of least common prefixes (LCPs), and add more
+    lookup/evaluation features.
     """
 
+    # Separates the documents, and the fields within a document, in the haystack.
+    SEPARATOR = "\0"
+
     def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer):
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
-        self.__haystack: List[Tuple[int, str]] = []  # The (<document identifier>, <searchable content>) pairs.
-        self.__suffixes: List[Tuple[int, int]] = []  # The sorted (<haystack index>, <start offset>) pairs.
-        self.__build_suffix_array(fields)  # Construct the haystack and the suffix array itself.
+        self.__haystack = ""  # The searchable content of all documents, concatenated.
+        self.__document_ids = array("i")  # The document identifier of each document in the haystack.
+        self.__starts = np.zeros(0, dtype=np.int64)  # Where each document starts in the haystack.
+        self.__suffixes = array("i")  # The sorted suffixes, as offsets into the haystack.
+        self.__build_suffix_array(list(fields))  # Construct the haystack and the suffix array itself.
 
     def __build_suffix_array(self, fields: Iterable[str]) -> None:
         """
         Builds a simple suffix array from the set of named fields in the document collection.
         The suffix array allows us to search across all named fields in one go.
+
+        All suffixes of the haystack are sorted using prefix doubling, and the ones that don't
+        start on a token boundary are then dropped. That way no substrings need to be sliced out
+        and compared while sorting.
         """
-        
-        self.__haystack = [ (doc.document_id, self.__normalize("".join([ doc.get_field(field, None) for field in fields ]))) for doc in self.__corpus ]
-        self.__suffixes = [ (h_id, t_start+i) for h_id, searchable_content in self.__haystack for tok, (t_start, _) in self.__tokenizer.tokens(searchable_content) for i in range(len(tok))]
-        
-        # ADD HAYSTACKS
-        # for doc in self.__corpus:
-        #     con = "".join([ doc.get_field(field, None) for field in fields ])
-        #     res = (doc.document_id, self.__normalize(con))
-        #     self.__haystack.append(res)
-        
-        # ADD SUFFIXES
-        # for h_id, searchable_content in self.__haystack:
-        #     for t_start, t_end in self.__tokenizer.ranges(searchable_content):
-        #         for i in range(t_start, t_end):
-        #             self.__suffixes.append((h_id, i))
-        
-        # sorts suffixes
-        self.__suffixes.sort(key = lambda x : self.__find_token(x[0], x[1]))
-        
-    def __find_token(self, doc_id: int, offset: int, end = None) -> str:
-        if (end):
-            return self.__haystack[doc_id][1][offset:end]
-        return self.__haystack[doc_id][1][offset:]
+        contents = []
+        starts = []
+        token_starts = array("i")
+        offset = 0
+        for document in self.__corpus:
+            content = __class__.SEPARATOR.join(self.__normalize(document.get_field(f, "")) for f in fields)
+            contents.append(content)
+            starts.append(offset)
+            self.__document_ids.append(document.document_id)
+            token_starts.extend(offset + start for (start, _) in self.__tokenizer.ranges(content))
+            offset += len(content) + len(__class__.SEPARATOR)
+        self.__haystack = __class__.SEPARATOR.join(contents)
+        self.__starts = np.array(starts, dtype=np.int64)
+        codes = np.frombuffer(self.__haystack.encode("utf-32-le"), dtype=np.uint32)
+        is_token_start = np.zeros(len(codes), dtype=bool)
+        is_token_start[np.frombuffer(token_starts, dtype=np.int32)] = True
+        suffixes = __class__.__sort_suffixes(codes)
+        self.__suffixes = array("i", suffixes[is_token_start[suffixes]].astype(np.int32).tobytes())
+
+    @staticmethod
+    def __sort_suffixes(codes: np.ndarray) -> np.ndarray:
+        """
+        Returns the offsets of all the suffixes of the given string of code points, in sorted order.
+        Uses prefix doubling: Once the suffixes have been ranked by their first k code points, ranking
+        them by their first 2k code points amounts to sorting pairs of ranks. A suffix that is shorter
+        than 2k code points is paired with -1, so that it comes before any suffix it is a prefix of.
+        Each round is vectorized, and we're done when all ranks are unique. This takes O(log n) rounds,
+        or fewer if the haystack has no long repeated substrings.
+        """
+        size = len(codes)
+        if size == 0:
+            return np.zeros(0, dtype=np.int64)
+        ranks = np.unique(codes, return_inverse=True)[1].astype(np.int64)
+        order = np.argsort(ranks, kind="stable")
+        k = 1
+        while int(ranks.max()) < size - 1:
+            following = np.full(size, -1, dtype=np.int64)
+            following[:size - k] = ranks[k:]
+            order = np.lexsort((following, ranks))
+            (first, second) = (ranks[order], following[order])
+            changes = (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+            ranks[order] = np.concatenate(([0], np.cumsum(changes)))
+            k *= 2
+        return order
 
     def __normalize(self, buffer: str) -> str:
         """
         Produces a normalized version of the given string. Both queries and documents need to be
-        identically processed for lookups to succeed.
+        identically processed for lookups to succeed. The tokens are joined by single spaces, so
+        that differences in whitespace and punctuation between tokens don't matter.
         """
-        
-        return self.__normalizer.normalize(self.__normalizer.canonicalize(buffer))
+        return self.__normalizer.normalize(" ".join(self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))))
 
-    def __binary_search(self, needle: str) -> int:
+    def __binary_search(self, needle: str) -> range:
         """
         Does a binary search for a given normalized query (the needle) in the suffix array (the haystack).
-        Returns the position in the suffix array where the normalized query is either found, or, if not found,
-        should have been inserted.
+        Returns the range of positions in the suffix array where the suffixes start with the needle. The
+        range is empty if there are no such suffixes, and then starts where the needle should have been
+        inserted.
 
-        Kind of silly to roll our own binary search instead of using the bisect module, but seems needed
-        prior to Python 3.10 due to how we represent the suffixes via (index, offset) tuples. Version 3.10
-        added support for specifying a key.
+        Only the first len(needle) characters of a suffix matter when comparing it with the needle, so
+        suffixes are compared by their prefixes of that length.
         """
-        
-        low, high = 0, len(self.__suffixes) - 1
-            
-        while low <= high:
-            mid = (low + high) // 2
-            
-            suffix = self.__suffixes[mid]
-            tok = self.__find_token(suffix[0], suffix[1])
-            
-            if tok == needle:
-                return mid
-            elif tok < needle:
-                low = mid + 1
-            else:
-                high = mid - 1
-        
-        return low
+        def prefix(offset: int) -> str:
+            return self.__haystack[offset:offset + len(needle)]
+
+        low = bisect_left(self.__suffixes, needle, key=prefix)
+        high = bisect_right(self.__suffixes, needle, lo=low, key=prefix)
+        return range(low, high)
 
     def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
         """
@@ -106,40 +133,18 @@ class SuffixArray:
         The results yielded back to the client are dictionaries having the keys "score" (int) and
         "document" (Document).
         """
-        
         query = self.__normalize(query)
-        start_pos = self.__binary_search(query)
-        
-        matches = {}
-        sieve = Sieve(len(self.__suffixes))
-        
-        # Collect matching documents and count matches
-        for i in range(start_pos, len(self.__suffixes)):
-            hi, so = self.__suffixes[i]
-            
-            to_be_checked = self.__find_token(hi, so, so+len(query))
-            
-            # if start of suffix == query
-            if to_be_checked == query:
-                
-                # if first match
-                if (not matches.get(hi, None)):
-                    matches[hi] = {
-                        "score": 0,
-                        "document": self.__corpus[hi]
-                    }
-                
-                matches[hi]["score"] += 1
-        
-                sieve.sift(matches[hi]["score"], hi)
-        
-        
-        winners = sieve.winners()
-        
-        # TODO: LIMIT ITERATOR TO HIT_COUNT
-        # counter = options.get("hit_count", len(list(winners)))
-        # winners = iter(winners[:counter])
-        
-        for w in winners:
-            yield {"score":w[0], "document":self.__corpus[w[1]]}
-        
\ No newline at end of file
+        if not query:
+            return
+        hit_count = max(1, min(100, options.get("hit_count", 10)))
+
+        # Map the matching suffixes to the documents they occur in, and count the occurrences per document.
+        matches = self.__binary_search(query)
+        offsets = np.frombuffer(self.__suffixes, dtype=np.int32)[matches.start:matches.stop]
+        documents = np.searchsorted(self.__starts, offsets, side="right") - 1
+        (documents, counts) = np.unique(documents, return_counts=True)
+
+        sieve = Sieve(hit_count)
+        sieve.sift_many(counts, documents)
+        for (score, document) in sieve.winners():
+            yield {"score": score, "document": self.__corpus[self.__document_ids[document]]}
@@ -1,16 +1,37 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from struct import pack
-from typing import Tuple
+from array import array
+from typing import Iterable, Optional, Tuple
+import numpy as np
 
 
 class VariableByteCodec:
     """
     A simple encoder/decoder for variable-byte encoding. See Figure 5.8 in
     https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Besides the one-number-at-a-time interface, bulk variants are offered that
+    process a whole sequence of numbers per invocation, and are what we use when
+    handling posting lists block by block. Unless the sequence is short,
+    the bulk variants are vectorized using NumPy: When decoding, the bytes having
+    the stop bit set mark where each number ends, and the 7-bit payloads are
+    shifted into place and summed per number. When encoding, the byte length of
+    each number is computed up front, so that each byte position can be filled in
+    for all numbers at once. Bulk-decoded numbers are returned as unsigned 32-bit
+    integers, packed in an array.
     """
 
+    # Sequences shorter than this are processed one number at a time, since the
+    # fixed overhead of the vectorized path then outweighs its benefits.
+    VECTORIZE_THRESHOLD = 128
+
+    # The most bytes a number that fits in 32 bits can be encoded as.
+    MAX_BYTES_PER_NUMBER = 5
+
+    # The smallest number that needs k + 2 bytes, at index k.
+    __LIMITS = np.array([1 << (7 * k) for k in range(1, 10)], dtype=np.uint64)
+
     @staticmethod
     def encode(number: int, destination: bytearray) -> int:
         """
@@ -19,16 +40,16 @@ class VariableByteCodec:
         """
         assert destination is not None
         assert number >= 0
-        values = []
-        while True:
-            values.append(number % 128)
-            if number < 128:
-                break
-            number = number // 128
-        values.reverse()
-        values[-1] += 128
-        destination.extend(pack('%dB' % len(values), *values))
-        return len(values)
+        if number < 128:
+            destination.append(number + 128)
+            return 1
+        length = len(destination)
+        shift = ((number.bit_length() - 1) // 7) * 7
+        while shift > 0:
+            destination.append((number >> shift) & 127)
+            shift -= 7
+        destination.append((number & 127) + 128)
+        return len(destination) - length
 
     @staticmethod
     def decode(source: bytearray, start: int) -> Tuple[int, int]:
@@ -50,3 +71,113 @@ class VariableByteCodec:
             else:
                 number = 128 * number + (byte - 128)
                 return (number, where - start)
+
+    @staticmethod
+    def encode_many(numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes all the given numbers, and appends the resulting bytes to the given
+        destination buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        if not isinstance(numbers, (list, tuple, array, np.ndarray)):
+            numbers = list(numbers)
+        if len(numbers) >= VariableByteCodec.VECTORIZE_THRESHOLD:
+            values = np.asarray(numbers)
+            if values.dtype.kind in "iu" and values.itemsize <= 8:
+                assert values.min() >= 0
+                return VariableByteCodec.__encode_vectorized(values.astype(np.uint64), destination)
+        length = len(destination)
+        append = destination.append
+        for number in numbers:
+            if 0 <= number < 128:
+                append(number + 128)
+                continue
+            assert number >= 0
+            shift = ((number.bit_length() - 1) // 7) * 7
+            while shift > 0:
+                append((number >> shift) & 127)
+                shift -= 7
+            append((number & 127) + 128)
+        return len(destination) - length
+
+    @staticmethod
+    def decode_many(source: bytearray, start: int, count: int) -> Tuple[array, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next count
+        numbers. Returns a pair comprised of the decoded numbers, and the number of
+        bytes read from the source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        numbers = array("I")
+        if count == 0:
+            return (numbers, 0)
+        if count >= VariableByteCodec.VECTORIZE_THRESHOLD:
+            decoded = VariableByteCodec.__decode_vectorized(source, start, count)
+            if decoded is not None:
+                return decoded
+        append = numbers.append
+        number = 0
+        where = start
+        with memoryview(source) as view:
+            for byte in view[start:]:
+                where += 1
+                if byte < 128:
+                    number = (number << 7) + byte
+                else:
+                    append((number << 7) + byte - 128)
+                    number = 0
+                    count -= 1
+                    if count == 0:
+                        return (numbers, where - start)
+        raise IndexError("Unexpected end of buffer")
+
+    @staticmethod
+    def __encode_vectorized(values: np.ndarray, destination: bytearray) -> int:
+        """
+        Vectorized implementation of encode_many/2, for non-negative 64-bit numbers.
+        """
+        if values.max() < 128:  # Common for gaps and term frequencies, and then every number is a single byte.
+            destination.extend((values | np.uint64(128)).astype(np.uint8).tobytes())
+            return len(values)
+        lengths = np.searchsorted(VariableByteCodec.__LIMITS, values, side="right") + 1
+        ends = np.cumsum(lengths) - 1  # Where the last byte of each number goes.
+        encoded = np.empty(int(ends[-1]) + 1, dtype=np.uint8)
+        encoded[ends] = (values & np.uint64(127)) | np.uint64(128)
+        for k in range(1, int(lengths.max())):
+            present = lengths > k
+            encoded[ends[present] - k] = (values[present] >> np.uint64(7 * k)) & np.uint64(127)
+        destination.extend(encoded.tobytes())
+        return len(encoded)
+
+    @staticmethod
+    def __decode_vectorized(source: bytearray, start: int, count: int) -> Optional[Tuple[array, int]]:
+        """
+        Vectorized implementation of decode_many/3. Returns None if some number is too
+        large to fit in 32 bits, so that the caller can fall back to decoding one number
+        at a time.
+        """
+        with memoryview(source) as view:
+            window = bytes(view[start:start + count * VariableByteCodec.MAX_BYTES_PER_NUMBER])
+            exhausted = start + len(window) >= len(view)
+        encoded = np.frombuffer(window, dtype=np.uint8)
+        if len(encoded) >= count and encoded[:count].min() >= 128:  # Every number is a single byte.
+            return (array("I", (encoded[:count] & 127).astype(np.uint32).tobytes()), count)
+        ends = np.flatnonzero(encoded >= 128)[:count]  # The last byte of each number.
+        if len(ends) < count:
+            if exhausted:
+                raise IndexError("Unexpected end of buffer")
+            return None
+        lengths = np.diff(ends, prepend=-1)
+        longest = int(lengths.max())
+        if longest > VariableByteCodec.MAX_BYTES_PER_NUMBER:
+            return None
+        payloads = (encoded & 127).astype(np.uint64)
+        values = payloads[ends]
+        for k in range(1, longest):
+            present = lengths > k
+            values[present] += payloads[ends[present] - k] << np.uint64(7 * k)
+        if longest == VariableByteCodec.MAX_BYTES_PER_NUMBER and values.max() >= 1 << 32:
+            return None
+        return (array("I", values.astype(np.uint32).tobytes()), int(ends[-1]) + 1)
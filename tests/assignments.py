@@ -36,10 +36,12 @@ def assignment_e_suite() -> unittest.TestSuite:
 
 def assignment_x_suite() -> unittest.TestSuite:
     return build_test_suite(["TestSimpleNormalizer", "TestSimpleTokenizer", "TestInMemoryDictionary",
-                             "TestInMemoryDocument", "TestInMemoryCorpus", "TestSieve", "TestVariableByteCodec",
-                             "TestInMemoryPostingList", "TestCompressedInMemoryPostingList",
-                             "TestInMemoryInvertedIndexWithCompression", "TestExpressionComposer",
-                             "TestShallowCaseExtractor", "TestDocumentPipeline", "TestSimpleRanker",
+                             "TestInMemoryDocument", "TestInMemoryCorpus", "TestSieve", "TestVariableByteCodec", "TestIntegerCodec",
+                             "TestInMemoryPostingList", "TestCompactInMemoryPostingList", "TestCompressedInMemoryPostingList",
+                             "TestInMemoryInvertedIndexWithCompression", "TestMemoryMappedInvertedIndex",
+                             "TestSegmentedInvertedIndex", "TestExpressionComposer",
+                             "TestShallowCaseExtractor", "TestDocumentPipeline", "TestSimpleRanker", "TestBM25Ranker",
+                             "TestLRUCache", "TestCachingSearchEngine", "TestAsyncSearchEngine", "TestScoringStatistics",
                              "TestSoundexNormalizer", "TestPorterNormalizer",
                              "TestSimilaritySearchEngine"])
 
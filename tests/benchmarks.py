@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os, random, sys
+from timeit import default_timer as timer
+from context import in3120
+
+
+def data_path(filename: str):
+    here = os.path.dirname(__file__)
+    data = os.path.join(here, "..", "data")
+    full = os.path.abspath(os.path.join(data, filename))
+    return full
+
+
+def build_postings(corpus: in3120.Corpus, fields, normalizer, tokenizer):
+    # Go through the index, so that we measure the same posting lists as the index builds.
+    index = in3120.InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer, compact=True)
+    postings = {}
+    for term in index.get_vocabulary():
+        (document_ids, term_frequencies) = index.get_postings_arrays(term)
+        postings[term] = (list(document_ids), list(term_frequencies))
+    return postings
+
+
+def benchmark_codecs():
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    block_size = in3120.CompressedInMemoryPostingList.BLOCK_SIZE
+    for filename in ["cran.xml", "mesh.txt", "en.txt"]:
+        print(f"Collecting postings from {filename}...")
+        corpus = in3120.InMemoryCorpus(data_path(filename))
+        postings = build_postings(corpus, ["body"], normalizer, tokenizer)
+        blocks = []
+        for (document_ids, term_frequencies) in postings.values():
+            previous = [0] + document_ids[:-1]
+            gaps = [d - p for (d, p) in zip(document_ids, previous)]
+            for i in range(0, len(gaps), block_size):
+                blocks.append((gaps[i:i + block_size], term_frequencies[i:i + block_size]))
+        count = sum(len(gaps) for (gaps, _) in blocks)
+        print(f"{len(postings)} posting lists, {count} postings, {len(blocks)} blocks.")
+        for name in in3120.IntegerCodec.names():
+            codec = in3120.IntegerCodec.create(name)
+            data = bytearray()
+            layout = []
+            for (gaps, term_frequencies) in blocks:
+                layout.append((len(data), len(gaps)))
+                codec.encode_many(gaps, data)
+                codec.encode_many(term_frequencies, data)
+            start = timer()
+            for (offset, size) in layout:
+                (_, length) = codec.decode_many(data, offset, size)
+                codec.decode_many(data, offset + length, size)
+            end = timer()
+            print(f"{name:>12}: {len(data) / count:6.3f} bytes/posting, {count / (end - start):12.0f} postings/second")
+
+
+def benchmark_queries():
+    print("Indexing English news corpus...")
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    ranker = in3120.SimpleRanker()
+    for compact in [False, True]:
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compact=compact)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        vocabulary = sorted(index.get_vocabulary(), key=lambda t: (-index.get_document_frequency(t), t))[:1000]
+        rng = random.Random(1)
+        queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 5))) for _ in range(500)]
+        print(f"Posting lists are {'compact' if compact else 'not compact'}.")
+        for evaluation in ["exhaustive", "taat"]:
+            for match_threshold in [0.1, 0.5, 1.0]:
+                options = {"debug": False, "hit_count": 5, "match_threshold": match_threshold, "evaluation": evaluation}
+                start = timer()
+                for query in queries:
+                    for _ in engine.evaluate(query, options, ranker):
+                        pass
+                end = timer()
+                print(f"{evaluation:>10}, match_threshold {match_threshold}: {len(queries) / (end - start):8.1f} queries/second")
+
+
+def main():
+    benchmarks = {
+        "codecs": benchmark_codecs,
+        "queries": benchmark_queries,
+    }
+    targets = [target.lower() for target in sys.argv[1:]]
+    if not targets or any(target not in benchmarks for target in targets):
+        print(f"{sys.argv[0]} [{'|'.join(key for key in benchmarks.keys())}]")
+    else:
+        for target in targets:
+            benchmarks[target]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import contextlib
+import threading
+import time
+import unittest
+from context import in3120
+
+
+class SlowSearchEngine:
+    """
+    Yields a given number of matches, sleeping before each. Keeps track of how many queries
+    that are being evaluated at the same time, and of how many matches that have been produced.
+    """
+
+    def __init__(self, delay: float, count: int):
+        self.delay = delay
+        self.count = count
+        self.produced = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def evaluate(self, query: str, options: dict):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            for i in range(self.count):
+                time.sleep(self.delay)
+                if query == "fail":
+                    raise ValueError("fail")
+                with self.lock:
+                    self.produced += 1
+                yield {"score": float(i), "document": None}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestAsyncSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def test_matches_synchronous_evaluation(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        ranker = in3120.SimpleRanker()
+        options = {"match_threshold": 0.5, "hit_count": 5}
+        queries = ["water pollution", "hydrogen", "xyzzy", ""]
+        expected = [[(m["score"], m["document"].document_id) for m in engine.evaluate(q, options, ranker)]
+                    for q in queries]
+
+        async def run(facade):
+            async with facade:
+                results = await asyncio.gather(*(facade.search(q, options, ranker) for q in queries))
+                streamed = [m async for m in facade.evaluate(queries[0], options, ranker)]
+            return [[(m["score"], m["document"].document_id) for m in r] for r in results + [streamed]]
+
+        for processes in [False, True]:
+            results = asyncio.run(run(in3120.AsyncSearchEngine(engine, 2, processes)))
+            self.assertListEqual(results, expected + expected[:1])
+
+    def test_suffix_array(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "the foo bar"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "foo foo baz"}))
+        engine = in3120.SuffixArray(corpus, ["a"], self.__normalizer, self.__tokenizer)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine) as facade:
+                return await facade.search("fo", {"hit_count": 5})
+
+        expected = [(m["score"], m["document"].document_id) for m in engine.evaluate("fo", {"hit_count": 5})]
+        self.assertGreater(len(expected), 0)
+        self.assertListEqual([(m["score"], m["document"].document_id) for m in asyncio.run(run())], expected)
+
+    def test_timeout(self):
+        engine = SlowSearchEngine(0.01, 100)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine, timeout=0.2) as facade:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await facade.search("foo", {})
+                self.assertEqual(len(await facade.search("foo", {}, timeout=10.0)), 100)
+
+        asyncio.run(run())
+
+    def test_early_exit_abandons_evaluation(self):
+        engine = SlowSearchEngine(0.01, 1000)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine) as facade:
+                async with contextlib.aclosing(facade.evaluate("foo", {})) as matches:
+                    async for match in matches:
+                        if match["score"] >= 2:
+                            break
+                await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        self.assertLess(engine.produced, 100)
+
+    def test_bounded_concurrency(self):
+        engine = SlowSearchEngine(0.01, 5)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine, workers=8, max_concurrency=3) as facade:
+                return await asyncio.gather(*(facade.search(str(i), {}) for i in range(10)))
+
+        results = asyncio.run(run())
+        self.assertListEqual([len(r) for r in results], [5] * 10)
+        self.assertLessEqual(engine.peak, 3)
+
+    def test_abandoned_queries_keep_their_turn(self):
+        engine = SlowSearchEngine(0.3, 1)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine, workers=4, max_concurrency=1) as facade:
+                results = await asyncio.gather(*(facade.search(str(i), {}, timeout=0.05) for i in range(3)),
+                                               return_exceptions=True)
+                self.assertTrue(all(isinstance(r, asyncio.TimeoutError) for r in results))
+                self.assertEqual(len(await facade.search("foo", {}, timeout=10.0)), 1)
+
+        asyncio.run(run())
+        self.assertEqual(engine.peak, 1)
+
+    def test_failures_propagate(self):
+        engine = SlowSearchEngine(0.0, 5)
+
+        async def run():
+            async with in3120.AsyncSearchEngine(engine) as facade:
+                with self.assertRaises(ValueError):
+                    await facade.search("fail", {})
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
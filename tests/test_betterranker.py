@@ -33,6 +33,12 @@ class TestBetterRanker(unittest.TestCase):
         self.assertGreater(score2, 0.0)
         self.assertGreater(score2, score1)
 
+    def test_upper_bound(self):
+        for (term, document_id, term_frequency) in [("foo", 0, 1), ("foo", 2, 2), ("bar", 4, 2), ("the", 3, 1)]:
+            self.__ranker.reset(document_id)
+            self.__ranker.update(term, 1, in3120.Posting(document_id, term_frequency))
+            self.assertLessEqual(self.__ranker.evaluate(), self.__ranker.upper_bound(term, 1, 2) + 1e-9)
+
     def test_document_id_mismatch(self):
         self.__ranker.reset(21)
         with self.assertRaises(AssertionError):
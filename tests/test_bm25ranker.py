@@ -0,0 +1,79 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import unittest
+from context import in3120
+
+
+class TestBM25Ranker(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"title": "foo", "body": "the foo"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"title": "foo", "body": "the foo bar bar bar bar"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"title": "bar", "body": "the foo foo"}))
+        corpus.add_document(in3120.InMemoryDocument(3, {"title": "baz", "body": "the bar"}))
+        self.__index = in3120.InMemoryInvertedIndex(corpus, ["title", "body"], self.__normalizer, self.__tokenizer)
+        self.__ranker = in3120.BM25Ranker(self.__index)
+
+    def __score(self, ranker: in3120.Ranker, term: str, document_id: int, term_frequency: int) -> float:
+        ranker.reset(document_id)
+        ranker.update(term, 1, in3120.Posting(document_id, term_frequency))
+        return ranker.evaluate()
+
+    def test_formula(self):
+        (k1, b) = (1.2, 0.75)
+        average = (3 + 7 + 4 + 3) / 4
+        idf = math.log(1.0 + (4 - 3 + 0.5) / (3 + 0.5))
+        expected = 2 * (k1 + 1) / (2 + k1 * (1 - b + b * 7 / average)) * idf
+        self.assertAlmostEqual(self.__score(self.__ranker, "foo", 1, 2), expected, 12)
+
+    def test_term_frequency_saturates(self):
+        scores = [self.__score(self.__ranker, "foo", 0, tf) for tf in range(1, 100)]
+        self.assertTrue(all(s1 < s2 for (s1, s2) in zip(scores, scores[1:])))
+        self.assertLess(scores[-1], (1.2 + 1) * math.log(1.0 + 1.5 / 3.5))
+
+    def test_length_normalization(self):
+        self.assertGreater(self.__score(self.__ranker, "foo", 0, 1), self.__score(self.__ranker, "foo", 1, 1))
+        ranker = in3120.BM25Ranker(self.__index, b=0.0)
+        self.assertEqual(self.__score(ranker, "foo", 0, 1), self.__score(ranker, "foo", 1, 1))
+
+    def test_inverse_document_frequency(self):
+        self.assertGreater(self.__score(self.__ranker, "baz", 3, 1), self.__score(self.__ranker, "bar", 3, 1))
+        self.assertGreater(self.__score(self.__ranker, "the", 3, 1), 0.0)
+
+    def test_field_length_weights(self):
+        ranker = in3120.BM25Ranker(self.__index, field_length_weights={"title": 1.0})
+        self.assertEqual(self.__score(ranker, "foo", 0, 1), self.__score(ranker, "foo", 1, 1))
+        with self.assertRaises(AssertionError):
+            in3120.BM25Ranker(self.__index, field_length_weights={"nope": 1.0})
+
+    def test_upper_bound(self):
+        for (term, document_id, term_frequency) in [("foo", 0, 1), ("foo", 2, 2), ("bar", 1, 4), ("the", 3, 1)]:
+            score = self.__score(self.__ranker, term, document_id, term_frequency)
+            self.assertLessEqual(score, self.__ranker.upper_bound(term, 1, 4))
+
+    def test_document_id_mismatch(self):
+        self.__ranker.reset(21)
+        with self.assertRaises(AssertionError):
+            self.__ranker.update("foo", 1, in3120.Posting(42, 4))
+
+    def test_evaluation_strategies_agree(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, compact=True)
+        ranker = in3120.BM25Ranker(index)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        for query in ["experimental investigation of the aerodynamics of a wing", "boundary layer", "flutter"]:
+            results = []
+            for evaluation in ["exhaustive", "wand", "taat"]:
+                options = {"match_threshold": 0.5, "hit_count": 10, "evaluation": evaluation}
+                results.append([(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)])
+            self.assertListEqual(results[0], results[1])
+            self.assertListEqual(results[0], results[2])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestCachingSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def __results(self, matches):
+        return [(match["score"], match["document"].document_id) for match in matches]
+
+    def test_results_are_cached(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        reference = in3120.SimpleSearchEngine(corpus, index)
+        engine = in3120.CachingSearchEngine(corpus, index)
+        ranker = in3120.SimpleRanker()
+        options = {"match_threshold": 0.5, "hit_count": 5}
+        expected = self.__results(reference.evaluate("water pollution", options, ranker))
+        self.assertListEqual(self.__results(engine.evaluate("water pollution", options, ranker)), expected)
+        self.assertListEqual(self.__results(engine.evaluate("WATER  Pollution", options, ranker)), expected)
+        self.assertListEqual(self.__results(engine.evaluate("water pollution", {"match_threshold": 0.5, "hit_count": 5, "debug": False}, ranker)), expected)
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hits"], 2)
+        self.assertEqual(statistics["size"], 1)
+
+    def test_key_includes_options_and_ranker(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        reference = in3120.SimpleSearchEngine(corpus, index)
+        engine = in3120.CachingSearchEngine(corpus, index)
+        rankers = [in3120.SimpleRanker(), in3120.BetterRanker(corpus, index)]
+        for ranker in rankers:
+            for options in [{"match_threshold": 0.5, "hit_count": 5}, {"match_threshold": 1.0, "hit_count": 5},
+                            {"match_threshold": 0.5, "hit_count": 10}]:
+                for _ in range(2):
+                    self.assertListEqual(self.__results(engine.evaluate("water pollution", options, ranker)),
+                                         self.__results(reference.evaluate("water pollution", options, ranker)))
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["misses"], 6)
+        self.assertEqual(statistics["hits"], 6)
+
+    def test_invalidation_on_index_change(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "the foo"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "the foo foo"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.CachingSearchEngine(corpus, index)
+        ranker = in3120.SimpleRanker()
+        options = {"match_threshold": 1.0, "hit_count": 10}
+        self.assertListEqual(self.__results(engine.evaluate("foo", options, ranker)), [(2.0, 1), (1.0, 0)])
+        corpus.add_document(in3120.InMemoryDocument(2, {"body": "foo foo foo"}))
+        index.add_document(corpus[2])
+        self.assertListEqual(self.__results(engine.evaluate("foo", options, ranker)), [(3.0, 2), (2.0, 1), (1.0, 0)])
+        index.delete_document(1)
+        self.assertListEqual(self.__results(engine.evaluate("foo", options, ranker)), [(3.0, 2), (1.0, 0)])
+        self.assertListEqual(self.__results(engine.evaluate("foo", options, ranker)), [(3.0, 2), (1.0, 0)])
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["invalidations"], 2)
+        self.assertEqual(statistics["misses"], 3)
+        self.assertEqual(statistics["hits"], 1)
+
+    def test_eviction(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.CachingSearchEngine(corpus, index, 2)
+        ranker = in3120.SimpleRanker()
+        options = {"match_threshold": 0.5, "hit_count": 5}
+        for query in ["water", "pollution", "water", "hydrogen", "pollution"]:
+            list(engine.evaluate(query, options, ranker))
+        statistics = engine.get_statistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 4)
+        self.assertEqual(statistics["evictions"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestCompactInMemoryPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.CompactInMemoryPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.CompactInMemoryPostingList())
+
+    def test_get_arrays(self):
+        self._tester._test_get_arrays(in3120.CompactInMemoryPostingList())
+
+    def test_append_postings(self):
+        self._tester._test_append_postings(in3120.CompactInMemoryPostingList())
+
+    def test_advance_to(self):
+        postings = in3120.CompactInMemoryPostingList()
+        for document_id in range(1, 1000, 3):
+            postings.append_posting(in3120.Posting(document_id, document_id % 5 + 1))
+        iterator = postings.get_iterator()
+        self.assertEqual(iterator.advance_to(0).document_id, 1)
+        self.assertEqual(iterator.advance_to(500).document_id, 502)
+        self.assertEqual(iterator.advance_to(502).document_id, 505)
+        self.assertEqual(next(iterator).term_frequency, 508 % 5 + 1)
+        self.assertIsNone(iterator.advance_to(1000))
+        self.assertIsNone(next(iterator, None))
+
+    def test_mesh_corpus(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compact=True)
+        self.assertEqual(len(list(index["hydrogen"])), 8)
+        self.assertEqual(len(list(index["hydrocephalus"])), 2)
+
+    def test_memory_usage(self):
+        import tracemalloc
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        sizes = []
+        for compact in [False, True]:
+            tracemalloc.start()
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compact=compact)
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            self.assertIsNotNone(index)
+        self.assertLess(2 * sizes[1], sizes[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -21,6 +21,73 @@ class TestCompressedInMemoryPostingList(unittest.TestCase):
     def test_invalid_append(self):
         self._tester1._test_invalid_append(in3120.CompressedInMemoryPostingList())
 
+    def test_get_arrays(self):
+        for name in in3120.IntegerCodec.names():
+            self._tester1._test_get_arrays(in3120.CompressedInMemoryPostingList(in3120.IntegerCodec.create(name)))
+        postings = in3120.CompressedInMemoryPostingList()
+        for document_id in range(300):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        self.assertListEqual(list(postings.get_arrays()[0]), list(range(300)))
+
+    def test_append_postings(self):
+        for name in in3120.IntegerCodec.names():
+            self._tester1._test_append_postings(in3120.CompressedInMemoryPostingList(in3120.IntegerCodec.create(name)))
+
+    def test_advance_to_skips_blocks(self):
+        postings = in3120.CompressedInMemoryPostingList()
+        document_ids = [3 * i + 1 for i in range(1000)]
+        for document_id in document_ids:
+            postings.append_posting(in3120.Posting(document_id, document_id % 7 + 1))
+        postings.finalize_postings()
+        self.assertListEqual([p.document_id for p in postings], document_ids)
+        iterator = postings.get_iterator()
+        self.assertEqual(iterator.advance_to(0).document_id, 1)
+        self.assertEqual(iterator.advance_to(500).document_id, 502)
+        self.assertEqual(iterator.advance_to(502).document_id, 505)
+        posting = iterator.advance_to(2000)
+        self.assertEqual(posting.document_id, 2002)
+        self.assertEqual(posting.term_frequency, 2002 % 7 + 1)
+        self.assertEqual(next(iterator).document_id, 2005)
+        self.assertEqual(iterator.advance_to(2998).document_id, 2998)
+        self.assertIsNone(iterator.advance_to(2999))
+        self.assertIsNone(next(iterator, None))
+
+    def test_all_codecs(self):
+        for name in in3120.IntegerCodec.names():
+            codec = in3120.IntegerCodec.create(name)
+            self._tester1._test_append_and_iterate(in3120.CompressedInMemoryPostingList(codec))
+            postings = in3120.CompressedInMemoryPostingList(codec)
+            for document_id in range(0, 3000, 7):
+                postings.append_posting(in3120.Posting(document_id, 1 + document_id % 3))
+            postings.finalize_postings()
+            self.assertEqual(postings.get_codec().name, name)
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in postings],
+                                 [(d, 1 + d % 3) for d in range(0, 3000, 7)])
+            self.assertEqual(postings.get_iterator().advance_to(2000).document_id, 2002)
+
+    def test_append_after_finalize(self):
+        postings = in3120.CompressedInMemoryPostingList(in3120.BitPackingIntegerCodec())
+        for document_id in range(200):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        postings.finalize_postings()
+        self.assertEqual(len(list(postings)), 200)
+        for document_id in range(200, 300):
+            postings.append_posting(in3120.Posting(document_id, 2))
+        self.assertListEqual([p.document_id for p in postings], list(range(300)))
+        postings.finalize_postings()
+        self.assertListEqual([p.term_frequency for p in postings], [1] * 200 + [2] * 100)
+        self.assertEqual(postings.get_iterator().advance_to(299).document_id, 299)
+
+    def test_recompress(self):
+        postings = in3120.CompressedInMemoryPostingList()
+        for document_id in range(1, 500, 2):
+            postings.append_posting(in3120.Posting(document_id, 3))
+        postings.finalize_postings()
+        postings.recompress(in3120.Simple8bIntegerCodec())
+        self.assertEqual(postings.get_codec().name, "simple8b")
+        self.assertEqual(len(postings), 250)
+        self.assertListEqual([p.document_id for p in postings], list(range(1, 500, 2)))
+
     def test_mesh_corpus(self):
         self._tester2._test_mesh_corpus(True)
 
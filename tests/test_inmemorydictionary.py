@@ -22,6 +22,71 @@ class TestInMemoryDictionary(unittest.TestCase):
         self.assertIsNone(vocabulary.get_term_id("wtf"))
         self.assertListEqual(sorted([v for v in vocabulary]), [("bar", 1), ("foo", 0)])
 
+    def test_front_coded_dictionary(self):
+        vocabulary = in3120.FrontCodedDictionary(["foobar", "foo", "bar", "fo", "ærlig", "foo"])
+        self.assertEqual(len(vocabulary), 5)
+        self.assertListEqual([v for v in vocabulary], [("bar", 0), ("fo", 1), ("foo", 2), ("foobar", 3), ("ærlig", 4)])
+        self.assertEqual(vocabulary.get_term_id("foobar"), 3)
+        self.assertEqual(vocabulary["ærlig"], 4)
+        self.assertIn("fo", vocabulary)
+        self.assertNotIn("f", vocabulary)
+        self.assertNotIn("wtf", vocabulary)
+        self.assertIsNone(vocabulary.get_term_id("aaa"))
+        self.assertEqual(vocabulary.add_if_absent("foo"), 2)
+        self.assertEqual(vocabulary.add_if_absent("wtf"), 5)
+        self.assertEqual(vocabulary.add_if_absent("wtf"), 5)
+        self.assertEqual(vocabulary["wtf"], 5)
+        self.assertEqual(vocabulary.get_term(5), "wtf")
+        self.assertEqual(vocabulary.get_term(2), "foo")
+        self.assertEqual(len(vocabulary), 6)
+        self.assertListEqual([v for v in in3120.FrontCodedDictionary([])], [])
+
+    def test_front_coded_dictionary_blocks(self):
+        terms = [f"term{i:05d}" for i in range(1000)]
+        vocabulary = in3120.FrontCodedDictionary(reversed(terms))
+        for (i, term) in enumerate(terms):
+            self.assertEqual(vocabulary.get_term_id(term), i)
+            self.assertEqual(vocabulary.get_term(i), term)
+        self.assertIsNone(vocabulary.get_term_id("term"))
+        self.assertIsNone(vocabulary.get_term_id("term99999"))
+        self.assertLess(vocabulary.get_memory_usage(), sum(len(t) for t in terms) / 2)
+
+    def test_perfect_hash_dictionary(self):
+        terms = ["foo", "bar", "foobar", "ærlig", "x"] + [f"term{i}" for i in range(500)]
+        for exact in [True, False]:
+            vocabulary = in3120.PerfectHashDictionary(terms + ["foo"], exact)
+            self.assertEqual(len(vocabulary), len(terms))
+            self.assertListEqual(sorted(vocabulary.get_term_id(t) for t in terms), list(range(len(terms))))
+            self.assertIn("ærlig", vocabulary)
+            self.assertNotIn("wtf", vocabulary)
+            self.assertIsNone(vocabulary.get_term_id("term500"))
+            self.assertEqual(vocabulary.add_if_absent("bar"), vocabulary["bar"])
+            with self.assertRaises(TypeError):
+                vocabulary.add_if_absent("wtf")
+            copy = in3120.PerfectHashDictionary.from_bytes(vocabulary.to_bytes())
+            self.assertListEqual([copy.get_term_id(t) for t in terms], [vocabulary.get_term_id(t) for t in terms])
+            self.assertIsNone(copy.get_term_id("wtf"))
+        vocabulary = in3120.PerfectHashDictionary(terms, exact=True)
+        self.assertEqual(vocabulary.get_term(vocabulary["foobar"]), "foobar")
+        self.assertListEqual(sorted(term for (term, _) in vocabulary), sorted(terms))
+        self.assertEqual(dict(vocabulary)["x"], vocabulary["x"])
+        with self.assertRaises(KeyError):
+            vocabulary.get_term(len(terms))
+        vocabulary = in3120.PerfectHashDictionary(terms)
+        with self.assertRaises(TypeError):
+            vocabulary.get_term(vocabulary["foobar"])
+        with self.assertRaises(TypeError):
+            iter(vocabulary)
+        self.assertIn("exact=False", repr(vocabulary))
+        self.assertIsNone(in3120.PerfectHashDictionary([]).get_term_id("foo"))
+
+    def test_perfect_hash_dictionary_memory_usage(self):
+        terms = [f"term{i:06d}" for i in range(20000)]
+        vocabulary = in3120.PerfectHashDictionary(terms)
+        self.assertLessEqual(8 * vocabulary.get_memory_usage() / vocabulary.size(), 24)
+        exact = in3120.PerfectHashDictionary(terms, exact=True)
+        self.assertGreater(exact.get_memory_usage(), 3 * vocabulary.get_memory_usage())
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
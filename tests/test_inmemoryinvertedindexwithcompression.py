@@ -16,12 +16,85 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
     def test_access_postings(self):
         self._tester.test_access_postings()
 
+    def test_max_term_frequency(self):
+        self._tester.test_max_term_frequency()
+
     def test_mesh_corpus(self):
         self._tester.test_mesh_corpus()
 
     def test_multiple_fields(self):
         self._tester.test_multiple_fields()
 
+    def test_parallel_build(self):
+        self._tester.test_parallel_build()
+
+    def test_front_coded_dictionary(self):
+        self._tester.test_front_coded_dictionary()
+
+    def test_add_and_delete_documents(self):
+        self._tester.test_add_and_delete_documents()
+
+    def test_incremental_mesh_corpus(self):
+        self._tester.test_incremental_mesh_corpus()
+        self._tester._compressed = "auto"
+        self._tester.test_incremental_mesh_corpus()
+
+    def test_impact_ordered_postings(self):
+        self._tester.test_impact_ordered_postings()
+
+    def test_quantized_impacts(self):
+        self._tester.test_quantized_impacts()
+
+    def test_decoded_postings_cache(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        normalizer, tokenizer = self._tester._normalizer, self._tester._tokenizer
+        reference = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True)
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True, cache_size=1024)
+        self.assertIsNone(reference.get_cache_statistics())
+        for term in ["water", "pollution", "of", "water", "pollution", "of", "hydrogen"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index[term]],
+                                 [(p.document_id, p.term_frequency) for p in reference[term]])
+        statistics = index.get_cache_statistics()
+        self.assertEqual(statistics["size"], 2)  # The list for "of" is too large, and "hydrogen" is not yet hot.
+        self.assertEqual(statistics["weight"], 8 * (21 + 8))
+        self.assertListEqual([list(a) for a in index.get_postings_arrays("water")],
+                             [list(a) for a in reference.get_postings_arrays("water")])
+        self.assertEqual(index["water"].advance_to(25274).document_id, 25274)
+        self.assertEqual(index.get_cache_statistics()["hits"], 2)
+        corpus.add_document(in3120.InMemoryDocument(len(corpus), {"body": "water water"}))
+        index.add_document(corpus[len(corpus) - 1])
+        self.assertEqual(index.get_cache_statistics()["size"], 1)
+        self.assertEqual(list(index["water"])[-1].document_id, len(corpus) - 1)
+        index.delete_document(len(corpus) - 1)
+        self.assertListEqual([p.document_id for p in index["water"]], [p.document_id for p in reference["water"]])
+        index.compact()
+        self.assertEqual(index.get_cache_statistics()["size"], 0)
+        self.assertListEqual([p.document_id for p in index["water"]], [p.document_id for p in reference["water"]])
+
+    def test_codec_selection(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for compressed in ["simple8b", "auto"]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._tester._normalizer,
+                                                 self._tester._tokenizer, compressed)
+            self.assertEqual(len(list(index["hydrogen"])), 8)
+            self.assertEqual(len(list(index["hydrocephalus"])), 2)
+        with self.assertRaises(ValueError):
+            in3120.InMemoryInvertedIndex(corpus, ["body"], self._tester._normalizer, self._tester._tokenizer, "foo")
+
+    def test_automatic_codec_selection_is_competitive(self):
+        import os
+        import tempfile
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._tester._normalizer, self._tester._tokenizer,
+                                             compact=True)
+        sizes = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for compressed in in3120.IntegerCodec.names() + ["auto"]:
+                filename = os.path.join(directory, compressed)
+                in3120.InvertedIndexWriter.write(index, filename, compressed)
+                sizes[compressed] = os.path.getsize(filename)
+        self.assertLessEqual(sizes["auto"], min(sizes.values()))
+
     def test_memory_usage(self):
         import tracemalloc
         import inspect
@@ -25,6 +25,75 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         self.assertEqual(index.get_document_frequency("prøve"), 1)
         self.assertEqual(index.get_document_frequency("test"), 2)
 
+    def test_max_term_frequency(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        self.assertEqual(index.get_max_term_frequency("test"), 2)
+        self.assertEqual(index.get_max_term_frequency("this"), 1)
+        self.assertEqual(index.get_max_term_frequency("wtf"), 0)
+        corpus.add_document(in3120.InMemoryDocument(2, {"body": "test test test"}))
+        index.add_document(corpus[2])
+        self.assertEqual(index.get_max_term_frequency("test"), 3)
+        index.delete_document(2)
+        index.compact()
+        self.assertEqual(index.get_max_term_frequency("test"), 2)
+
+    def test_impact_ordered_postings(self):
+        for impact_ordered in [False, True]:
+            corpus = in3120.InMemoryCorpus()
+            corpus.add_document(in3120.InMemoryDocument(0, {"body": "foo bar"}))
+            corpus.add_document(in3120.InMemoryDocument(1, {"body": "foo foo foo bar bar"}))
+            corpus.add_document(in3120.InMemoryDocument(2, {"body": "foo foo"}))
+            corpus.add_document(in3120.InMemoryDocument(3, {"body": "bar foo"}))
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed,
+                                                 impact_ordered=impact_ordered)
+            self.assertListEqual([list(a) for a in index.get_impact_ordered_arrays("foo")], [[1, 2, 0, 3], [3, 2, 1, 1]])
+            self.assertListEqual([list(a) for a in index.get_impact_ordered_arrays("bar")], [[1, 0, 3], [2, 1, 1]])
+            self.assertListEqual([list(a) for a in index.get_impact_ordered_arrays("wtf")], [[], []])
+            corpus.add_document(in3120.InMemoryDocument(4, {"body": "foo foo foo foo"}))
+            index.add_document(corpus[4])
+            self.assertListEqual(list(index.get_impact_ordered_arrays("foo")[0]), [4, 1, 2, 0, 3])
+            index.delete_document(1)
+            self.assertListEqual(list(index.get_impact_ordered_arrays("foo")[0]), [4, 2, 0, 3])
+            index.delete_document(3)
+            self.assertListEqual([list(a) for a in index.get_impact_ordered_arrays("foo")], [[4, 2, 0], [4, 2, 1]])
+            self.assertListEqual([list(a) for a in index.get_impact_ordered_arrays("bar")], [[0], [1]])
+            index.compact()
+            self.assertListEqual(list(index.get_impact_ordered_arrays("bar")[0]), [0])
+
+    def test_quantized_impacts(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed,
+                                              impact_model=in3120.BM25Ranker)
+        self.assertIsNone(index1.get_impact_scale())
+        scale = index2.get_impact_scale()
+        self.assertGreater(scale, 0.0)
+        self.assertEqual(max(index2.get_max_term_frequency(term) for term in index2.get_vocabulary()), 255)
+        ranker = in3120.BM25Ranker(index1)
+        for term in ["boundary", "layer", "flutter", "the"]:
+            (document_ids, term_frequencies) = index1.get_postings_arrays(term)
+            (impact_document_ids, impacts) = index2.get_postings_arrays(term)
+            self.assertListEqual(list(document_ids), list(impact_document_ids))
+            for (document_id, term_frequency, impact) in zip(document_ids, term_frequencies, impacts):
+                ranker.reset(document_id)
+                ranker.update(term, 1, in3120.Posting(document_id, term_frequency))
+                self.assertLessEqual(abs(impact * scale - ranker.evaluate()), scale / 2 + 1e-9)
+        engine = in3120.SimpleSearchEngine(corpus, index2)
+        for query in ["boundary layer", "experimental investigation of the aerodynamics of a wing"]:
+            results = []
+            for evaluation in ["exhaustive", "impact", "taat"]:
+                options = {"match_threshold": 0.5, "hit_count": 10, "evaluation": evaluation}
+                matches = engine.evaluate(query, options, in3120.SimpleRanker())
+                results.append([m["score"] for m in matches])  # Integer scores, so ties are resolved differently.
+            self.assertListEqual(results[0], results[1])
+            self.assertListEqual(results[0], results[2])
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "boundary"}))
+        with self.assertRaises(AssertionError):
+            index2.add_document(corpus[corpus.size() - 1])
+
     def test_mesh_corpus(self):
         corpus = in3120.InMemoryCorpus("../data/mesh.txt")
         index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
@@ -43,6 +112,83 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         posting = next(index.get_postings_iterator('test'))
         self.assertEqual(posting.document_id, 0)
         self.assertEqual(posting.term_frequency, 5)
+        field_lengths = index.get_field_lengths()
+        self.assertListEqual(sorted(field_lengths.keys()), ['felt1', 'felt3'])
+        self.assertListEqual(list(field_lengths['felt1']), [8])
+        self.assertListEqual(list(field_lengths['felt3']), [2])
+
+    def test_parallel_build(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed,
+                                              workers=3)
+        self.assertListEqual(list(index1.get_vocabulary()), list(index2.get_vocabulary()))
+        for term in index1.get_vocabulary():
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+            self.assertEqual(index1.get_max_term_frequency(term), index2.get_max_term_frequency(term))
+        self.assertListEqual(list(index1.get_field_lengths()["body"]), list(index2.get_field_lengths()["body"]))
+        self.assertEqual(len(index2.get_field_lengths()["body"]), corpus.size())
+
+    def test_front_coded_dictionary(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed,
+                                              front_coded=True)
+        self.assertListEqual(sorted(index1.get_vocabulary()), list(index2.get_vocabulary()))
+        for term in ["hydrogen", "hydrocephalus", "water", "wtf"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "hydrogen xyzzy"}))
+        index2.add_document(corpus[corpus.size() - 1])
+        self.assertListEqual([p.document_id for p in index2["xyzzy"]], [corpus.size() - 1])
+        self.assertEqual(index2.get_document_frequency("hydrogen"), 9)
+
+    def test_add_and_delete_documents(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        corpus.add_document(in3120.InMemoryDocument(2, {"body": "en ny test"}))
+        index.add_document(corpus[2])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["test"]], [(0, 1), (1, 2), (2, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["ny"]], [(2, 1)])
+        self.assertListEqual(list(index.get_field_lengths()["body"]), [4, 3, 3])
+        with self.assertRaises(AssertionError):
+            index.add_document(corpus[1])
+        index.delete_document(1)
+        index.delete_document(1)
+        self.assertTrue(index.is_deleted(1))
+        self.assertFalse(index.is_deleted(2))
+        self.assertListEqual([p.document_id for p in index["test"]], [0, 2])
+        self.assertListEqual([p.document_id for p in index["prøve"]], [])
+        self.assertEqual(index["test"].advance_to(1).document_id, 2)
+        self.assertEqual(index.get_document_frequency("test"), 3)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        matches = list(engine.evaluate("test", {"match_threshold": 1.0, "hit_count": 10}, in3120.SimpleRanker()))
+        self.assertListEqual(sorted(m["document"].document_id for m in matches), [0, 2])
+        index.compact()
+        self.assertFalse(index.is_deleted(1))
+        self.assertListEqual([p.document_id for p in index["test"]], [0, 2])
+        self.assertEqual(index.get_document_frequency("test"), 2)
+        self.assertEqual(index.get_document_frequency("prøve"), 0)
+        self.assertNotIn("prøve", list(index.get_vocabulary()))
+
+    def test_incremental_mesh_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        empty = in3120.InMemoryCorpus()
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        index2 = in3120.InMemoryInvertedIndex(empty, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        for document in corpus:
+            index2.add_document(document)
+        for document_id in range(0, corpus.size(), 3):
+            index1.delete_document(document_id)
+            index2.delete_document(document_id)
+        index2.compact()
+        for term in ["hydrogen", "water", "pollution"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+            self.assertTrue(all(p.document_id % 3 for p in index2[term]))
 
 
 if __name__ == '__main__':
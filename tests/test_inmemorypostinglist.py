@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+from array import array
 from context import in3120
 
 
@@ -42,9 +43,36 @@ class TestInMemoryPostingList(unittest.TestCase):
             with self.assertRaises(AssertionError):
                 postings.append_posting(in3120.Posting(21 - i, 2))
 
+    def _test_get_arrays(self, postings: in3120.PostingList):
+        self.assertListEqual([list(a) for a in postings.get_arrays()], [[], []])
+        for document_id in range(3, 1000, 7):
+            postings.append_posting(in3120.Posting(document_id, document_id % 4 + 1))
+        postings.finalize_postings()
+        (document_ids, term_frequencies) = postings.get_arrays()
+        self.assertListEqual(list(document_ids), list(range(3, 1000, 7)))
+        self.assertListEqual(list(term_frequencies), [d % 4 + 1 for d in range(3, 1000, 7)])
+
+    def _test_append_postings(self, postings: in3120.PostingList):
+        postings.append_posting(in3120.Posting(1, 5))
+        postings.append_postings(array("I"), array("I"))
+        postings.append_postings(array("I", range(2, 300, 3)), array("I", [2] * 100))
+        postings.append_postings(array("I", [400, 401]), array("I", [3, 4]))
+        with self.assertRaises(AssertionError):
+            postings.append_postings(array("I", [401]), array("I", [1]))
+        postings.finalize_postings()
+        expected = [(1, 5)] + [(d, 2) for d in range(2, 300, 3)] + [(400, 3), (401, 4)]
+        self.assertEqual(len(postings), len(expected))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected)
+
     def test_append_and_iterate(self):
         self._test_append_and_iterate(in3120.InMemoryPostingList())
 
+    def test_append_postings(self):
+        self._test_append_postings(in3120.InMemoryPostingList())
+
+    def test_get_arrays(self):
+        self._test_get_arrays(in3120.InMemoryPostingList())
+
     def test_invalid_append(self):
         self._test_invalid_append(in3120.InMemoryPostingList())
 
@@ -0,0 +1,50 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestIntegerCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._codecs = [in3120.IntegerCodec.create(name) for name in in3120.IntegerCodec.names()]
+
+    def test_create_by_name(self):
+        self.assertListEqual(sorted(in3120.IntegerCodec.names()), ["bitpacking", "pfordelta", "simple8b", "vbyte"])
+        self.assertIsInstance(in3120.IntegerCodec.create("simple8b"), in3120.Simple8bIntegerCodec)
+        with self.assertRaises(ValueError):
+            in3120.IntegerCodec.create("foo")
+
+    def test_encode_and_decode(self):
+        import random
+        rng = random.Random(1234)
+        sequences = [[], [0], [0] * 300, [1] * 128, [2 ** 32 - 1], [21, 4, 70, 0, 127, 128, 512, 999, 214577],
+                     [rng.randrange(1, 10) for _ in range(128)] + [100000],
+                     [rng.randrange(0, 2 ** 32) for _ in range(128)]]
+        for codec in self._codecs:
+            for numbers in sequences:
+                data = bytearray(b"\x01\x02")
+                length = codec.encode_many(numbers, data)
+                self.assertEqual(len(data), 2 + length)
+                data.extend(b"\x03\x04")
+                (decoded, consumed) = codec.decode_many(data, 2, len(numbers))
+                self.assertListEqual(list(decoded), numbers, codec.name)
+                self.assertEqual(consumed, length, codec.name)
+
+    def test_negative_numbers(self):
+        for codec in self._codecs:
+            with self.assertRaises(AssertionError):
+                codec.encode_many([1, -1, 2], bytearray())
+
+    def test_dense_sequences_compress_well(self):
+        numbers = [1, 2, 1, 1, 3, 1, 2, 1] * 16
+        sizes = {codec.name: codec.encode_many(numbers, bytearray()) for codec in self._codecs}
+        self.assertEqual(sizes["vbyte"], len(numbers))
+        self.assertLess(sizes["bitpacking"], len(numbers) // 3)
+        self.assertLess(sizes["pfordelta"], len(numbers) // 3)
+        self.assertLess(sizes["simple8b"], len(numbers) // 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__now = 0.0
+
+    def __clock(self) -> float:
+        return self.__now
+
+    def test_get_and_put(self):
+        cache = in3120.LRUCache(2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 42), 42)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("b"), 2)
+        cache.put("a", 3)
+        self.assertEqual(cache.get("a"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIn("b", cache)
+        self.assertNotIn("c", cache)
+        self.assertDictEqual(cache.get_statistics(), {"hits": 3, "misses": 2, "evictions": 0, "expirations": 0, "size": 2, "weight": 2})
+
+    def test_lru_eviction(self):
+        cache = in3120.LRUCache(3)
+        for (key, value) in [("a", 1), ("b", 2), ("c", 3)]:
+            cache.put(key, value)
+        self.assertEqual(cache.get("a"), 1)  # Now "b" is the least recently used.
+        cache.put("d", 4)
+        self.assertNotIn("b", cache)
+        cache.put("e", 5)
+        self.assertNotIn("c", cache)
+        self.assertListEqual([cache.get(k) for k in "ade"], [1, 4, 5])
+        self.assertEqual(cache.get_statistics()["evictions"], 2)
+
+    def test_ttl_expiration(self):
+        cache = in3120.LRUCache(10, 5.0, self.__clock)
+        cache.put("a", 1)
+        self.__now = 3.0
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.__now = 5.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.__now = 8.0
+        self.assertNotIn("b", cache)
+        statistics = cache.get_statistics()
+        self.assertEqual(statistics["expirations"], 2)
+        self.assertEqual(statistics["size"], 0)
+
+    def test_clear(self):
+        cache = in3120.LRUCache(10)
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(AssertionError):
+            in3120.LRUCache(0)
+        with self.assertRaises(AssertionError):
+            in3120.LRUCache(10, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
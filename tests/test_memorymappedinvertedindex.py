@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestMemoryMappedInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.SimpleNormalizer()
+        self._tokenizer = in3120.SimpleTokenizer()
+        (handle, self._filename) = tempfile.mkstemp(suffix=".segment")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self._filename)
+
+    def _write_and_open(self, index, compressed):
+        in3120.InvertedIndexWriter.write(index, self._filename, compressed)
+        return in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_access_postings(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        segment = self._write_and_open(index, "vbyte")
+        self.assertListEqual(list(segment.get_terms("PRøvE wtf tesT")), ["prøve", "wtf", "test"])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in segment["prøve"]], [(1, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in segment.get_postings_iterator("wtf")], [])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in segment["test"]], [(0, 1), (1, 2)])
+        self.assertEqual(segment.get_document_frequency("wtf"), 0)
+        self.assertEqual(segment.get_document_frequency("prøve"), 1)
+        self.assertEqual(segment.get_document_frequency("test"), 2)
+        self.assertListEqual(list(segment.get_vocabulary()), ["a", "is", "prøve", "test", "this"])
+        segment.close()
+
+    def test_mesh_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        for compressed in ["vbyte", "auto"]:
+            segment = self._write_and_open(index, compressed)
+            self.assertEqual(len(list(segment["hydrogen"])), 8)
+            self.assertEqual(len(list(segment["hydrocephalus"])), 2)
+            for term in index.get_vocabulary():
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in segment[term]],
+                                     [(p.document_id, p.term_frequency) for p in index[term]])
+            self.assertEqual(segment["water"].advance_to(25270).document_id, 25270)
+            segment.close()
+
+    def test_search_engine(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        segment = self._write_and_open(index, "vbyte")
+        engine1 = in3120.SimpleSearchEngine(corpus, index)
+        engine2 = in3120.SimpleSearchEngine(corpus, segment)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["polluTION Water", "hydrogen peroxide", "foo bar baz"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, in3120.SimpleRanker())]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, in3120.SimpleRanker())]
+            self.assertListEqual(matches1, matches2)
+        segment.close()
+
+    def test_field_lengths(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        segment = self._write_and_open(index, "vbyte")
+        expected = index.get_field_lengths()
+        actual = segment.get_field_lengths()
+        self.assertListEqual(list(actual), ["body"])
+        for field in expected:
+            self.assertListEqual(list(actual[field]), list(expected[field]))
+        engine1 = in3120.SimpleSearchEngine(corpus, index)
+        engine2 = in3120.SimpleSearchEngine(corpus, segment)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["boundary layer", "experimental investigation of the aerodynamics of a wing"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, in3120.BM25Ranker(index))]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, in3120.BM25Ranker(segment))]
+            self.assertListEqual(matches1, matches2)
+        segment.close()
+
+    def test_unsupported_index(self):
+        class VocabularylessInvertedIndex(in3120.InvertedIndex):
+            def get_terms(self, buffer):
+                return iter([])
+
+            def get_postings_iterator(self, term):
+                return iter([])
+
+            def get_document_frequency(self, term):
+                return 0
+
+        filename = self._filename + ".unwritten"
+        with self.assertRaises(NotImplementedError):
+            in3120.InvertedIndexWriter.write(VocabularylessInvertedIndex(), filename)
+        self.assertFalse(os.path.exists(filename))
+        with self.assertRaises(NotImplementedError):
+            in3120.BM25Ranker(VocabularylessInvertedIndex())
+
+    def test_invalid_file(self):
+        with open(self._filename, "wb") as f:
+            f.write(bytes(256))
+        with self.assertRaises(IOError):
+            in3120.MemoryMappedInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
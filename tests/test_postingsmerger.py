@@ -42,6 +42,73 @@ class TestPostingsMerger(unittest.TestCase):
         self.assertIsInstance(result1, types.GeneratorType, "Are you using yield?")
         self.assertIsInstance(result2, types.GeneratorType, "Are you using yield?")
 
+    def test_intersection_many(self):
+        import random
+        rng = random.Random(1234)
+        universe = 5000
+        for _ in range(10):
+            document_ids = [sorted(rng.sample(range(universe), rng.choice([5, 50, 500, 3000]))) for _ in range(4)]
+            expected = sorted(set.intersection(*map(set, document_ids)))
+            for factory in [in3120.InMemoryPostingList, in3120.CompactInMemoryPostingList,
+                            in3120.CompressedInMemoryPostingList]:
+                posting_lists = []
+                for ids in document_ids:
+                    posting_list = factory()
+                    for document_id in ids:
+                        posting_list.append_posting(in3120.Posting(document_id, 1))
+                    posting_list.finalize_postings()
+                    posting_lists.append(posting_list)
+                result = self._merger.intersection_many([iter(p) for p in posting_lists])
+                self.assertListEqual([p.document_id for p in result], expected)
+                result = self._merger.intersection(iter(posting_lists[0]), iter(posting_lists[1]))
+                self.assertListEqual([p.document_id for p in result],
+                                     sorted(set(document_ids[0]).intersection(document_ids[1])))
+            result = self._merger.intersection_many([iter([in3120.Posting(d, 1) for d in ids]) for ids in document_ids])
+            self.assertListEqual([p.document_id for p in result], expected)
+        self.assertListEqual(list(self._merger.intersection_many([])), [])
+        self.assertListEqual(list(self._merger.intersection_many([iter([]), iter([in3120.Posting(1, 1)])])), [])
+
+    def test_union_many(self):
+        postings1 = [in3120.Posting(1, 1), in3120.Posting(2, 2), in3120.Posting(3, 3)]
+        postings2 = [in3120.Posting(2, 4), in3120.Posting(3, 5), in3120.Posting(6, 6)]
+        postings3 = [in3120.Posting(0, 7), in3120.Posting(3, 8)]
+        result = self._merger.union_many([iter(postings1), iter(postings2), iter(postings3)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result], [(0, 7), (1, 1), (2, 2), (3, 3), (6, 6)])
+        result = self._merger.union_many([iter(postings1), iter(postings2), iter(postings3)], "sum")
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result], [(0, 7), (1, 1), (2, 6), (3, 16), (6, 6)])
+        result = self._merger.union_many([iter(postings1), iter(postings2), iter(postings3)], "max")
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result], [(0, 7), (1, 1), (2, 4), (3, 8), (6, 6)])
+        result = list(self._merger.union_many([iter(postings1), iter(postings2), iter(postings3)], "all"))
+        self.assertListEqual([[p and p.term_frequency for p in ps] for ps in result],
+                             [[None, None, 7], [1, None, None], [2, 4, None], [3, 5, 8], [None, 6, None]])
+        self.assertListEqual(list(self._merger.union_many([])), [])
+        self.assertListEqual(list(self._merger.union_many([iter([]), iter([])])), [])
+
+    def test_combiners(self):
+        postings1 = [in3120.Posting(1, 1), in3120.Posting(2, 2), in3120.Posting(3, 3)]
+        postings2 = [in3120.Posting(2, 4), in3120.Posting(3, 5), in3120.Posting(6, 6)]
+        postings3 = [in3120.Posting(0, 7), in3120.Posting(3, 8)]
+        result = self._merger.intersection_many([iter(postings1), iter(postings2), iter(postings3)], "sum")
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result], [(3, 16)])
+        result = self._merger.intersection_many([iter(postings1), iter(postings2)], "max")
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in result], [(2, 4), (3, 5)])
+        result = list(self._merger.intersection_many([iter(postings1), iter(postings2), iter(postings3)], "all"))
+        self.assertListEqual([[p.term_frequency for p in ps] for ps in result], [[3, 5, 8]])
+        with self.assertRaises(AssertionError):
+            list(self._merger.union_many([iter(postings1)], "foo"))
+
+    def test_galloping(self):
+        posting_list = in3120.InMemoryPostingList()
+        for document_id in range(0, 10000, 3):
+            posting_list.append_posting(in3120.Posting(document_id, 1))
+        iterator = iter(posting_list)
+        self.assertEqual(iterator.advance_to(1).document_id, 3)
+        self.assertEqual(iterator.advance_to(4).document_id, 6)
+        self.assertEqual(iterator.advance_to(7000).document_id, 7002)
+        self.assertEqual(next(iterator).document_id, 7005)
+        self.assertIsNone(iterator.advance_to(10000))
+        self.assertIsNone(next(iterator, None))
+
     def _process_query_with_two_terms(self, corpus, index, query, operator, expected):
         terms = list(index.get_terms(query))
         postings = [index[terms[i]] for i in range(len(terms))]
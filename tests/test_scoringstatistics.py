@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import unittest
+from context import in3120
+
+
+class TestScoringStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"title": "the foo", "static_quality_score": 0.9}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"title": "the foo foo bar", "static_quality_score": 0.2}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"title": "the bar"}))
+        corpus.add_document(in3120.InMemoryDocument(3, {"title": ""}))
+        self.__corpus = corpus
+        self.__index = in3120.InMemoryInvertedIndex(corpus, ["title"], self.__normalizer, self.__tokenizer)
+        self.__statistics = in3120.ScoringStatistics(corpus, self.__index)
+
+    def test_inverse_document_frequencies(self):
+        self.assertEqual(self.__statistics.get_document_count(), 4)
+        self.assertEqual(self.__statistics.get_idf("the"), math.log(4 / 3))
+        self.assertEqual(self.__statistics.get_idf("foo"), math.log(4 / 2))
+        self.assertEqual(self.__statistics.get_idf("bar"), math.log(4 / 2))
+        self.assertEqual(self.__statistics.get_idf("baz"), 0.0)
+        self.assertIsNone(self.__statistics.get_term_id("baz"))
+        term_id = self.__statistics.get_term_id("the")
+        self.assertEqual(self.__statistics.get_idfs()[term_id], math.log(4 / 3))
+
+    def test_document_lengths_and_norms(self):
+        self.assertListEqual(list(self.__statistics.get_document_lengths()), [2, 4, 2, 0])
+        self.assertListEqual(list(self.__statistics.get_document_norms()),
+                             [math.sqrt(2), math.sqrt(6), math.sqrt(2), 0.0])
+
+    def test_static_scores(self):
+        self.assertListEqual(list(self.__statistics.get_static_scores()), [0.9, 0.2, 1.0, 1.0])
+        self.assertEqual(self.__statistics.get_static_score(1), 0.2)
+        statistics = in3120.ScoringStatistics(self.__corpus, self.__index, default_static_score=0.5)
+        self.assertEqual(statistics.get_static_score(3), 0.5)
+
+    def test_tables_are_read_only(self):
+        with self.assertRaises(ValueError):
+            self.__statistics.get_idfs()[0] = 42.0
+        with self.assertRaises(ValueError):
+            self.__statistics.get_static_scores()[0] = 42.0
+
+    def test_version(self):
+        self.assertEqual(self.__statistics.get_version(), self.__index.get_version())
+        self.__corpus.add_document(in3120.InMemoryDocument(4, {"title": "foo"}))
+        self.__index.add_document(self.__corpus[4])
+        self.assertNotEqual(self.__statistics.get_version(), self.__index.get_version())
+
+    def test_better_ranker_scores_are_unchanged(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, compact=True)
+        statistics = in3120.ScoringStatistics(corpus, index)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        for evaluation in ["exhaustive", "wand", "taat"]:
+            options = {"match_threshold": 0.5, "hit_count": 10, "evaluation": evaluation}
+            for query in ["experimental investigation of the aerodynamics of a wing", "boundary layer", "flutter"]:
+                expected = [(m["score"], m["document"].document_id)
+                            for m in engine.evaluate(query, options, in3120.BetterRanker(corpus, index))]
+                actual = [(m["score"], m["document"].document_id)
+                          for m in engine.evaluate(query, options, in3120.BetterRanker(corpus, index, statistics))]
+                self.assertListEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
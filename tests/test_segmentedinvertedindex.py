@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestSegmentedInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.SimpleNormalizer()
+        self._tokenizer = in3120.SimpleTokenizer()
+
+    def test_access_postings(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"body": "en test til"}))
+        index = in3120.SegmentedInvertedIndex(["body"], self._normalizer, self._tokenizer, 2, 2, False)
+        for document in corpus:
+            index.add_document(document)
+        self.assertListEqual(index.get_segment_sizes(), [2])
+        self.assertEqual(index.get_version(), 3)
+        self.assertListEqual(list(index.get_terms("PRøvE wtf tesT")), ["prøve", "wtf", "test"])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["prøve"]], [(1, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index.get_postings_iterator("wtf")], [])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["test"]], [(0, 1), (1, 2), (2, 1)])
+        self.assertEqual(index.get_document_frequency("wtf"), 0)
+        self.assertEqual(index.get_document_frequency("test"), 3)
+        self.assertEqual(index["test"].advance_to(2).document_id, 2)
+        self.assertIsNone(index["test"].advance_to(3))
+        with self.assertRaises(AssertionError):
+            index.add_document(corpus[1])
+
+    def _test_mesh_corpus(self, background: bool):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        reference = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        index = in3120.SegmentedInvertedIndex(["body"], self._normalizer, self._tokenizer, 500, 3, background)
+        for document in corpus:
+            index.add_document(document)
+        index.wait_for_merges()
+        sizes = index.get_segment_sizes()
+        self.assertEqual(sum(sizes) + (corpus.size() % 500), corpus.size())
+        self.assertLess(len(sizes), corpus.size() // 500)
+        for term in ["hydrogen", "water", "pollution", "the", "foo"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in reference[term]],
+                                 [(p.document_id, p.term_frequency) for p in index[term]])
+            self.assertEqual(reference.get_document_frequency(term), index.get_document_frequency(term))
+        self.assertEqual(index["water"].advance_to(25270).document_id, 25270)
+        self.assertSetEqual(set(reference.get_vocabulary()), set(index.get_vocabulary()))
+        engine1 = in3120.SimpleSearchEngine(corpus, reference)
+        engine2 = in3120.SimpleSearchEngine(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["polluTION Water", "hydrogen peroxide"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, in3120.SimpleRanker())]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, in3120.SimpleRanker())]
+            self.assertListEqual(matches1, matches2)
+        index.close()
+
+    def test_field_lengths(self):
+        documents = [in3120.InMemoryDocument(0, {"title": "a test", "body": "this is a Test"}),
+                     in3120.InMemoryDocument(1, {"title": "", "body": "test TEST prØve"}),
+                     in3120.InMemoryDocument(2, {"title": "test", "body": "en test til"}),
+                     in3120.InMemoryDocument(4, {"body": "test"}),
+                     in3120.InMemoryDocument(6, {"title": "x y", "body": ""})]
+        index = in3120.SegmentedInvertedIndex(["title", "body"], self._normalizer, self._tokenizer, 2, 2, False)
+        for document in documents:
+            index.add_document(document)
+        self.assertEqual(sum(index.get_segment_sizes()), 4)  # The last document is still buffered.
+        field_lengths = index.get_field_lengths()
+        self.assertListEqual(list(field_lengths["title"]), [2, 0, 1, 0, 0, 0, 2])
+        self.assertListEqual(list(field_lengths["body"]), [4, 3, 3, 0, 1, 0, 0])
+
+    def test_bm25_ranker(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        reference = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        index = in3120.SegmentedInvertedIndex(["body"], self._normalizer, self._tokenizer, 500, 3, False)
+        for document in corpus:
+            index.add_document(document)
+        self.assertListEqual(list(reference.get_field_lengths()["body"]), list(index.get_field_lengths()["body"]))
+        engine1 = in3120.SimpleSearchEngine(corpus, reference)
+        engine2 = in3120.SimpleSearchEngine(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["polluTION Water", "hydrogen peroxide"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, in3120.BM25Ranker(reference))]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, in3120.BM25Ranker(index))]
+            self.assertListEqual(matches1, matches2)
+        index.close()
+
+    def test_mesh_corpus_with_merging_in_foreground(self):
+        self._test_mesh_corpus(False)
+
+    def test_mesh_corpus_with_merging_in_background(self):
+        self._test_mesh_corpus(True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -30,6 +30,52 @@ class TestSieve(unittest.TestCase):
         sieve = in3120.Sieve(3)
         self.assertListEqual(list(sieve.winners()), [])
 
+    def test_minimum(self):
+        sieve = in3120.Sieve(2)
+        self.assertIsNone(sieve.minimum())
+        sieve.sift(5.0, "five")
+        self.assertIsNone(sieve.minimum())
+        sieve.sift(3.0, "three")
+        self.assertEqual(sieve.minimum(), 3.0)
+        sieve.sift(4.0, "four")
+        self.assertEqual(sieve.minimum(), 4.0)
+        sieve.sift(1.0, "one")
+        self.assertEqual(sieve.minimum(), 4.0)
+
+    def test_idempotent_winners(self):
+        sieve = in3120.Sieve(2)
+        sieve.sift(1.0, "one")
+        sieve.sift(3.0, "three")
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (1.0, "one")])
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (1.0, "one")])
+        sieve.sift(2.0, "two")
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (2.0, "two")])
+
+    def test_sift_many(self):
+        import random
+        import numpy as np
+        rng = random.Random(42)
+        scores = rng.sample(range(100000), 20000)
+        items = [f"item{score}" for score in scores]
+        for size in [1, 10, 5000, 30000]:
+            expected = in3120.Sieve(size)
+            for (score, item) in zip(scores, items):
+                expected.sift(score, item)
+            sieve = in3120.Sieve(size)
+            sieve.sift_many(np.array(scores, dtype=np.float64), items)
+            self.assertListEqual(list(sieve.winners()), list(expected.winners()))
+            sieve = in3120.Sieve(size)
+            sieve.sift_many(scores[:7], items[:7])
+            sieve.sift(100000, "best")
+            sieve.sift_many(scores[7:], np.array(items[7:]))
+            self.assertEqual(next(sieve.winners()), (100000, "best"))
+            self.assertListEqual(list(sieve.winners())[1:], list(expected.winners())[:size - 1])
+        sieve = in3120.Sieve(3)
+        sieve.sift_many([], [])
+        self.assertListEqual(list(sieve.winners()), [])
+        with self.assertRaises(AssertionError):
+            sieve.sift_many([1.0, 2.0], ["one"])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -25,6 +25,12 @@ class TestSimpleRanker(unittest.TestCase):
         with self.assertRaises(AssertionError):
             self.__ranker.update("foo", 1, in3120.Posting(42, 4))
 
+    def test_upper_bound(self):
+        self.assertEqual(self.__ranker.upper_bound("foo", 2, 4), 8.0)
+        self.__ranker.reset(21)
+        self.__ranker.update("foo", 2, in3120.Posting(21, 4))
+        self.assertLessEqual(self.__ranker.evaluate(), self.__ranker.upper_bound("foo", 2, 4))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
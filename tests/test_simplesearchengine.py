@@ -192,6 +192,98 @@ class TestSimpleSearchEngine(unittest.TestCase):
         history = index.get_history()
         self.assertTrue(history == ordering1 or history == ordering2)  # Strict.
 
+    def test_wand_matches_exhaustive_evaluation(self):
+        import random
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, True)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        vocabulary = sorted(index.get_vocabulary(), key=index.get_document_frequency)[-200:]
+        rng = random.Random(42)
+        queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 4))) for _ in range(20)]
+        for ranker in [in3120.SimpleRanker(), in3120.BetterRanker(corpus, index)]:
+            for match_threshold in [0.1, 0.5, 1.0]:
+                for query in queries:
+                    options = {"match_threshold": match_threshold, "hit_count": 10}
+                    matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                    options["evaluation"] = "wand"
+                    matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                    self.assertListEqual(matches1, matches2)
+
+    def test_taat_matches_exhaustive_evaluation(self):
+        import random
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        rng = random.Random(42)
+        for compressed in [False, True]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, compressed)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            vocabulary = sorted(index.get_vocabulary(), key=index.get_document_frequency)[-300:]
+            queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 4))) for _ in range(20)] + ["", "xyzzy of"]
+            for ranker in [in3120.SimpleRanker(), in3120.BetterRanker(corpus, index)]:
+                for match_threshold in [0.1, 0.5, 1.0]:
+                    for query in queries:
+                        options = {"match_threshold": match_threshold, "hit_count": 10}
+                        matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                        options["evaluation"] = "taat"
+                        matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                        self.assertListEqual([s for (s, _) in matches1], [s for (s, _) in matches2])
+                        if matches1:  # Ties might be resolved differently.
+                            self.assertSetEqual({d for (s, d) in matches1 if s > matches1[-1][0]},
+                                                {d for (s, d) in matches2 if s > matches2[-1][0]})
+
+    def test_taat_falls_back_to_exhaustive_evaluation(self):
+        class NonBulkRanker(in3120.SimpleRanker):
+            def contributions(self, term, multiplicity, document_ids, term_frequencies):
+                return None
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 5}
+        matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate("water pollution", options, NonBulkRanker())]
+        options["evaluation"] = "taat"
+        matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate("water pollution", options, NonBulkRanker())]
+        self.assertEqual(len(matches1), 5)
+        self.assertListEqual(matches1, matches2)
+
+    def test_impact_ordered_matches_exhaustive_evaluation(self):
+        import random
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        rng = random.Random(42)
+        for impact_ordered in [False, True]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer,
+                                                 impact_ordered=impact_ordered)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            vocabulary = sorted(index.get_vocabulary(), key=index.get_document_frequency)[-300:]
+            queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(20)] + ["", "of", "of the"]
+            for ranker in [in3120.SimpleRanker(), in3120.BetterRanker(corpus, index)]:
+                for match_threshold in [0.1, 0.5, 1.0]:
+                    for query in queries:
+                        options = {"match_threshold": match_threshold, "hit_count": 10}
+                        matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                        options["evaluation"] = "impact"
+                        matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                        self.assertListEqual([s for (s, _) in matches1], [s for (s, _) in matches2])
+                        if matches1:  # Ties might be resolved differently.
+                            self.assertSetEqual({d for (s, d) in matches1 if s > matches1[-1][0]},
+                                                {d for (s, d) in matches2 if s > matches2[-1][0]})
+
+    def test_evaluate_many(self):
+        import functools
+        import random
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, True)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        vocabulary = sorted(index.get_vocabulary(), key=index.get_document_frequency)[-100:]
+        rng = random.Random(42)
+        queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 4))) for _ in range(50)] + ["", "xyzzy"]
+        options = {"match_threshold": 0.5, "hit_count": 5}
+        for ranker_factory in [in3120.SimpleRanker, functools.partial(in3120.BetterRanker, corpus, index)]:
+            expected = [[(m["score"], m["document"].document_id) for m in engine.evaluate(q, options, ranker_factory())]
+                        for q in queries]
+            for workers in [1, 2]:
+                results = engine.evaluate_many(queries, options, ranker_factory, workers)
+                self.assertEqual(len(results), len(queries))
+                self.assertListEqual([[(m["score"], m["document"].document_id) for m in r] for r in results], expected)
+
     def test_uses_yield(self):
         import types
         corpus = in3120.InMemoryCorpus()
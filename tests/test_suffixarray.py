@@ -73,6 +73,19 @@ class TestSuffixArray(unittest.TestCase):
         self.__process_query_and_verify_winner(engine1, "z", [], None)
         self.__process_query_and_verify_winner(engine2, "z", [2], 1)
 
+    def test_boundaries(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "foo bar", "b": "baz"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "xbar bar", "b": "bar"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"a": "baz foo", "b": ""}))
+        engine = in3120.SuffixArray(corpus, ["a", "b"], self.__normalizer, self.__tokenizer)
+        self.__process_query_and_verify_winner(engine, "bar", [1], 2)  # Not inside "xbar".
+        self.__process_query_and_verify_winner(engine, "bar baz", [], None)  # Not across fields.
+        self.__process_query_and_verify_winner(engine, "baz baz", [], None)  # Not across documents.
+        self.__process_query_and_verify_winner(engine, "foo,  BA", [0], 1)
+        matches = list(engine.evaluate("ba", {"hit_count": 2}))
+        self.assertListEqual([(m["document"].document_id, m["score"]) for m in matches], [(1, 2), (0, 2)])
+
     def test_uses_yield(self):
         import types
         corpus = in3120.InMemoryCorpus()
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import random
 import unittest
 from context import in3120
 
@@ -31,6 +32,53 @@ class TestVariableByteCodec(unittest.TestCase):
         self.assertEqual(in3120.VariableByteCodec.decode(data, 11), (214577, 3))
         self.assertEqual(in3120.VariableByteCodec.decode(data, 14), (134217728, 4))
 
+    def test_encode_and_decode_many(self):
+        numbers = [21, 4, 70, 0, 127, 128, 512, 999, 214577, 134217728]
+        data = bytearray()
+        self.assertEqual(in3120.VariableByteCodec.encode_many(numbers, data), 18)
+        self.assertEqual(len(data), 18)
+        single = bytearray()
+        for number in numbers:
+            in3120.VariableByteCodec.encode(number, single)
+        self.assertEqual(data, single)
+        (decoded, length) = in3120.VariableByteCodec.decode_many(data, 0, len(numbers))
+        self.assertListEqual(list(decoded), numbers)
+        self.assertEqual(length, 18)
+        (decoded, length) = in3120.VariableByteCodec.decode_many(data, 5, 3)
+        self.assertListEqual(list(decoded), [128, 512, 999])
+        self.assertEqual(length, 6)
+        (decoded, length) = in3120.VariableByteCodec.decode_many(data, 0, 0)
+        self.assertListEqual(list(decoded), [])
+        self.assertEqual(length, 0)
+        with self.assertRaises(IndexError):
+            in3120.VariableByteCodec.decode_many(data, 0, len(numbers) + 1)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([1, -1], bytearray())
+
+    def test_encode_and_decode_many_vectorized(self):
+        random.seed(42)
+        for high in [127, 1 << 14, (1 << 32) - 1]:
+            numbers = [random.randint(0, high) for _ in range(1000)] + [0, 127, 128, (1 << 32) - 1]
+            single = bytearray(b"x")
+            for number in numbers:
+                in3120.VariableByteCodec.encode(number, single)
+            data = bytearray(b"x")
+            self.assertEqual(in3120.VariableByteCodec.encode_many(iter(numbers), data), len(single) - 1)
+            self.assertEqual(data, single)
+            (decoded, length) = in3120.VariableByteCodec.decode_many(data, 1, len(numbers))
+            self.assertListEqual(list(decoded), numbers)
+            self.assertEqual(length, len(data) - 1)
+            (decoded, _) = in3120.VariableByteCodec.decode_many(data + data, 1, len(numbers))
+            self.assertListEqual(list(decoded), numbers)
+            with self.assertRaises(IndexError):
+                in3120.VariableByteCodec.decode_many(data, 1, len(numbers) + 1)
+        data = bytearray()
+        in3120.VariableByteCodec.encode_many([1 << 40] * 200, data)
+        with self.assertRaises(OverflowError):
+            in3120.VariableByteCodec.decode_many(data, 0, 200)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([1] * 200 + [-1], bytearray())
+
     def test_negative_numbers(self):
         for i in range(1, 5):
             with self.assertRaises(AssertionError):
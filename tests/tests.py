@@ -1,23 +1,32 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+from test_asyncsearchengine import TestAsyncSearchEngine
 from test_betterranker import TestBetterRanker
+from test_bm25ranker import TestBM25Ranker
+from test_cachingsearchengine import TestCachingSearchEngine
 from test_simplenormalizer import TestSimpleNormalizer
 from test_simpleranker import TestSimpleRanker
 from test_simpletokenizer import TestSimpleTokenizer
+from test_compactinmemorypostinglist import TestCompactInMemoryPostingList
 from test_compressedinmemorypostinglist import TestCompressedInMemoryPostingList
 from test_documentpipeline import TestDocumentPipeline
 from test_expressioncomposer import TestExpressionComposer
 from test_inmemorycorpus import TestInMemoryCorpus
+from test_integercodec import TestIntegerCodec
 from test_inmemorydictionary import TestInMemoryDictionary
 from test_inmemorydocument import TestInMemoryDocument
 from test_inmemoryinvertedindexwithcompression import TestInMemoryInvertedIndexWithCompression
 from test_inmemoryinvertedindexwithoutcompression import TestInMemoryInvertedIndexWithoutCompression
 from test_inmemorypostinglist import TestInMemoryPostingList
+from test_lrucache import TestLRUCache
+from test_memorymappedinvertedindex import TestMemoryMappedInvertedIndex
 from test_naivebayesclassifier import TestNaiveBayesClassifier
 from test_postingsmerger import TestPostingsMerger
+from test_segmentedinvertedindex import TestSegmentedInvertedIndex
 from test_shallowcaseextractor import TestShallowCaseExtractor
 from test_shinglegenerator import TestShingleGenerator
+from test_scoringstatistics import TestScoringStatistics
 from test_sieve import TestSieve
 from test_simplesearchengine import TestSimpleSearchEngine
 from test_stringfinder import TestStringFinder